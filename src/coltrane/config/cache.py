@@ -1,23 +1,105 @@
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Any
 
 from django.core.cache import caches
 from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ImproperlyConfigured
 
+from coltrane.config.coltrane import Site
 from coltrane.config.settings import get_coltrane_settings
+from coltrane.utils import LRUCache, threadpool
+
+logger = logging.getLogger(__name__)
 
 AVAILABLE_CACHE_SETTINGS_KEYS = [
     "VIEW_CACHE",
     "DATA_CACHE",
 ]
 
+# How long to wait for another thread or process to fill the cache before filling it anyway
+FILL_WAIT_SECONDS = 5
+
+# How often to check whether another process has finished filling the cache
+FILL_POLL_SECONDS = 0.05
+
+# Locks per cache key so that only one thread in the process fills a missing cache key at a time;
+# the second item is the number of threads currently using the lock
+fill_locks: dict[str, list] = {}
+fill_locks_lock = Lock()
+
+
+DEFAULT_LOCAL_CACHE_SIZE = 256
+DEFAULT_LOCAL_CACHE_SECONDS = 5
+
+# How long the namespace version from the shared cache is trusted in the process
+VERSION_CHECK_SECONDS = 1
+
+# The current namespace version of each cache, and when it was last checked: (version, checked_at),
+# keyed on cache name and version key
+versions: dict[tuple[str, str], tuple[int, float]] = {}
+
+# In-process caches in front of the shared Django cache, keyed on settings key, cache name and size
+local_caches: dict[tuple[str, str, int], LRUCache] = {}
+local_caches_lock = Lock()
+
+# Cache keys that are currently being refreshed in the background in this process
+refreshing_keys: set[str] = set()
+refreshing_keys_lock = Lock()
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached value with the time it stops being fresh. Stale entries are still served while they get
+    refreshed in the background.
+    """
+
+    value: Any
+    fresh_until: float
+
+
+@contextmanager
+def _process_fill_lock(cache_key: str) -> Iterator[bool]:
+    with fill_locks_lock:
+        if cache_key not in fill_locks:
+            fill_locks[cache_key] = [Lock(), 0]
+
+        fill_locks[cache_key][1] += 1
+        lock = fill_locks[cache_key][0]
+
+    waited = not lock.acquire(blocking=False)
+    is_acquired = not waited or lock.acquire(timeout=FILL_WAIT_SECONDS)
+
+    try:
+        yield waited
+    finally:
+        if is_acquired:
+            lock.release()
+
+        with fill_locks_lock:
+            fill_locks[cache_key][1] -= 1
+
+            if fill_locks[cache_key][1] == 0:
+                del fill_locks[cache_key]
+
 
 @dataclass
 class Cache:
     settings_key: str
     cache_key_namespace: str
+    cache_name: str
     cache: BaseCache
     seconds: int
     is_enabled: bool = False
+    is_lock_enabled: bool = False
+    stale_seconds: int = 0
+    local_cache: LRUCache | None = None
+    local_seconds: float = 0
 
     def __init__(self, settings_key: str):
         self.settings_key = settings_key
@@ -39,17 +121,261 @@ class Cache:
 
             self.cache_key_namespace = f"coltrane:{self.settings_key.lower()}:"
 
-            cache_name = coltrane_settings[self.settings_key].get("CACHE_NAME", "default")
-            self.cache = caches[cache_name]
+            self.cache_name = coltrane_settings[self.settings_key].get("CACHE_NAME", "default")
+            self.cache = caches[self.cache_name]
+
+            self.is_lock_enabled = bool(coltrane_settings[self.settings_key].get("LOCK", False))
+
+            if self.seconds is not None:
+                self.stale_seconds = int(coltrane_settings[self.settings_key].get("STALE_SECONDS", 0))
+
+            if local_settings := coltrane_settings[self.settings_key].get("LOCAL"):
+                size = int(local_settings.get("SIZE", DEFAULT_LOCAL_CACHE_SIZE))
+                self.local_seconds = float(local_settings.get("SECONDS", DEFAULT_LOCAL_CACHE_SECONDS))
+
+                if size > 0:
+                    local_cache_key = (self.settings_key, self.cache_name, size)
+
+                    with local_caches_lock:
+                        if local_cache_key not in local_caches:
+                            local_caches[local_cache_key] = LRUCache(maxsize=size)
+
+                        self.local_cache = local_caches[local_cache_key]
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.cache_key_namespace}version"
+
+    def _get_counter(self, counter_key: str) -> int:
+        """
+        Gets a counter from the shared cache, e.g. the version of the namespace. Only checked once
+        every `VERSION_CHECK_SECONDS` per process.
+        """
+
+        now = monotonic()
+        versions_key = (self.cache_name, counter_key)
+
+        if (checked_version := versions.get(versions_key)) and now - checked_version[1] < VERSION_CHECK_SECONDS:
+            return checked_version[0]
+
+        version = self.cache.get(counter_key)
+
+        if version is None:
+            self.cache.add(counter_key, 1, None)
+            version = self.cache.get(counter_key) or 1
+
+        versions[versions_key] = (version, now)
+
+        return version
+
+    def _increment_counter(self, counter_key: str) -> None:
+        try:
+            self.cache.incr(counter_key)
+        except ValueError:
+            # The counter is missing
+            self.cache.set(counter_key, self._get_counter(counter_key) + 1, None)
+
+        versions.pop((self.cache_name, counter_key), None)
+
+    def get_version(self) -> int:
+        """
+        Gets the current version of the cache's namespace from the shared cache.
+        """
+
+        return self._get_counter(self.version_key)
+
+    def invalidate(self) -> None:
+        """
+        Invalidates everything in the cache by bumping the version of the namespace. Other processes
+        pick up the new version within `VERSION_CHECK_SECONDS`.
+        """
+
+        self._increment_counter(self.version_key)
+
+        if self.local_cache is not None:
+            self.local_cache.clear()
+
+    def _get_from_local_cache(self, cache_key: str, version: int) -> Any:
+        if self.local_cache is None:
+            return None
+
+        local_value = self.local_cache.get(cache_key)
+
+        if local_value is None:
+            return None
+
+        (value, local_version, expires_at) = local_value
+
+        if local_version != version or monotonic() > expires_at:
+            self.local_cache.delete(cache_key)
+
+            return None
+
+        return value
+
+    def _set_in_local_cache(self, cache_key: str, value: Any, version: int) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set(cache_key, (value, version, monotonic() + self.local_seconds))
+
+    def get(self, cache_key: str, refresh: Callable[[], Any] | None = None) -> Any:
+        """
+        Gets the value from the cache. If the value is stale (older than `SECONDS`, but newer than
+        `SECONDS` plus `STALE_SECONDS`) it still gets returned and `refresh` gets called in a background
+        thread to update the cache. `refresh` should return the new value, or `None` to skip updating it.
+
+        Values are retrieved from the in-process cache first if `LOCAL` is enabled.
+        """
+
+        version = self.get_version()
+        value = self._get_from_local_cache(cache_key, version)
+
+        if value is None:
+            value = self.cache.get(cache_key, version=version)
+
+            if value is not None:
+                self._set_in_local_cache(cache_key, value, version)
+
+        if isinstance(value, CacheEntry):
+            if refresh and time() > value.fresh_until:
+                self._refresh_in_background(cache_key, refresh)
+
+            return value.value
+
+        return value
+
+    def set(self, cache_key: str, value: Any) -> None:
+        """
+        Sets the value in the cache. Keeps the value for `STALE_SECONDS` longer than `SECONDS` if
+        stale-while-revalidate is enabled.
+        """
+
+        version = self.get_version()
+
+        if self.stale_seconds:
+            value = CacheEntry(value=value, fresh_until=time() + self.seconds)
+            self.cache.set(cache_key, value, self.seconds + self.stale_seconds, version=version)
+        else:
+            self.cache.set(cache_key, value, self.seconds, version=version)
+
+        self._set_in_local_cache(cache_key, value, version)
+
+    def _refresh_in_background(self, cache_key: str, refresh: Callable[[], Any]) -> None:
+        with refreshing_keys_lock:
+            if cache_key in refreshing_keys:
+                return
+
+            refreshing_keys.add(cache_key)
+
+        if self.is_lock_enabled and not self.cache.add(f"{cache_key}:refresh", True, FILL_WAIT_SECONDS):
+            # Another process is already refreshing the key
+            with refreshing_keys_lock:
+                refreshing_keys.discard(cache_key)
+
+            return
+
+        _refresh(self, cache_key, refresh)
+
+    @contextmanager
+    def fill_lock(self, cache_key: str) -> Iterator[bool]:
+        """
+        Makes sure that only one thread in the process (and only one process if `LOCK` is enabled)
+        fills a missing cache key at a time, so an expired key does not get re-rendered by every
+        request at once.
+
+        Waits up to `FILL_WAIT_SECONDS` for another thread or process that is already filling the
+        key and then continues regardless.
+
+        Yields:
+            Whether another thread or process was filling the key, i.e. the cache should be checked
+            again before filling it.
+        """
+
+        with _process_fill_lock(cache_key) as waited:
+            if not self.is_lock_enabled:
+                yield waited
+                return
+
+            is_waiting = waited
+            lock_key = f"{cache_key}:lock"
+            deadline = monotonic() + FILL_WAIT_SECONDS
+            is_acquired = self.cache.add(lock_key, True, FILL_WAIT_SECONDS)
+
+            while not is_acquired and monotonic() < deadline:
+                is_waiting = True
+                sleep(FILL_POLL_SECONDS)
+                is_acquired = self.cache.add(lock_key, True, FILL_WAIT_SECONDS)
+
+            try:
+                yield is_waiting
+            finally:
+                if is_acquired:
+                    self.cache.delete(lock_key)
+
+
+VIEW_CACHE_MODES = ("context", "response")
+
+
+@threadpool
+def _refresh(cache: Cache, cache_key: str, refresh: Callable[[], Any]) -> None:
+    try:
+        value = refresh()
+
+        if value is not None:
+            cache.set(cache_key, value)
+    except Exception:
+        logger.exception(f"Refreshing the cache for '{cache_key}' failed")
+    finally:
+        if cache.is_lock_enabled:
+            cache.cache.delete(f"{cache_key}:refresh")
+
+        with refreshing_keys_lock:
+            refreshing_keys.discard(cache_key)
 
 
 @dataclass
 class ViewCache(Cache):
+    mode: str = "context"
+
     def __init__(self):
         super().__init__("VIEW_CACHE")
 
+        if self.is_enabled:
+            self.mode = get_coltrane_settings()[self.settings_key].get("MODE", "context")
+
+            if self.mode not in VIEW_CACHE_MODES:
+                raise ImproperlyConfigured(f"Invalid view cache mode: '{self.mode}'")
+
+    @property
+    def is_response_mode(self) -> bool:
+        """
+        Whether the rendered response gets cached instead of the template and context.
+        """
+
+        return self.is_enabled and self.mode == "response"
+
 
 @dataclass
 class DataCache(Cache):
     def __init__(self):
         super().__init__("DATA_CACHE")
+
+    def _get_generation_key(self, site: Site | None) -> str:
+        folder = site.folder if site else ""
+
+        return f"{self.cache_key_namespace}generation:{folder}"
+
+    def get_generation(self, site: Site | None) -> int:
+        """
+        Gets the current generation of the data for the site. Cache keys for the site's data include
+        the generation.
+        """
+
+        return self._get_counter(self._get_generation_key(site))
+
+    def invalidate_site(self, site: Site | None) -> None:
+        """
+        Invalidates the cached data for only one site by bumping its generation. Other processes pick
+        up the new generation within `VERSION_CHECK_SECONDS`.
+        """
+
+        self._increment_counter(self._get_generation_key(site))
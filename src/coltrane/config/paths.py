@@ -7,7 +7,7 @@ from django.conf import settings
 from coltrane.config.coltrane import Site
 from coltrane.config.settings import get_content_directory as get_content_directory_setting
 from coltrane.config.settings import get_data_directory as get_data_directory_setting
-from coltrane.config.settings import get_extra_file_names
+from coltrane.config.settings import get_extra_file_names, get_manifest_format
 
 
 def get_base_directory(site: Site | None = None) -> Path:
@@ -112,6 +112,15 @@ def get_output_json() -> Path:
     return get_base_directory() / "output.json"
 
 
+def get_output_manifest() -> Path:
+    """
+    Get the path of the build manifest, i.e. `output.json` or `output.msgpack` based on the
+    manifest format.
+    """
+
+    return get_base_directory() / f"output.{get_manifest_format()}"
+
+
 def get_staticfiles_json() -> Path:
     """
     Get the path of Django's `staticfiles.json` manifest file.
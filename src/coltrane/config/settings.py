@@ -3,6 +3,7 @@ from pathlib import Path
 
 import msgspec
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 from coltrane.config.coltrane import Config
 from coltrane.exceptions import ColtraneConfigParseError
@@ -21,6 +22,10 @@ DEFAULT_MISTUNE_PLUGINS = [
     "subscript",
 ]
 
+DEFAULT_MARKDOWN_CACHE_SIZE = 256
+DEFAULT_TEMPLATE_CACHE_SIZE = 256
+MANIFEST_FORMATS = ("json", "msgpack")
+
 # Used to look at environment variables to merge into settings
 DEFAULT_COLTRANE_SETTINGS = {
     "TITLE": "",
@@ -130,6 +135,53 @@ def get_data_json_5() -> bool:
     return get_coltrane_settings().get("DATA_JSON5", False)
 
 
+def get_markdown_cache_size() -> int:
+    """
+    Get the maximum number of rendered markdown files to keep in memory. 0 disables the cache.
+    """
+
+    return int(get_coltrane_settings().get("MARKDOWN_CACHE", {}).get("SIZE", DEFAULT_MARKDOWN_CACHE_SIZE))
+
+
+def get_template_cache_size() -> int:
+    """
+    Get the maximum number of compiled Django templates to keep in memory. 0 disables the cache.
+    """
+
+    return int(get_coltrane_settings().get("TEMPLATE_CACHE", {}).get("SIZE", DEFAULT_TEMPLATE_CACHE_SIZE))
+
+
+def get_content_index_refresh_seconds() -> float:
+    """
+    Get the number of seconds to trust the content index before checking the filesystem for changes
+    again. 0 checks on every lookup.
+    """
+
+    return float(get_coltrane_settings().get("CONTENT_INDEX", {}).get("REFRESH_SECONDS", 0))
+
+
+def get_conditional_get() -> bool:
+    """
+    Get whether `ETag` and `Last-Modified` headers for content get calculated from the modified times
+    of the files used to render it, so conditional requests can be answered without rendering.
+    """
+
+    return bool(get_coltrane_settings().get("CONDITIONAL_GET", False))
+
+
+def get_manifest_format() -> str:
+    """
+    Get the file format of the build manifest: `json` (the default) or `msgpack`.
+    """
+
+    manifest_format = get_coltrane_settings().get("MANIFEST", {}).get("FORMAT", "json")
+
+    if manifest_format not in MANIFEST_FORMATS:
+        raise ImproperlyConfigured(f"Invalid manifest format: '{manifest_format}'")
+
+    return manifest_format
+
+
 # Global config object that is cached in the module
 config: Config | None = None
 
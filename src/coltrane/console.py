@@ -149,9 +149,15 @@ def play(config, port):
 @cli.command(help="Generates HTML output. Aliases: rec, build.", aliases=["rec", "build"])
 @click.option("--force/--no-force", default=False, help="Force HTML generation")
 @click.option("--threads", type=int, help="Number of threads to use when generating static files")
+@click.option("--workers", type=int, help="Number of threads or processes to use when generating static files")
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    help="Whether to generate static files in threads or processes",
+)
 @click.option("--output", help="Output directory")
 @click.option("--ignore/--no-ignore", default=False, help="Ignore errors")
-def record(force, threads, output, ignore):
+def record(*, force, threads, workers, executor, output, ignore):
     args = []
 
     if force:
@@ -165,7 +171,36 @@ def record(force, threads, output, ignore):
         args.append("--threads")
         args.append(str(threads))
 
+    if workers:
+        args.append("--workers")
+        args.append(str(workers))
+
+    if executor:
+        args.append("--executor")
+        args.append(executor)
+
     if ignore:
         args.append("--ignore")
 
     _run_management_command("build", *args)
+
+
+@cli.command(help="Renders all content into the cache. Alias: warmcache.", aliases=["warmcache"])
+@click.option("--workers", type=int, help="Number of threads to use when rendering content")
+@click.option("--site", "sites", multiple=True, help="Folder of the site to warm")
+@click.option("--force/--no-force", default=False, help="Invalidate the view cache before rendering")
+def warm(workers, sites, force):
+    args = []
+
+    if workers:
+        args.append("--workers")
+        args.append(str(workers))
+
+    for site in sites:
+        args.append("--site")
+        args.append(site)
+
+    if force:
+        args.append("--force")
+
+    _run_management_command("warmcache", *args)
@@ -0,0 +1,407 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from os import scandir
+from os import stat as os_stat
+from pathlib import Path
+from stat import S_ISDIR
+from threading import Lock, RLock
+
+from coltrane.config.coltrane import Site
+from coltrane.config.paths import get_content_directory
+from coltrane.config.settings import get_content_index_refresh_seconds
+from coltrane.utils import ReverseSortKey, get_sort_key
+
+logger = logging.getLogger(__name__)
+
+
+MARKDOWN_EXTENSION = ".md"
+
+# Modified times this close to when a directory or file was scanned can't be trusted because a
+# change could happen within the resolution of the filesystem's timestamps
+RACY_NANOSECONDS = 1_000_000_000
+
+
+def _is_racy(mtime_ns: int) -> bool:
+    return time.time_ns() - mtime_ns < RACY_NANOSECONDS
+
+
+@dataclass
+class ContentIndexEntry:
+    """
+    Information about one markdown file in the content directory.
+    """
+
+    slug: str
+    """The path relative to the content directory without the extension, e.g. `articles/index`."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+    is_racy: bool = False
+    _metadata: dict | None = None
+    _sort_keys: dict[tuple[tuple[str, bool], ...], tuple] = field(default_factory=dict)
+
+    @property
+    def relative_url(self) -> str:
+        """
+        The URL for the markdown file, e.g. `/articles` for `articles/index.md`.
+        """
+
+        relative_url = f"/{self.slug}"
+
+        if relative_url.endswith("/index"):
+            relative_url = relative_url[:-6]
+
+        return relative_url
+
+    @property
+    def directory(self) -> str:
+        """
+        The directory of the markdown file relative to the content directory; the root is an empty string.
+        """
+
+        if "/" in self.slug:
+            return self.slug.rsplit("/", 1)[0]
+
+        return ""
+
+    @property
+    def metadata(self) -> dict:
+        """
+        The parsed frontmatter of the markdown file. Parsed once and re-used until the file changes.
+        """
+
+        from coltrane.renderer import MarkdownRenderer
+
+        renderer = MarkdownRenderer.instance()
+
+        if self._metadata is None:
+            self._metadata = renderer.read_metadata(self.path)
+
+        return renderer._copy_metadata(self._metadata)
+
+    def get_sort_key(self, order_by: tuple[tuple[str, bool], ...], metadata: dict) -> tuple:
+        """
+        Gets the key to sort the entry by typed metadata values. Built once for each ordering and
+        kept until the file changes.
+
+        Args:
+            order_by: Tuples of the metadata key and whether it gets sorted in descending order.
+            metadata: The metadata of the entry.
+        """
+
+        sort_key = self._sort_keys.get(order_by)
+
+        if sort_key is None:
+            sort_key = tuple(
+                ReverseSortKey(get_sort_key(metadata.get(name))) if is_reverse else get_sort_key(metadata.get(name))
+                for (name, is_reverse) in order_by
+            )
+            self._sort_keys[order_by] = sort_key
+
+        return sort_key
+
+
+@dataclass
+class ContentIndexDirectory:
+    mtime_ns: int
+    is_racy: bool = False
+    slugs: set[str] = field(default_factory=set)
+    subdirectories: set[str] = field(default_factory=set)
+
+
+class ContentIndex:
+    """
+    An in-memory index of all markdown files in a content directory.
+
+    Lookups only re-validate the part of the index they need by comparing the modified times of
+    directories and files: a slug stats its directory and file, a directory stats its sub-tree.
+    `generation` gets incremented whenever a change is found so that other caches built from the
+    content can be invalidated.
+    """
+
+    def __init__(self, content_directory: Path):
+        self.content_directory = content_directory
+        self.generation = 0
+
+        self._entries: dict[str, ContentIndexEntry] = {}
+        self._directories: dict[str, ContentIndexDirectory] = {}
+        self._last_refresh = 0.0
+        self._lock = RLock()
+
+    def _get_directory_path(self, directory: str) -> Path:
+        if directory:
+            return self.content_directory / directory
+
+        return self.content_directory
+
+    def _is_throttled(self) -> bool:
+        refresh_seconds = get_content_index_refresh_seconds()
+
+        if not refresh_seconds:
+            return False
+
+        return time.monotonic() - self._last_refresh < refresh_seconds
+
+    def _create_entry(self, slug: str, path: Path, mtime_ns: int, size: int) -> ContentIndexEntry:
+        self.generation += 1
+
+        entry = ContentIndexEntry(slug=slug, path=path, mtime_ns=mtime_ns, size=size, is_racy=_is_racy(mtime_ns))
+        self._entries[slug] = entry
+
+        return entry
+
+    def _remove_entry(self, slug: str) -> None:
+        if self._entries.pop(slug, None):
+            self.generation += 1
+
+    def _remove_directory(self, directory: str) -> None:
+        index_directory = self._directories.pop(directory, None)
+
+        if index_directory is None:
+            return
+
+        self.generation += 1
+
+        for slug in index_directory.slugs:
+            self._remove_entry(slug)
+
+        for subdirectory in index_directory.subdirectories:
+            self._remove_directory(subdirectory)
+
+    def _scan_directory(self, directory: str, mtime_ns: int) -> ContentIndexDirectory:
+        """
+        List the directory and update the entries for the markdown files in it.
+        """
+
+        previous_index_directory = self._directories.get(directory)
+        index_directory = ContentIndexDirectory(mtime_ns=mtime_ns, is_racy=_is_racy(mtime_ns))
+        prefix = f"{directory}/" if directory else ""
+
+        with scandir(self._get_directory_path(directory)) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    index_directory.subdirectories.add(f"{prefix}{dir_entry.name}")
+                elif dir_entry.name.endswith(MARKDOWN_EXTENSION) and dir_entry.is_file():
+                    slug = f"{prefix}{dir_entry.name[: -len(MARKDOWN_EXTENSION)]}"
+                    file_stat = dir_entry.stat()
+                    entry = self._entries.get(slug)
+
+                    if (
+                        entry is None
+                        or entry.is_racy
+                        or entry.mtime_ns != file_stat.st_mtime_ns
+                        or entry.size != file_stat.st_size
+                    ):
+                        self._create_entry(slug, Path(dir_entry.path), file_stat.st_mtime_ns, file_stat.st_size)
+
+                    index_directory.slugs.add(slug)
+
+        if previous_index_directory:
+            for slug in previous_index_directory.slugs - index_directory.slugs:
+                self._remove_entry(slug)
+
+            for subdirectory in previous_index_directory.subdirectories - index_directory.subdirectories:
+                self._remove_directory(subdirectory)
+        else:
+            self.generation += 1
+
+        self._directories[directory] = index_directory
+
+        return index_directory
+
+    def _refresh_entry(self, index_directory: ContentIndexDirectory, slug: str) -> None:
+        """
+        Stat the markdown file of an entry in an unchanged directory to find if it was modified.
+        """
+
+        entry = self._entries[slug]
+
+        try:
+            file_stat = os_stat(entry.path)
+        except FileNotFoundError:
+            index_directory.slugs.discard(slug)
+            self._remove_entry(slug)
+            return
+
+        if entry.is_racy or entry.mtime_ns != file_stat.st_mtime_ns or entry.size != file_stat.st_size:
+            self._create_entry(slug, entry.path, file_stat.st_mtime_ns, file_stat.st_size)
+
+    def _refresh_files(self, index_directory: ContentIndexDirectory) -> None:
+        """
+        Stat the markdown files in an unchanged directory to find modified files.
+        """
+
+        for slug in list(index_directory.slugs):
+            self._refresh_entry(index_directory, slug)
+
+    def _validate_directory(self, directory: str) -> tuple[ContentIndexDirectory | None, bool]:
+        """
+        Stat the directory and scan it again if it changed.
+
+        Returns:
+            Tuple of the directory (`None` if it does not exist anymore) and whether it was scanned.
+        """
+
+        index_directory = self._directories.get(directory)
+
+        try:
+            directory_stat = os_stat(self._get_directory_path(directory))
+        except (FileNotFoundError, NotADirectoryError):
+            self._remove_directory(directory)
+            return (None, False)
+
+        if not S_ISDIR(directory_stat.st_mode):
+            self._remove_directory(directory)
+            return (None, False)
+
+        if index_directory is None or index_directory.is_racy or index_directory.mtime_ns != directory_stat.st_mtime_ns:
+            return (self._scan_directory(directory, directory_stat.st_mtime_ns), True)
+
+        return (index_directory, False)
+
+    def _refresh_directory(self, directory: str, *, recursive: bool) -> None:
+        is_throttled = self._is_throttled()
+        directories = [directory]
+
+        while directories:
+            current_directory = directories.pop()
+            index_directory = self._directories.get(current_directory)
+
+            if index_directory is None or not is_throttled:
+                (index_directory, is_scanned) = self._validate_directory(current_directory)
+
+                if index_directory is None:
+                    continue
+
+                if not is_scanned:
+                    self._refresh_files(index_directory)
+
+            if recursive:
+                directories.extend(index_directory.subdirectories)
+
+        if not is_throttled:
+            self._last_refresh = time.monotonic()
+
+    def refresh(self, directory: str = "") -> None:
+        """
+        Re-validate all of the index (or a directory of it) against the filesystem.
+
+        Args:
+            directory: The directory relative to the content directory.
+        """
+
+        with self._lock:
+            self._refresh_directory(directory.strip("/"), recursive=True)
+
+    def get(self, slug: str) -> ContentIndexEntry | None:
+        """
+        Gets the entry for a slug, e.g. `articles/index`. Only the directory and the markdown file for
+        the slug get re-validated.
+        """
+
+        slug = slug.strip("/")
+        directory = slug.rsplit("/", 1)[0] if "/" in slug else ""
+
+        with self._lock:
+            index_directory = self._directories.get(directory)
+
+            if index_directory is None or not self._is_throttled():
+                (index_directory, is_scanned) = self._validate_directory(directory)
+
+                # Files can not be added or removed without changing the directory's modified time
+                if index_directory and not is_scanned and slug in index_directory.slugs:
+                    self._refresh_entry(index_directory, slug)
+
+            return self._entries.get(slug)
+
+    def has_directory(self, directory: str = "") -> bool:
+        directory = directory.strip("/")
+
+        with self._lock:
+            if directory not in self._directories or not self._is_throttled():
+                self._validate_directory(directory)
+
+            return directory in self._directories
+
+    def get_modified_times(self, directory: str = "") -> dict[str, int]:
+        """
+        Gets the paths of the directory, its sub-directories and all markdown files in them with
+        their modified times in nanoseconds as of the last time they were checked.
+        """
+
+        directory = directory.strip("/")
+        modified_times = {}
+
+        with self._lock:
+            directories = [directory]
+
+            while directories:
+                current_directory = directories.pop()
+                index_directory = self._directories.get(current_directory)
+
+                if index_directory is None:
+                    continue
+
+                modified_times[str(self._get_directory_path(current_directory))] = index_directory.mtime_ns
+
+                for slug in index_directory.slugs:
+                    entry = self._entries[slug]
+                    modified_times[str(entry.path)] = entry.mtime_ns
+
+                directories.extend(index_directory.subdirectories)
+
+        return modified_times
+
+    def get_entries(self, directory: str = "", *, refresh: bool = True) -> list[ContentIndexEntry]:
+        """
+        Gets the entries for all markdown files in the directory and its sub-directories.
+
+        Args:
+            directory: The directory relative to the content directory.
+            refresh: Whether to re-validate the directory first; skip if it was just refreshed.
+        """
+
+        directory = directory.strip("/")
+        entries = []
+
+        with self._lock:
+            if refresh:
+                self._refresh_directory(directory, recursive=True)
+
+            directories = [directory]
+
+            while directories:
+                index_directory = self._directories.get(directories.pop())
+
+                if index_directory is None:
+                    continue
+
+                entries.extend(self._entries[slug] for slug in index_directory.slugs)
+                directories.extend(index_directory.subdirectories)
+
+        return sorted(entries, key=lambda e: e.slug)
+
+
+# Content indexes that are cached in the module keyed on the content directory
+content_indexes: dict[str, ContentIndex] = {}
+content_indexes_lock = Lock()
+
+
+def get_content_index(site: Site | None = None) -> ContentIndex:
+    """
+    Gets the `ContentIndex` for the content directory of the site.
+    """
+
+    content_directory = get_content_directory(site=site)
+    key = str(content_directory)
+
+    if content_index := content_indexes.get(key):
+        return content_index
+
+    with content_indexes_lock:
+        if key not in content_indexes:
+            content_indexes[key] = ContentIndex(content_directory)
+
+        return content_indexes[key]
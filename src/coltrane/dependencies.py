@@ -0,0 +1,214 @@
+"""
+Records the templates, data files and static assets that get used while rendering a page so that the
+page only needs to be re-built when one of them changes.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import listdir, stat
+from pathlib import Path
+from stat import S_ISDIR
+
+from coltrane.utils import LRUCache, get_file_hash
+
+STATIC_DEPENDENCY_PREFIX = "static:"
+HASH_DEPENDENCY_PREFIX = "hash:"
+DEPENDENCY_HASHES_CACHE_SIZE = 4096
+
+_dependencies: ContextVar[dict[str, int | str] | None] = ContextVar("coltrane_dependencies", default=None)
+_is_hashing_dependencies: ContextVar[bool] = ContextVar("coltrane_is_hashing_dependencies", default=False)
+
+# Hashes of dependencies keyed on the path, modified time and size
+dependency_hashes = LRUCache(maxsize=DEPENDENCY_HASHES_CACHE_SIZE)
+
+
+@contextmanager
+def record_dependencies(*, hashes: bool = False) -> Iterator[dict[str, int | str]]:
+    """
+    Records the dependencies used while rendering inside of the context manager.
+
+    Args:
+        hashes: Whether to also record a hash of each file dependency, so that a dependency whose
+            modified time changed without a change to its contents (e.g. in a fresh checkout) is
+            not seen as changed.
+
+    Yields:
+        A dictionary of file paths to their modified time in nanoseconds, `static:` paths to their
+        URL and `hash:` paths to the hash of their contents.
+    """
+
+    dependencies: dict[str, int | str] = {}
+    token = _dependencies.set(dependencies)
+    is_hashing_token = _is_hashing_dependencies.set(hashes)
+
+    try:
+        yield dependencies
+    finally:
+        _is_hashing_dependencies.reset(is_hashing_token)
+        _dependencies.reset(token)
+
+
+def is_recording_dependencies() -> bool:
+    """
+    Whether dependencies are currently being recorded.
+    """
+
+    return _dependencies.get() is not None
+
+
+def add_file_dependency(path: str | Path, mtime_ns: int | None = None) -> None:
+    """
+    Adds a file (or directory) as a dependency if dependencies are currently being recorded.
+
+    Args:
+        path: The path of the file or directory.
+        mtime_ns: The modified time of the file in nanoseconds if it is already known; the file gets
+            stat'ed otherwise.
+    """
+
+    dependencies = _dependencies.get()
+
+    if dependencies is None:
+        return
+
+    if mtime_ns is None:
+        try:
+            mtime_ns = stat(path).st_mtime_ns
+        except (OSError, ValueError):
+            # Templates that are not from a file, e.g. `<unknown source>`
+            return
+
+    dependencies[str(path)] = mtime_ns
+
+    if _is_hashing_dependencies.get():
+        hash_key = f"{HASH_DEPENDENCY_PREFIX}{path}"
+
+        if hash_key not in dependencies and (dependency_hash := get_dependency_hash(str(path))):
+            dependencies[hash_key] = dependency_hash
+
+
+def add_static_dependency(path: str, url: str) -> None:
+    """
+    Adds a static asset as a dependency if dependencies are currently being recorded. The URL includes
+    a hash of the file's content when a manifest static files storage is used.
+    """
+
+    dependencies = _dependencies.get()
+
+    if dependencies is not None:
+        dependencies[f"{STATIC_DEPENDENCY_PREFIX}{path}"] = url
+
+
+def get_dependency_hash(path: str) -> str | None:
+    """
+    Gets a hash of the contents of a file, or of the names in a directory. Hashes are memoized until
+    the modified time or size of the path changes.
+    """
+
+    try:
+        path_stat = stat(path)
+    except OSError:
+        return None
+
+    key = (path, path_stat.st_mtime_ns, path_stat.st_size)
+
+    if dependency_hash := dependency_hashes.get(key):
+        return dependency_hash
+
+    try:
+        if S_ISDIR(path_stat.st_mode):
+            content = "\n".join(sorted(listdir(path))).encode()
+        else:
+            content = Path(path).read_bytes()
+    except OSError:
+        return None
+
+    dependency_hash = get_file_hash(content)
+    dependency_hashes.set(key, dependency_hash)
+
+    return dependency_hash
+
+
+class DependencyChecker:
+    """
+    Checks whether recorded dependencies have changed. Results are memoized for the lifetime of the
+    checker because many pages share the same dependencies.
+    """
+
+    def __init__(self):
+        self._current_values: dict[str, int | str | None] = {}
+
+    def _get_current_value(self, dependency: str) -> int | str | None:
+        if dependency in self._current_values:
+            return self._current_values[dependency]
+
+        value: int | str | None = None
+
+        if dependency.startswith(STATIC_DEPENDENCY_PREFIX):
+            from django.templatetags.static import StaticNode
+
+            try:
+                value = StaticNode.handle_simple(dependency[len(STATIC_DEPENDENCY_PREFIX) :])
+            except ValueError:
+                # Missing from the staticfiles manifest
+                pass
+        else:
+            try:
+                value = stat(dependency).st_mtime_ns
+            except OSError:
+                pass
+
+        self._current_values[dependency] = value
+
+        return value
+
+    def has_changed(self, dependencies: dict[str, int | str]) -> bool:
+        """
+        Whether any of the dependencies changed. A file whose modified time changed is compared by the
+        hash of its contents if one was recorded, the same as a markdown file in the manifest.
+        """
+
+        for dependency, value in dependencies.items():
+            if dependency.startswith(HASH_DEPENDENCY_PREFIX):
+                continue
+
+            if self._get_current_value(dependency) != value:
+                dependency_hash = dependencies.get(f"{HASH_DEPENDENCY_PREFIX}{dependency}")
+
+                if dependency_hash is None or get_dependency_hash(dependency) != dependency_hash:
+                    return True
+
+        return False
+
+    def get_refreshed(self, dependencies: dict[str, int | str]) -> dict[str, int | str] | None:
+        """
+        Gets a copy of unchanged dependencies with the current modified times of files whose contents
+        did not change, so their hashes do not need to be checked again; `None` if every modified time
+        is current.
+        """
+
+        refreshed = None
+
+        for dependency, value in dependencies.items():
+            if isinstance(value, int) and (current_value := self._get_current_value(dependency)) != value:
+                if refreshed is None:
+                    refreshed = dict(dependencies)
+
+                if current_value is not None:
+                    refreshed[dependency] = current_value
+
+        return refreshed
+
+
+def get_last_modified(dependencies: dict[str, int | str]) -> float | None:
+    """
+    Gets the latest modified time (in seconds) of the file dependencies.
+    """
+
+    mtimes = [value for value in dependencies.values() if isinstance(value, int)]
+
+    if not mtimes:
+        return None
+
+    return max(mtimes) / 1_000_000_000
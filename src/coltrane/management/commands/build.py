@@ -1,12 +1,13 @@
 import logging
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from contextlib import redirect_stdout
 from io import StringIO
 from multiprocessing import cpu_count
 from pathlib import Path
 from shutil import copy2
+from threading import Lock
 from types import SimpleNamespace
 
 from django.conf import settings
@@ -20,9 +21,10 @@ from coltrane.config.paths import (
     get_base_directory,
     get_extra_file_paths,
     get_output_directory,
-    get_output_json,
+    get_output_manifest,
     get_output_static_directory,
 )
+from coltrane.dependencies import DependencyChecker, record_dependencies
 from coltrane.feeds import ContentFeed
 from coltrane.manifest import Manifest, ManifestItem
 from coltrane.module_finder import is_django_compressor_installed
@@ -30,6 +32,7 @@ from coltrane.renderer import StaticRequest
 from coltrane.retriever import get_content_paths
 from coltrane.urls import sitemaps
 from coltrane.utils import threadpool
+from coltrane.workers import get_render_error_message, initialize_worker, render_markdown_files
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +42,12 @@ class Command(BaseCommand):
 
     is_force = False
     threads_count = 2
+    workers_count = 2
+    executor = "thread"
+    chunk_size = 20
     manifest = None
     output_result_counts = SimpleNamespace(create_count=0, update_count=0, skip_count=0)
+    output_result_counts_lock = Lock()
     request = StaticRequest("/")
 
     def add_arguments(self, parser):
@@ -56,6 +63,19 @@ class Command(BaseCommand):
             help="Number of threads to use when generating static files",
         )
 
+        parser.add_argument(
+            "--workers",
+            action="store",
+            help="Number of threads or processes to use when generating static files",
+        )
+
+        parser.add_argument(
+            "--executor",
+            action="store",
+            choices=["thread", "process"],
+            help="Whether to generate static files in threads (the default) or processes",
+        )
+
         parser.add_argument(
             "--output",
             action="store",
@@ -69,7 +89,7 @@ class Command(BaseCommand):
         )
 
     def _load_manifest(self) -> Manifest:
-        return Manifest(manifest_file=get_output_json())
+        return Manifest(manifest_file=get_output_manifest())
 
     def _generate_sitemap(self) -> None:
         if not self.output_directory:
@@ -147,36 +167,141 @@ class Command(BaseCommand):
 
         return compress_stdout
 
-    def _output_markdown_file(self, markdown_file: Path) -> None:
+    def _increment_output_result_count(self, name: str) -> None:
+        with self.output_result_counts_lock:
+            setattr(self.output_result_counts, name, getattr(self.output_result_counts, name) + 1)
+
+    def _have_dependencies_changed(self, existing_item: ManifestItem) -> bool:
+        """
+        Whether any template, data file or static asset used by the last render of the item has changed.
+        """
+
         if not self.manifest:
             raise AssertionError("Manifest must be loaded first")
 
-        is_skipped = False
+        if not existing_item.dependencies:
+            # Rendered before dependencies were recorded, so render it once to record them
+            return True
+
+        return self.dependency_checker.has_changed(existing_item.dependencies)
+
+    def _check_markdown_file(self, markdown_file: Path) -> tuple[ManifestItem, str]:
+        """
+        Checks the markdown file and its dependencies against the manifest.
+
+        Returns:
+            Tuple of the `ManifestItem` and the name of the result count, i.e. `skip_count` if the file
+            does not need to be rendered.
+        """
+
+        if not self.manifest:
+            raise AssertionError("Manifest must be loaded first")
 
         item = ManifestItem.create(markdown_file)
         existing_item = self.manifest.get(markdown_file)
 
         if existing_item and not self.is_force:
-            if item.mtime == existing_item.mtime:
-                is_skipped = True
-                self.output_result_counts.skip_count += 1
-            elif item.md5 == existing_item.md5:
-                # Update item in manifest to get newest mtime
-                self.manifest.add(markdown_file)
+            if self._have_dependencies_changed(existing_item):
+                return (item, "update_count")
+
+            # Dependencies whose modified time changed without a change to their contents, e.g. in a
+            # fresh checkout, get the newest modified time so their hashes are not checked again
+            dependencies = self.dependency_checker.get_refreshed(existing_item.dependencies)
+
+            if item.is_stat_unchanged(existing_item):
+                if dependencies is not None:
+                    self.manifest.add_item(existing_item, dependencies=dependencies)
+
+                return (item, "skip_count")
+            elif item.is_content_unchanged(existing_item):
+                # Update item in manifest to get newest stat
+                self.manifest.add_item(item, dependencies=dependencies)
+
+                return (item, "skip_count")
+
+        if existing_item:
+            return (item, "update_count")
 
-                is_skipped = True
-                self.output_result_counts.skip_count += 1
+        return (item, "create_count")
 
-        if not is_skipped:
-            if existing_item:
-                self.output_result_counts.update_count += 1
-            else:
-                self.output_result_counts.create_count += 1
+    def _output_markdown_file(self, markdown_file: Path) -> None:
+        (item, result_count_name) = self._check_markdown_file(markdown_file)
+        self._increment_output_result_count(result_count_name)
 
-            rendered_html = item.render_html()
+        if result_count_name != "skip_count":
+            with record_dependencies(hashes=True) as dependencies:
+                rendered_html = item.render_html()
 
             item.generated_file_path.write_text(rendered_html)
-            self.manifest.add(markdown_file)
+            self.manifest.add_item(item, dependencies=dependencies)
+
+    def _output_markdown_files_in_threads(self, spinner: Halo) -> None:
+        with ThreadPoolExecutor(max_workers=self.threads_count) as executor:
+            logger.debug(f"Multithread with {self.threads_count} threads")
+            pluralized_threads = "s" if self.threads_count > 1 else ""
+
+            # Submit all of the files up front so they get rendered concurrently
+            futures = {
+                executor.submit(self._output_markdown_file, path): path
+                for path in get_content_paths(request=self.request)
+            }
+
+            for completed_count, future in enumerate(as_completed(futures), start=1):
+                spinner.text = (
+                    f"Create HTML files ({completed_count}/{len(futures)}, "
+                    f"use {self.threads_count} thread{pluralized_threads})"
+                )
+
+                if exception := future.exception():
+                    self.errors.append(get_render_error_message(futures[future], exception))
+
+    def _output_markdown_files_in_processes(self, spinner: Halo) -> None:
+        if not self.manifest:
+            raise AssertionError("Manifest must be loaded first")
+
+        # Only send the files that need to be rendered to the worker processes, along with the
+        # contents that were already read so the workers do not read them again
+        files = []
+        items = {}
+
+        for path in get_content_paths(request=self.request):
+            (item, result_count_name) = self._check_markdown_file(path)
+            self._increment_output_result_count(result_count_name)
+
+            if result_count_name != "skip_count":
+                files.append((path, item.content))
+                items[path] = item
+
+        chunks = [files[idx : idx + self.chunk_size] for idx in range(0, len(files), self.chunk_size)]
+
+        # Pass along the current settings (including any changes made by this command)
+        # for worker processes that don't get forked
+        django_settings = {key: getattr(settings, key) for key in dir(settings) if key.isupper()}
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers_count,
+            initializer=initialize_worker,
+            initargs=(django_settings,),
+        ) as executor:
+            logger.debug(f"Multiprocess with {self.workers_count} processes")
+            pluralized_processes = "es" if self.workers_count > 1 else ""
+
+            futures = [executor.submit(render_markdown_files, chunk) for chunk in chunks]
+            completed_count = 0
+
+            for future in as_completed(futures):
+                for path, error_message, dependencies, content_hash in future.result():
+                    completed_count += 1
+
+                    if error_message:
+                        self.errors.append(error_message)
+                    else:
+                        self.manifest.add_item(items[path], dependencies=dependencies, content_hash=content_hash)
+
+                spinner.text = (
+                    f"Create HTML files ({completed_count}/{len(files)}, "
+                    f"use {self.workers_count} process{pluralized_processes})"
+                )
 
     def _success(self, text: str, ending="\n") -> None:
         self.stdout.write(LogSymbols.SUCCESS.value, ending=" ")
@@ -212,6 +337,7 @@ class Command(BaseCommand):
         self.output_result_counts.skip_count = 0
         self.output_directory: Path | None = None
         self.errors: list[str] = []
+        self.dependency_checker = DependencyChecker()
 
         start_time = time.time()
 
@@ -259,15 +385,15 @@ class Command(BaseCommand):
         spinner.succeed(f"Copy {extra_file_count} extra files")
 
         if not self.is_force and self.manifest.static_files_manifest_changed:
-            # At least one static file has changed, so re-render all files because
-            # we don't have granularity to know which static files are used in
-            # particular markdown or template files
-            self.is_force = True
-            self._success("Force update because static file(s) updated")
+            # Only files that use one of the changed static files get re-rendered
+            self._success("Check static files used by content because static file(s) updated")
+
+        if options.get("executor"):
+            self.executor = options["executor"]
 
-        if options.get("threads"):
+        if options.get("threads") or options.get("workers"):
             try:
-                self.threads_count = int(options["threads"])
+                self.threads_count = int(options.get("workers") or options["threads"])
             except ValueError:
                 pass
         else:
@@ -276,34 +402,26 @@ class Command(BaseCommand):
             except Exception as ex:
                 logger.exception(ex)
 
+        # `ThreadPoolExecutor` requires at least one thread
+        self.threads_count = max(self.threads_count, 1)
+
+        if options.get("workers"):
+            try:
+                self.workers_count = max(int(options["workers"]), 1)
+            except ValueError:
+                pass
+        elif self.executor == "process":
+            try:
+                self.workers_count = cpu_count()
+            except Exception as ex:
+                logger.exception(ex)
+
         spinner.start("Create HTML files")
 
-        with ThreadPoolExecutor(max_workers=self.threads_count) as executor:
-            logger.debug(f"Multithread with {self.threads_count} threads")
-            pluralized_threads = "s" if self.threads_count > 1 else ""
-            spinner.text = f"Create HTML files (use {self.threads_count} thread{pluralized_threads})"
-
-            for path in get_content_paths(request=self.request):
-                future = executor.submit(self._output_markdown_file, path)
-                exception = future.exception()
-
-                if exception:
-                    error_detail = f"{exception.__class__.__name__}: {exception}"
-
-                    if exception.__class__.__name__ == "FastDevVariableDoesNotExist":
-                        error_detail = (
-                            str(exception)
-                            .replace("\n    ", ", ")
-                            .replace(":\n, ", ": ")
-                            .replace(
-                                " does not exist in context.",
-                                "' does not exist in template context.",
-                            )
-                        )[:-1]
-                        error_detail = f"'{error_detail}"
-
-                    error_message = f"Rendering {path} failed. {error_detail}"
-                    self.errors.append(error_message)
+        if self.executor == "process":
+            self._output_markdown_files_in_processes(spinner)
+        else:
+            self._output_markdown_files_in_threads(spinner)
 
         result_msg = f"Create {self.output_result_counts.create_count} HTML files, \
 {self.output_result_counts.skip_count} unmodified, {self.output_result_counts.update_count} updated"
@@ -319,7 +437,7 @@ class Command(BaseCommand):
             self._generate_rss()
             spinner.succeed()
 
-            spinner.start("Update output.json manifest")
+            spinner.start(f"Update {self.manifest.manifest_file.name} manifest")
             self.manifest.write_data()
             spinner.succeed()
 
@@ -0,0 +1,152 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from coltrane.config.cache import DataCache, ViewCache
+from coltrane.config.coltrane import Site
+from coltrane.config.paths import get_content_directory
+from coltrane.config.settings import get_config
+from coltrane.renderer import StaticRequest
+from coltrane.retriever import get_content_paths, get_data
+
+
+def get_slug(path: Path, site: Site | None = None) -> str:
+    """
+    Gets the URL slug for a markdown file the same way it gets requested, i.e. without the
+    `index` of a directory.
+    """
+
+    slug = path.relative_to(get_content_directory(site=site)).with_suffix("").as_posix()
+
+    if slug.endswith("/index"):
+        slug = slug[:-6]
+
+    return slug
+
+
+def get_request(slug: str, site: Site) -> StaticRequest:
+    """
+    Mocks a request for the slug that gets routed to the site.
+    """
+
+    meta = {}
+    host = next((host for host in site.hosts if host != "*"), None)
+
+    if host:
+        meta["HTTP_HOST"] = host
+
+    request = StaticRequest(path=f"/{slug}", meta=meta)
+    request.method = "GET"
+
+    return request
+
+
+class Command(BaseCommand):
+    help = "Render all content into the view and data caches."
+
+    workers_count = 1
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            action="store",
+            help="Number of threads to use when rendering content",
+        )
+
+        parser.add_argument(
+            "--site",
+            action="append",
+            dest="sites",
+            help="Folder of the site to warm; can be used multiple times (defaults to all sites)",
+        )
+
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Invalidate the view cache before rendering",
+        )
+
+    def _get_sites(self, folders: list[str] | None) -> list[Site]:
+        sites = get_config().sites
+
+        if folders:
+            sites = [site for site in sites if site.folder in folders]
+
+            if not sites:
+                raise CommandError(f"Unknown site: {', '.join(folders)}")
+
+        return sites
+
+    def _warm_slug(self, slug: str, site: Site) -> tuple[str, str | None, float]:
+        """
+        Renders the slug through the `content` view so that the same caches get filled as a request.
+
+        Returns:
+            Tuple of the slug, an error message if the slug could not be rendered, and the elapsed
+            time in milliseconds.
+        """
+
+        from coltrane.views import content
+
+        start_time = time.perf_counter()
+        error: str | None = None
+
+        try:
+            response = content(get_request(slug, site), slug=slug)
+
+            if response.status_code != HTTPStatus.OK:
+                error = f"Status code {response.status_code}"
+        except Http404:
+            error = "Not found"
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+
+        return (slug, error, (time.perf_counter() - start_time) * 1000)
+
+    def handle(self, *args, **options):  # noqa: ARG002
+        if workers := options.get("workers"):
+            self.workers_count = int(workers)
+
+        view_cache = ViewCache()
+
+        if not view_cache.is_enabled:
+            self.stdout.write(self.style.WARNING("VIEW_CACHE is not enabled, so rendered content will not be cached"))
+
+        if options.get("force"):
+            view_cache.invalidate()
+
+        start_time = time.perf_counter()
+        warmed_count = 0
+        error_count = 0
+
+        for site in self._get_sites(options.get("sites")):
+            if DataCache().is_enabled:
+                get_data(site=site)
+
+            slugs = [get_slug(path, site=site) for path in get_content_paths(site=site)]
+
+            with ThreadPoolExecutor(max_workers=self.workers_count) as executor:
+                results = executor.map(lambda slug, site=site: self._warm_slug(slug, site), slugs)
+
+                for slug, error, elapsed_ms in results:
+                    if error:
+                        error_count += 1
+                        self.stdout.write(self.style.ERROR(f"Skip /{slug} ({error})"))
+                    else:
+                        warmed_count += 1
+                        self.stdout.write(f"Warm /{slug} ({elapsed_ms:.1f}ms)")
+
+        elapsed_seconds = time.perf_counter() - start_time
+        pluralized_pages = "s" if warmed_count != 1 else ""
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Warm {warmed_count} page{pluralized_pages} in {elapsed_seconds:.2f} seconds")
+        )
+
+        if error_count:
+            pluralized_errors = "s" if error_count != 1 else ""
+            self.stdout.write(self.style.ERROR(f"Skip {error_count} page{pluralized_errors} because of errors"))
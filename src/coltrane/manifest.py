@@ -1,29 +1,82 @@
-import json
+import logging
 from dataclasses import dataclass
 from hashlib import md5 as md5_hash
+from os import stat_result
 from pathlib import Path
+from threading import Lock
 
-from django.template.loader import render_to_string
+import msgspec
+from django.template.loader import get_template
 
 from coltrane.config.paths import get_output_directory, get_staticfiles_json
+from coltrane.dependencies import add_file_dependency
 from coltrane.renderer import MarkdownRenderer, StaticRequest
+from coltrane.utils import atomic_write_bytes, get_file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestEntry(msgspec.Struct, omit_defaults=True):
+    """
+    How a `ManifestItem` gets stored in the manifest file.
+    """
+
+    mtime: float | None = None
+    mtime_ns: int | None = None
+    size: int | None = None
+    inode: int | None = None
+    hash: str | None = None
+    dependencies: dict[str, int | str] = msgspec.field(default_factory=dict)
+
+    # Only in manifests from older versions
+    md5: str | None = None
 
 
 @dataclass
 class ManifestItem:
     """
-    Stores information about a markdown file: the name, last modified time, and an MD5
-    hash of the file contents.
+    Stores information about a markdown file: the name, last modified time, size, inode, a
+    hash of the file contents, and the dependencies used when it was last rendered.
     """
 
     _name: str
     _mtime: float
-    _md5: str
-
-    def __init__(self, name: str, mtime: float, md5: str):
+    _hash: str
+    _dependencies: dict[str, int | str]
+    _size: int | None
+    _mtime_ns: int | None
+    _inode: int | None
+    _path: Path | None
+    _content: bytes | None
+
+    __slots__ = ("_content", "_dependencies", "_hash", "_inode", "_mtime", "_mtime_ns", "_name", "_path", "_size")
+
+    def __init__(
+        self,
+        name: str,
+        mtime: float,
+        hash: str,  # noqa: A002
+        *,
+        dependencies: dict[str, int | str] | None = None,
+        size: int | None = None,
+        mtime_ns: int | None = None,
+        inode: int | None = None,
+        path: Path | None = None,
+        content: bytes | None = None,
+    ):
         self._name = name
         self._mtime = mtime
-        self._md5 = md5
+        self._hash = hash
+        self._dependencies = dependencies or {}
+        self._size = size
+        self._mtime_ns = mtime_ns
+        self._inode = inode
+
+        # Only set for items created from a file in this build so the hash can be lazily calculated
+        self._path = path
+
+        # Contents that were read to compare them to the manifest and have not been rendered yet
+        self._content = content
 
     @property
     def slug(self) -> str:
@@ -74,12 +127,106 @@ class ManifestItem:
         return self._mtime
 
     @property
-    def md5(self):
+    def size(self) -> int | None:
+        """
+        Size of the file in bytes.
+        """
+
+        return self._size
+
+    @property
+    def mtime_ns(self) -> int | None:
+        """
+        Last modified time of the file in nanoseconds.
+        """
+
+        return self._mtime_ns
+
+    @property
+    def inode(self) -> int | None:
         """
-        MD5 hash of the file contents.
+        Inode of the file.
         """
 
-        return self._md5
+        return self._inode
+
+    @property
+    def hash(self) -> str:
+        """
+        Hash of the file contents. Gets calculated the first time it is needed, so the file only
+        gets read when the `stat` of the file has changed. Rendering the file sets the hash from the
+        contents that were rendered.
+
+        Manifests from older versions store an unprefixed MD5 hash.
+        """
+
+        if not self._hash and self._path:
+            self._hash = get_file_hash(self._path.read_bytes())
+
+        return self._hash
+
+    def is_stat_unchanged(self, existing_item: "ManifestItem") -> bool:
+        """
+        Whether the size, last modified time and inode of the file match the existing item, i.e. the
+        file can be trusted to be unchanged without reading it.
+        """
+
+        if existing_item.mtime_ns is None:
+            # Manifests from older versions only store the last modified time
+            return self.mtime == existing_item.mtime
+
+        return (self.size, self.mtime_ns, self.inode) == (
+            existing_item.size,
+            existing_item.mtime_ns,
+            existing_item.inode,
+        )
+
+    @property
+    def content(self) -> bytes | None:
+        """
+        Contents of the file if they were read by `is_content_unchanged` and changed, so they can be
+        rendered without reading the file again.
+        """
+
+        return self._content
+
+    def is_content_unchanged(self, existing_item: "ManifestItem") -> bool:
+        """
+        Whether the contents of the file match the existing item. Reads the file at most once; the
+        contents are kept for `render_html` if they changed.
+        """
+
+        if not self._path or (self._hash and ":" in existing_item.hash):
+            return self.hash == existing_item.hash
+
+        content = self._path.read_bytes()
+
+        if not self._hash:
+            self._hash = get_file_hash(content)
+
+        if ":" in existing_item.hash:
+            is_unchanged = self._hash == existing_item.hash
+        else:
+            # Manifests from older versions store an MD5 hash
+            is_unchanged = md5_hash(content).hexdigest() == existing_item.hash  # noqa: S324
+
+        if not is_unchanged:
+            self._content = content
+
+        return is_unchanged
+
+    @property
+    def dependencies(self) -> dict[str, int | str]:
+        """
+        Templates, data files and static assets that were used when the markdown file was last rendered.
+        See `coltrane.dependencies`.
+        """
+
+        return self._dependencies
+
+    @dependencies.setter
+    def dependencies(self, value: dict[str, int | str]) -> None:
+        self._dependencies = value
 
     @property
     def generated_file_path(self) -> Path:
@@ -119,22 +266,76 @@ class ManifestItem:
         # Mock an HttpRequest when generating the HTML for static sites
         request = StaticRequest(path=self.url_slug)
 
-        (template, context) = MarkdownRenderer.instance().render_markdown(self.slug, request)
-        rendered_html = render_to_string(template, context)
+        renderer = MarkdownRenderer.instance()
+
+        if self._content is not None and self._path:
+            # Render the contents that were already read so `render_markdown` does not read the file again
+            renderer.render_markdown_path(self._path, content=self._content)
+            self._content = None
+
+        (template_name, context) = renderer.render_markdown(self.slug, request)
+
+        # Hash the contents that were just rendered instead of reading the file again
+        if not self._hash and self._path and self.mtime_ns is not None and self.size is not None:
+            self._hash = renderer.get_markdown_hash(self._path, self.mtime_ns, self.size) or ""
+
+        template = get_template(template_name)
+        add_file_dependency(template.origin.name)
+
+        rendered_html = template.render(context)
 
         return rendered_html
 
     @staticmethod
-    def create(path: Path) -> "ManifestItem":
+    def create(path: Path, path_stat: stat_result | None = None, content: bytes | None = None) -> "ManifestItem":
         """
-        Initializes a new `ManifestItem` from a `Path`.
+        Initializes a new `ManifestItem` from a `Path`. Only stats the file; the hash of the contents
+        gets calculated when it is needed. `content` is the contents of the file if they were already read.
         """
 
         name = ManifestItem.get_name(path)
-        mtime = path.stat().st_mtime
-        md5 = md5_hash(path.read_bytes()).hexdigest()  # noqa: S324
+        path_stat = path_stat or path.stat()
+
+        return ManifestItem(
+            name=name,
+            mtime=path_stat.st_mtime,
+            hash="",
+            size=path_stat.st_size,
+            mtime_ns=path_stat.st_mtime_ns,
+            inode=path_stat.st_ino,
+            path=path,
+            content=content,
+        )
 
-        return ManifestItem(name=name, mtime=mtime, md5=md5)
+    @staticmethod
+    def from_entry(name: str, entry: ManifestEntry) -> "ManifestItem":
+        """
+        Initializes a `ManifestItem` from how it is stored in the manifest file.
+        """
+
+        return ManifestItem(
+            name=name,
+            mtime=entry.mtime,
+            hash=entry.hash or entry.md5 or "",
+            dependencies=entry.dependencies,
+            size=entry.size,
+            mtime_ns=entry.mtime_ns,
+            inode=entry.inode,
+        )
+
+    def to_entry(self) -> ManifestEntry:
+        """
+        Converts the `ManifestItem` to how it is stored in the manifest file.
+        """
+
+        return ManifestEntry(
+            mtime=self.mtime,
+            mtime_ns=self.mtime_ns,
+            size=self.size,
+            inode=self.inode,
+            hash=self.hash,
+            dependencies=self.dependencies,
+        )
 
     @staticmethod
     def get_name(path: Path) -> str:
@@ -168,18 +369,26 @@ class ManifestItem:
 class ManifestItems:
     """
     A store of all the markdown files in the manifest.
+
+    Entries that get loaded from the manifest file are only converted into a `ManifestItem` when
+    they are retrieved, and get written back as-is when they were never retrieved.
     """
 
     _data: dict[str, ManifestItem]
+    _entries: dict[str, ManifestEntry]
 
     def __init__(self):
         self._data = {}
+        self._entries = {}
 
     def get(self, name: str) -> ManifestItem:
         """
         Gets the markdown file information by name.
         """
 
+        if name not in self._data:
+            self._data[name] = ManifestItem.from_entry(name, self._entries[name])
+
         return self._data[name]
 
     def add(self, manifest_item: ManifestItem) -> None:
@@ -190,14 +399,34 @@ class ManifestItems:
         Retrieve the current manifest file (typically output.json) and store the data.
         """
 
-        initial_data = json.loads(manifest_file.read_bytes())
+        content = manifest_file.read_bytes()
+
+        if manifest_file.suffix == ".msgpack":
+            self._entries = msgspec.msgpack.decode(content, type=dict[str, ManifestEntry])
+        else:
+            self._entries = msgspec.json.decode(content, type=dict[str, ManifestEntry])
+
+    def dump(self, manifest_file: Path) -> None:
+        """
+        Atomically writes the items to the manifest file.
+        """
+
+        entries = dict(self._entries)
+
+        for name, item in self._data.items():
+            entries[name] = item.to_entry()
 
-        for key in initial_data.keys():
-            values = initial_data[key]
+        if manifest_file.suffix == ".msgpack":
+            content = msgspec.msgpack.encode(entries)
+        else:
+            content = msgspec.json.encode(entries)
 
-            self._data[key] = ManifestItem(name=key, mtime=values.get("mtime"), md5=values.get("md5"))
+        atomic_write_bytes(manifest_file, content)
 
     def __iter__(self):
+        for name in self._entries.keys() - self._data.keys():
+            self.get(name)
+
         return iter(self._data.values())
 
 
@@ -217,24 +446,37 @@ class Manifest:
         self._manifest_file = manifest_file
         self._items = ManifestItems()
 
+        # Files get added from multiple threads while building
+        self._lock = Lock()
+
         if self._manifest_file.exists():
-            self._items.load(manifest_file=manifest_file)
+            try:
+                self._items.load(manifest_file=manifest_file)
+            except (msgspec.DecodeError, msgspec.ValidationError):
+                logger.warning(f"Invalid manifest '{manifest_file}'; all files will be re-built")
 
         staticfiles_manifest = get_staticfiles_json()
 
         if staticfiles_manifest.exists():
-            if staticfiles_manifest_item := self.get(staticfiles_manifest):
-                staticfiles_manifest_md5 = md5_hash(  # noqa: S324
-                    staticfiles_manifest.read_bytes()
-                ).hexdigest()
+            item = ManifestItem.create(staticfiles_manifest)
 
-                if staticfiles_manifest_item.md5 != staticfiles_manifest_md5:
-                    self.add(staticfiles_manifest)
+            if existing_item := self.get(staticfiles_manifest):
+                # `collectstatic` re-writes the file on every build, so compare the contents
+                if not item.is_content_unchanged(existing_item):
+                    self.add_item(item)
                     self._static_files_manifest_changed = True
             else:
-                self.add(staticfiles_manifest)
+                self.add_item(item)
                 self._static_files_manifest_changed = True
 
+    @property
+    def manifest_file(self) -> Path:
+        """
+        The path of the manifest file.
+        """
+
+        return self._manifest_file
+
     @property
     def is_dirty(self):
         """
@@ -251,15 +493,44 @@ class Manifest:
 
         return self._static_files_manifest_changed
 
-    def add(self, path: Path) -> ManifestItem:
+    def add(self, path: Path, dependencies: dict[str, int | str] | None = None) -> ManifestItem:
         """
         Adds a path (normally a markdown file, but could also be `staticfiles.json`) to
         the manifest. Also used to update an existing file in the manifest.
+
+        The dependencies of an existing item are kept unless new `dependencies` are passed in.
         """
 
-        item = ManifestItem.create(path)
-        self._items._data[item.name] = item
-        self._is_dirty = True
+        return self.add_item(ManifestItem.create(path), dependencies=dependencies)
+
+    def add_item(
+        self,
+        item: ManifestItem,
+        dependencies: dict[str, int | str] | None = None,
+        content_hash: str | None = None,
+    ) -> ManifestItem:
+        """
+        Adds an already created `ManifestItem` to the manifest so that the file does not need to be
+        stat-ed or hashed again.
+
+        The dependencies of an existing item are kept unless new `dependencies` are passed in.
+        `content_hash` is the hash of the contents that were rendered, e.g. in a worker process.
+        """
+
+        with self._lock:
+            if content_hash:
+                item._hash = content_hash
+
+            if dependencies is not None:
+                item.dependencies = dependencies
+            else:
+                try:
+                    item.dependencies = self._items.get(item.name).dependencies
+                except KeyError:
+                    pass
+
+            self._items.add(item)
+            self._is_dirty = True
 
         return item
 
@@ -270,10 +541,11 @@ class Manifest:
 
         name = ManifestItem.get_name(markdown_file)
 
-        try:
-            return self._items.get(name)
-        except KeyError:
-            pass
+        with self._lock:
+            try:
+                return self._items.get(name)
+            except KeyError:
+                pass
 
         return None
 
@@ -282,9 +554,5 @@ class Manifest:
         Writes the current manifest to the output file (typically output.json).
         """
 
-        data = {}
-
-        for item in self._items:
-            data[item.name] = {"mtime": item.mtime, "md5": item.md5}
-
-        self._manifest_file.write_text(json.dumps(data))
+        with self._lock:
+            self._items.dump(self._manifest_file)
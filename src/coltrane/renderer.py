@@ -2,13 +2,17 @@ import codecs
 import logging
 import re
 from dataclasses import dataclass, field
+from functools import partial
+from hashlib import blake2b
 from html import unescape
+from os import stat
 from pathlib import Path
 from urllib.parse import unquote
 
 from django.conf import settings
 from django.http import HttpRequest
 from django.template import engines
+from django.utils.functional import SimpleLazyObject
 from django.utils.html import mark_safe  # type: ignore
 from django.utils.text import slugify
 from django.utils.timezone import now
@@ -17,12 +21,14 @@ from coltrane.config.coltrane import Site
 from coltrane.config.paths import get_content_directory
 from coltrane.config.settings import (
     get_config,
+    get_markdown_cache_size,
     get_markdown_renderer,
     get_mistune_plugins,
     get_site_url,
+    get_template_cache_size,
 )
 from coltrane.retriever import get_data
-from coltrane.utils import convert_to_datetime
+from coltrane.utils import LRUCache, convert_to_datetime, get_file_hash
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,12 @@ DEFAULT_TEMPLATE = "coltrane/content.html"
 
 SPACE_REPLACEMENT = "DJANGO-TEMPLATE-TAG-SPACE"
 
+VERBATIM_PATTERN = re.compile(r"{%\s*verbatim\s*%}(.*?){%\s*endverbatim\s*%}", flags=re.RegexFlag.DOTALL)
+
+TEMPLATE_SYNTAX_MARKERS = ("{{", "{%", "{#")
+
+FRONTMATTER_BOUNDARY = re.compile(r"^-{3,}\s*$")
+
 
 @dataclass
 class StaticRequest(HttpRequest):
@@ -70,6 +82,46 @@ class StaticRequest(HttpRequest):
 
 class MarkdownRenderer:
     _instance = None
+    _markdown_cache: LRUCache | None = None
+    _template_cache: LRUCache | None = None
+    static_html_count = 0
+    template_html_count = 0
+
+    @property
+    def markdown_cache(self) -> LRUCache:
+        """
+        In-process cache of rendered markdown files keyed on the path, modified time and size.
+        """
+
+        if self._markdown_cache is None:
+            self._markdown_cache = LRUCache(maxsize=get_markdown_cache_size())
+
+        return self._markdown_cache
+
+    @property
+    def template_cache(self) -> LRUCache:
+        """
+        In-process cache of compiled Django templates keyed on a hash of the HTML.
+        """
+
+        if self._template_cache is None:
+            self._template_cache = LRUCache(maxsize=get_template_cache_size())
+
+        return self._template_cache
+
+    def stats(self) -> dict:
+        """
+        Counters for the in-process caches, e.g. to size them per worker.
+        """
+
+        return {
+            "markdown_cache": self.markdown_cache.stats(),
+            "template_cache": self.template_cache.stats(),
+            "html": {
+                "static": self.static_html_count,
+                "template": self.template_html_count,
+            },
+        }
 
     def _get_markdown_content_as_html(self, slug: str, site: Site) -> tuple[str, dict | None]:
         """
@@ -99,27 +151,183 @@ class MarkdownRenderer:
 
         return html
 
-    def render_markdown_path(self, path) -> tuple[str, dict]:
+    def _copy_metadata(self, metadata: dict | None) -> dict | None:
+        """
+        Shallow copy of cached metadata so callers can update it; volatile values get re-applied.
+        """
+
+        if metadata is None:
+            return None
+
+        metadata = dict(metadata)
+
+        if "now" in metadata:
+            metadata["now"] = now()
+
+        return metadata
+
+    def render_markdown_path(self, path, content: bytes | None = None) -> tuple[str, dict]:
+        """
+        Renders the markdown file located at path. `content` is the contents of the file if they
+        were already read.
+
+        The rendered HTML and metadata are cached in-process until the modified time
+        or size of the file changes, along with a hash of the file contents; see `get_markdown_hash`.
+        """
+
+        path_stat = stat(path)
+        cache_key = (str(path), path_stat.st_mtime_ns, path_stat.st_size)
+
+        if cached_value := self.markdown_cache.get(cache_key):
+            (html, metadata, _) = cached_value
+
+            return (html, self._copy_metadata(metadata))
+
+        if content is None:
+            with open(path, "rb") as f:
+                content = f.read()
+
+        (html, metadata) = self.render_markdown_text(content.decode("utf-8"))
+        self.markdown_cache.set(cache_key, (html, metadata, get_file_hash(content)))
+
+        return (html, self._copy_metadata(metadata))
+
+    def get_markdown_hash(self, path, mtime_ns: int, size: int) -> str | None:
         """
-        Renders the markdown file located at path.
+        Gets the hash of the contents of the markdown file located at path from when it was last
+        rendered, so that the file does not need to be read again to hash it.
+
+        Returns:
+            The hash, or `None` if the file has not been rendered with that modified time and size.
         """
 
+        if cached_value := self.markdown_cache.get((str(path), mtime_ns, size)):
+            return cached_value[2]
+
+        return None
+
+    def _parse_and_update_metadata(self, post) -> dict:
+        """
+        Add new, parse and/or cast existing values to metadata.
+
+        `metadata["toc"]` gets generated in `_generate_toc`.
+        """
+
+        metadata = post.metadata
+
+        if "draft" in metadata:
+            if metadata["draft"] is True:
+                pass
+            elif metadata["draft"] == "1":
+                metadata["draft"] = True
+            else:
+                metadata["draft"] = False
+
+        metadata["now"] = now()
+
+        if "publish_date" in metadata:
+            metadata["publish_date"] = convert_to_datetime(metadata["publish_date"])
+
+        return metadata
+
+    def _read_frontmatter(self, path) -> str:
+        """
+        Reads the frontmatter at the top of the file located at path without reading the rest of the file.
+        """
+
+        lines = []
+
         with codecs.open(path, "r", encoding="utf-8") as f:
-            text = f.read()
+            for line in f:
+                if lines or line.strip():
+                    lines.append(line)
+
+                    if len(lines) == 1:
+                        if line.strip() == "{":
+                            # JSON frontmatter doesn't have a distinct closing boundary
+                            lines.append(f.read())
+                            break
+                        elif not FRONTMATTER_BOUNDARY.match(line):
+                            # No frontmatter
+                            return ""
+                    elif FRONTMATTER_BOUNDARY.match(line):
+                        break
 
-            return self.render_markdown_text(text)
+        return "".join(lines)
+
+    def _get_toc(self, path) -> str | None:
+        (_, metadata) = self.render_markdown_path(path)
+
+        return metadata.get("toc")
+
+    def read_metadata(self, path) -> dict:
+        """
+        Reads the metadata from the frontmatter of the markdown file located at path without
+        rendering the markdown. `toc` requires the rendered HTML, so the markdown only gets rendered
+        when `toc` gets used.
+        """
+
+        import frontmatter
+
+        path_stat = stat(path)
+        cache_key = ("metadata", str(path), path_stat.st_mtime_ns, path_stat.st_size)
+
+        if (metadata := self.markdown_cache.get(cache_key)) is None:
+            frontmatter_post = frontmatter.loads(self._read_frontmatter(path))
+            metadata = self._parse_and_update_metadata(frontmatter_post)
+            metadata["toc"] = SimpleLazyObject(partial(self._get_toc, path))
+
+            self.markdown_cache.set(cache_key, metadata)
+
+        return self._copy_metadata(metadata)
 
     def render_markdown_text(self, text: str) -> tuple[str, dict]:  # noqa: ARG002
         raise Exception("Missing render_markdown_text")
 
+    def _get_static_html(self, html: str) -> str | None:
+        """
+        Returns the HTML as Django would render it if there is no template syntax outside of
+        `verbatim` blocks, otherwise `None`.
+        """
+
+        html_without_verbatim = VERBATIM_PATTERN.sub("", html)
+
+        for marker in TEMPLATE_SYNTAX_MARKERS:
+            if marker in html_without_verbatim:
+                return None
+
+        return VERBATIM_PATTERN.sub(r"\g<1>", html)
+
     def render_html_with_django(self, html: str, context: dict, request: HttpRequest = None) -> str:
         """
         Takes the rendered HTML from the markdown and use Django to fill in any template
         variables from the `context` dictionary.
+
+        HTML without any template syntax is returned as-is without going through Django.
         """
 
         django_engine = engines["django"]
-        template = django_engine.from_string(html)
+
+        cache_key = blake2b(html.encode(), digest_size=16).hexdigest()
+        template = self.template_cache.get(cache_key)
+
+        if template is None:
+            if (static_html := self._get_static_html(html)) is not None:
+                template = static_html
+                self.template_cache.set(cache_key, template)
+
+        if isinstance(template, str):
+            self.static_html_count += 1
+
+            return template
+
+        # The engine gets re-created when the `TEMPLATES` setting changes, so compiled
+        # templates from a previous engine can't be re-used
+        if template is None or template.backend is not django_engine:
+            template = django_engine.from_string(html)
+            self.template_cache.set(cache_key, template)
+
+        self.template_html_count += 1
 
         return str(template.render(context=context, request=request))
 
@@ -136,6 +344,21 @@ class MarkdownRenderer:
 
         return (html, metadata)
 
+    def get_metadata(self, slug: str, site: Site) -> dict:
+        """
+        Like `get_html_and_markdown`, but only reads the frontmatter of the markdown file.
+        """
+
+        path = get_content_directory(site) / f"{slug}.md"
+        metadata = self.read_metadata(path)
+
+        if "template" not in metadata:
+            metadata["template"] = DEFAULT_TEMPLATE
+
+        metadata["slug"] = slug
+
+        return metadata
+
     def render_markdown(
         self,
         slug: str,
@@ -241,30 +464,6 @@ class MistuneMarkdownRenderer(MarkdownRenderer):
             plugins=plugins,
         )
 
-    def _parse_and_update_metadata(self, post) -> dict:
-        """
-        Add new, parse and/or cast existing values to metadata.
-
-        `metadata["toc"]` gets generated in `_generate_toc`.
-        """
-
-        metadata = post.metadata
-
-        if "draft" in metadata:
-            if metadata["draft"] is True:
-                pass
-            elif metadata["draft"] == "1":
-                metadata["draft"] = True
-            else:
-                metadata["draft"] = False
-
-        metadata["now"] = now()
-
-        if "publish_date" in metadata:
-            metadata["publish_date"] = convert_to_datetime(metadata["publish_date"])
-
-        return metadata
-
     def _generate_toc(self, content, metadata):
         """
         Update the content to add links to each header and add a `toc` key to
@@ -1,89 +1,404 @@
-import json
 import logging
-from collections.abc import Iterable
+import mmap
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, suppress
+from copy import deepcopy
 from dataclasses import dataclass
+from hashlib import blake2b
+from os import scandir
 from pathlib import Path
+from typing import Any
 
+import msgspec
 from django.http import HttpRequest
 
 from coltrane.config.cache import DataCache
 from coltrane.config.coltrane import Site
 from coltrane.config.paths import get_content_directory, get_data_directory
 from coltrane.config.settings import get_config, get_data_json_5
-from coltrane.utils import dict_merge
+from coltrane.content_index import get_content_index
+from coltrane.dependencies import add_file_dependency, is_recording_dependencies
+from coltrane.utils import LRUCache, dict_merge
 
 logger = logging.getLogger(__name__)
 
+DATA_FILE_EXTENSIONS = (".json5", ".json")
+DATA_FILE_CACHE_SIZE = 1024
 
-MARKDOWN_EXTENSION_LENGTH = 3
+# Data files at least this big get decoded from a memory-mapped buffer instead of being read into memory first
+DATA_FILE_MMAP_SIZE = 1024 * 1024
 
+UTF8_BOM = b"\xef\xbb\xbf"
 
-def _add_data_from_path(data, data_directory, path):
+json_decoder = msgspec.json.Decoder()
+
+# Decoded data files, keyed on the path, with the modified time and size of the file when it was decoded
+data_files = LRUCache(maxsize=DATA_FILE_CACHE_SIZE)
+
+
+@contextmanager
+def _open_data_file(path: Path) -> Iterator[bytes | memoryview]:
+    """
+    Opens a data file as a buffer. Large files get memory-mapped so they can be decoded without
+    copying them into memory first.
+    """
+
+    with path.open("rb") as f:
+        size = path.stat().st_size
+
+        if size < DATA_FILE_MMAP_SIZE:
+            content = f.read()
+
+            yield content[len(UTF8_BOM) :] if content.startswith(UTF8_BOM) else content
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as buffer:
+            offset = len(UTF8_BOM) if buffer[: len(UTF8_BOM)] == UTF8_BOM else 0
+
+            with buffer[offset:] as content:
+                yield content
+
+
+def _load_data_file(path: Path, file_name: str) -> Any:
+    value = None
+
+    if get_data_json_5():
+        try:
+            import pyjson5
+
+            try:
+                with _open_data_file(path) as content:
+                    value = pyjson5.decode_buffer(content, wordlength=0)
+            except pyjson5.Json5DecoderException:
+                logger.exception(f"Invalid JSON5: '{file_name}'")
+        except ImportError:
+            pass
+    else:
+        try:
+            with _open_data_file(path) as content:
+                value = json_decoder.decode(content)
+        except msgspec.DecodeError:
+            logger.exception(f"Invalid JSON: '{file_name}'")
+
+    return value
+
+
+def _load_data_file_memoized(path: Path, file_name: str) -> Any:
+    """
+    Gets the decoded value of a data file. The value gets memoized in the process until the file's
+    modified time or size changes.
+    """
+
+    try:
+        path_stat = path.stat()
+    except OSError:
+        return None
+
+    stamp = (path_stat.st_mtime_ns, path_stat.st_size, get_data_json_5())
+    memoized = data_files.get(str(path))
+
+    if memoized and memoized[0] == stamp:
+        return memoized[1]
+
+    value = _load_data_file(path, file_name)
+    data_files.set(str(path), (stamp, value))
+
+    return value
+
+
+# Placeholder for the value of a key in `LazyData` that has not been read yet
+_UNRESOLVED = object()
+
+
+class LazyData(dict):
+    """
+    The data from the JSON files in a directory of the `data` directory. A file is only read and
+    decoded the first time its key is accessed, e.g. `data.some.file` only decodes `data/some/file.json`.
+
+    Keys are resolved the same way as merging all of the files together: a sub-directory is another
+    `LazyData`, and a file and a sub-directory with the same name get merged. It is a `dict`, so it
+    can be used anywhere the merged data could, e.g. with `json_script`; iterating over it or
+    comparing it reads all of the files. Copies and pickles are regular dictionaries.
+    """
+
+    def __init__(self, directory: Path):
+        super().__init__((name, _UNRESOLVED) for name in self._get_names(directory))
+        self._directory = directory
+
+        add_file_dependency(directory)
+
+    @staticmethod
+    def _get_names(directory: Path) -> list[str]:
+        names = []
+
+        try:
+            with scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        names.append(entry.name)
+                    elif entry.is_file() and entry.name.endswith(DATA_FILE_EXTENSIONS):
+                        names.append(entry.name.rsplit(".", 1)[0])
+        except OSError:
+            pass
+
+        return list(dict.fromkeys(names))
+
+    def _resolve(self, key: str) -> Any:
+        values = []
+
+        for extension in DATA_FILE_EXTENSIONS:
+            path = self._directory / f"{key}{extension}"
+
+            if path.is_file():
+                add_file_dependency(path)
+
+                if value := _load_data_file_memoized(path, key):
+                    values.append(value)
+
+        sub_directory = self._directory / key
+
+        if sub_directory.is_dir():
+            if not values:
+                return LazyData(sub_directory)
+
+            values.append(LazyData(sub_directory).to_dict())
+
+        if len(values) > 1:
+            # Merge copies so that memoized values never get changed
+            merged: dict = {}
+
+            for value in values:
+                dict_merge(merged, {key: deepcopy(value)})
+
+            return merged[key]
+
+        return values[0] if values else None
+
+    def _resolve_all(self) -> None:
+        for key in list(super().keys()):
+            with suppress(KeyError):
+                # Match merging all of the files together where files without data are skipped
+                if not self[key]:
+                    super().__delitem__(key)
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+
+        if value is _UNRESOLVED:
+            value = self._resolve(key)
+
+            # Sub-directories are checked for data when they get used instead of reading them now
+            if value is None or (isinstance(value, LazyData) and not dict.__len__(value)):
+                super().__delitem__(key)
+                raise KeyError(key)
+
+            super().__setitem__(key, value)
+
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except (KeyError, TypeError):
+            return False
+
+        return True
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except (KeyError, TypeError):
+            return default
+
+    def __iter__(self) -> Iterator[str]:
+        self._resolve_all()
+
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._resolve_all()
+
+        return super().__len__()
+
+    def keys(self):
+        self._resolve_all()
+
+        return super().keys()
+
+    def values(self):
+        self._resolve_all()
+
+        return super().values()
+
+    def items(self):
+        self._resolve_all()
+
+        return super().items()
+
+    def copy(self) -> dict:
+        return self.to_dict()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyData):
+            other = other.to_dict()
+
+        return self.to_dict() == other
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """
+        Reads and decodes all of the data files and returns a regular dictionary.
+        """
+
+        return {key: value.to_dict() if isinstance(value, LazyData) else value for key, value in self.items()}
+
+
+def _load_data_file_from_cache(data_cache: DataCache, site: Site | None, path: Path, file_name: str) -> Any:
+    """
+    Gets the value of a data file from the cache. The cache key includes the modified time and size of
+    the file, so only files that changed get parsed again.
+    """
+
+    path_stat = path.stat()
+    folder = site.folder if site else ""
+    path_hash = blake2b(str(path).encode(), digest_size=16).hexdigest()
+    cache_key = f"{data_cache.cache_key_namespace}file:{folder}:{path_hash}:{path_stat.st_mtime_ns}:{path_stat.st_size}"
+
+    value = data_cache.get(cache_key)
+
+    if value is None:
+        value = _load_data_file(path, file_name)
+
+        if value:
+            data_cache.set(cache_key, value)
+
+    return value
+
+
+def _add_data_from_path(data, data_directory, path, data_cache: DataCache | None = None, site: Site | None = None):
     if path.is_file():
+        add_file_dependency(path)
+        add_file_dependency(path.parent)
+
         directory_without_base_and_file_name = (str(path)).replace(str(data_directory), "").replace(path.name, "")
 
         # TODO: Check that .json5/.json is an extension first
         file_name = path.name.replace(".json5", "").replace(".json", "")
-        value = None
 
-        if get_data_json_5():
-            try:
-                import pyjson5
-
-                try:
-                    value = pyjson5.decode_buffer(path.read_bytes(), wordlength=0)
-                except pyjson5.Json5DecoderException:
-                    logger.exception(f"Invalid JSON5: '{file_name}'")
-            except ImportError:
-                pass
+        if data_cache:
+            value = _load_data_file_from_cache(data_cache, site, path, file_name)
         else:
-            try:
-                value = json.loads(path.read_bytes())
-            except json.decoder.JSONDecodeError:
-                logger.exception(f"Invalid JSON: '{file_name}'")
+            value = _load_data_file(path, file_name)
 
         if value:
-            new_data = {file_name: value}
+            # Walk (and create) a level in the data dictionary for each directory between BASE_DIR/data
+            # and the JSON file; for example, base_dir/data/some/new/test/here.json with {"one": "two"}
+            # gets added as data["some"]["new"]["test"]["here"] == {"one": "two"}
+            node = data
+            keys = [key for key in directory_without_base_and_file_name.split("/") if key]
 
-            # For each part of the path between BASE_DIR/data and the JSON file,
-            # add a new level (i.e. key) in the data dictionary; for example:
-            # base_dir/data/some/new/test/here.json with {"one": "two"} ==
-            # {"some": {"new": {"test": {"here": {"one": "two"}}}}}
-            for key in reversed(directory_without_base_and_file_name.split("/")):
-                if key:
-                    new_data = {key: new_data}
+            for index, key in enumerate(keys):
+                child = node.setdefault(key, {})
 
-            data = dict_merge(data, new_data)
+                if not isinstance(child, dict):
+                    # Let `dict_merge` raise the conflict for the rest of the path
+                    new_data = {file_name: value}
+
+                    for parent_key in reversed(keys[index + 1 :]):
+                        new_data = {parent_key: new_data}
+
+                    dict_merge(node, {key: new_data})
+                    return
+
+                node = child
+
+            if file_name in node:
+                dict_merge(node, {file_name: value}, path=keys)
+            else:
+                node[file_name] = value
+
+
+def _get_data_from_directory(
+    data_directory: Path, data_cache: DataCache | None = None, site: Site | None = None
+) -> dict:
+    data: dict = {}
+    add_file_dependency(data_directory)
+
+    for path in data_directory.rglob("*.json5"):
+        _add_data_from_path(data, data_directory, path, data_cache=data_cache, site=site)
+
+    for path in data_directory.rglob("*.json"):
+        _add_data_from_path(data, data_directory, path, data_cache=data_cache, site=site)
+
+    return data
+
+
+def _add_data_dependencies(data_directory: Path) -> None:
+    """
+    Adds the data directory and all data files as dependencies without reading them.
+    """
+
+    add_file_dependency(data_directory)
+
+    for path in data_directory.rglob("*.json*"):
+        if path.suffix in (".json", ".json5"):
+            add_file_dependency(path)
+            add_file_dependency(path.parent)
 
 
 def get_data(site: Site) -> dict:
     """
     Get and merge data from any JSON files recursively found in the `data` directory.
+
+    If the data cache is enabled, the merged data is cached per site (see `DataCache.invalidate_site`)
+    and the data of each file is cached separately. Otherwise, a `LazyData` dictionary is returned
+    which only decodes the files that actually get used.
     """
 
     data = {}
     data_cache = DataCache()
     cache_key = ""
+    data_directory = get_data_directory(site=site)
 
     if data_cache.is_enabled:
-        cache_key = f"{data_cache.cache_key_namespace}data"
-        data = data_cache.cache.get(cache_key, {})
+        folder = site.folder if site else ""
+        cache_key = f"{data_cache.cache_key_namespace}data:{folder}:{data_cache.get_generation(site)}"
+
+        def _refresh():
+            return _get_data_from_directory(data_directory, data_cache=data_cache, site=site)
+
+        data = data_cache.get(cache_key, refresh=_refresh) or {}
 
         if data:
+            if is_recording_dependencies():
+                _add_data_dependencies(data_directory)
+
             return data
 
-    data_directory = get_data_directory(site=site)
+        with data_cache.fill_lock(cache_key) as waited:
+            # Another request might have just filled the cache
+            if waited and (data := data_cache.get(cache_key) or {}):
+                if is_recording_dependencies():
+                    _add_data_dependencies(data_directory)
 
-    for path in data_directory.rglob("*.json5"):
-        _add_data_from_path(data, data_directory, path)
+                return data
 
-    for path in data_directory.rglob("*.json"):
-        _add_data_from_path(data, data_directory, path)
+            data = _refresh()
+            data_cache.set(cache_key, data)
 
-    if data_cache.is_enabled:
-        data_cache.cache.set(cache_key, data, timeout=data_cache.seconds)
+        return data
 
-    return data
+    return LazyData(data_directory)
 
 
 def get_content_paths(
@@ -96,19 +411,14 @@ def get_content_paths(
     if not site and request:
         site = get_config().get_site(request)
 
-    directory = get_content_directory(site=site)
+    content_index = get_content_index(site=site)
+    directory = slug or ""
 
-    if slug:
-        directory = directory / slug
+    if not content_index.has_directory(directory):
+        raise FileNotFoundError(f"Directory does not exist: {get_content_directory(site=site) / directory}")
 
-    if not directory.exists():
-        raise FileNotFoundError(f"Directory does not exist: {directory}")
-
-    paths = directory.rglob("*.md")
-
-    for path in paths:
-        if path.is_file():
-            yield path
+    for entry in content_index.get_entries(directory):
+        yield entry.path
 
 
 @dataclass
@@ -116,31 +426,38 @@ class ContentItem:
     path: Path
     metadata: dict
     relative_url: str
-    html: str
+    _html: str | None
 
+    def __init__(self, path: Path, metadata: dict, relative_url: str, html: str | None = None):
+        self.path = path
+        self.metadata = metadata
+        self.relative_url = relative_url
+        self._html = html
 
-def get_content_items(site: Site | None = None, skip_draft: bool = True) -> Iterable[ContentItem]:  # noqa: FBT001, FBT002
-    from coltrane.renderer import MarkdownRenderer
+    @property
+    def html(self) -> str:
+        """
+        The rendered HTML of the markdown; only rendered when it gets accessed.
+        """
 
-    paths = get_content_paths(site=site)
-    _items = []
+        if self._html is None:
+            from coltrane.renderer import MarkdownRenderer
 
-    content_directory = get_content_directory(site=site)
-    content_directory_path_length = len(str(content_directory))
+            (self._html, _) = MarkdownRenderer.instance().render_markdown_path(self.path)
 
-    for path in paths:
-        (html, metadata) = MarkdownRenderer.instance().render_markdown_path(path)
+        return self._html
 
-        if skip_draft and metadata and "draft" in metadata and metadata["draft"] is True:
-            continue
 
-        path_str = str(path)
-        relative_url = path_str[content_directory_path_length:-MARKDOWN_EXTENSION_LENGTH]
+def get_content_items(site: Site | None = None, skip_draft: bool = True) -> Iterable[ContentItem]:  # noqa: FBT001, FBT002
+    _items = []
 
-        if relative_url.endswith("/index"):
-            relative_url = relative_url[:-6]
+    for entry in get_content_index(site=site).get_entries():
+        metadata = entry.metadata
+
+        if skip_draft and metadata and "draft" in metadata and metadata["draft"] is True:
+            continue
 
-        content_item = ContentItem(path=path, metadata=metadata, html=html, relative_url=relative_url)
+        content_item = ContentItem(path=entry.path, metadata=metadata, relative_url=entry.relative_url)
         _items.append(content_item)
 
     return _items
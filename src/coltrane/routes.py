@@ -0,0 +1,201 @@
+"""
+Resolves the slug of a request to the markdown file or HTML template that renders it.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist, engines
+from django.template.loader import select_template
+
+from coltrane.config.coltrane import Site
+from coltrane.config.paths import get_base_directory
+from coltrane.config.settings import get_disable_wildcard_templates
+from coltrane.content_index import get_content_index
+from coltrane.utils import LRUCache
+from coltrane.wildcard_templates import TemplateTrie, get_template_trie
+
+logger = logging.getLogger(__name__)
+
+ROUTE_TABLE_SIZE = 1024
+NOT_FOUND_CACHE_SIZE = 4096
+
+# Settings that change which templates can be found
+TEMPLATE_SETTINGS = ("BASE_DIR", "COLTRANE", "INSTALLED_APPS", "TEMPLATES")
+
+
+@dataclass
+class Route:
+    is_markdown: bool
+    """Whether the slug gets rendered from a markdown file or an HTML template."""
+
+    name: str
+    """The slug of the markdown file, e.g. `articles/index`, or the name of the template."""
+
+
+def _is_valid_markdown_slug(slug: str) -> bool:
+    return not any(piece in ("", ".", "..") for piece in slug.split("/"))
+
+
+def get_potential_templates(slug: str, site: Site | None) -> list[str]:
+    """
+    Gets the templates named after the slug in the order they are looked for. Wildcard templates
+    are looked for after these in the `TemplateTrie`.
+    """
+
+    slug_with_index = f"{slug}/index"
+    potential_templates = []
+
+    if site and site.is_custom:
+        potential_templates.extend(
+            [
+                f"{site.folder}/templates/{slug}.html",
+                f"{site.folder}/templates/{slug_with_index}.html",
+            ]
+        )
+
+    # Typical templates based on the slug
+    potential_templates.extend([f"{slug}.html", f"{slug_with_index}.html"])
+
+    return potential_templates
+
+
+def get_template_directories(site: Site | None) -> list[tuple[Path, str]]:
+    """
+    Gets the template directories to index for the site and the prefix of the template names in each.
+
+    The base directory is a template directory for custom sites so that templates can be found as
+    `{site.folder}/templates/{name}`; only the site's `templates` directory is indexed instead of
+    the whole project.
+    """
+
+    base_directory = get_base_directory()
+    directories: list[tuple[Path, str]] = []
+
+    if site and site.is_custom:
+        directories.append((base_directory / site.folder / "templates", f"{site.folder}/templates/"))
+
+    for engine in engines.all():
+        for template_dir in getattr(engine, "template_dirs", []):
+            template_directory = Path(template_dir)
+
+            if template_directory != base_directory:
+                directories.append((template_directory, ""))
+
+    return directories
+
+
+class RouteTable:
+    """
+    Maps slugs to the markdown file or template that renders them.
+
+    Markdown files are looked up in the `ContentIndex`, so a slug never probes the filesystem for
+    files that do not exist. The template that gets selected for a slug is remembered until the
+    template settings change, the same as Django's cached template loader. Templates are always
+    looked for when `DEBUG` is enabled so that new templates get used right away.
+    """
+
+    def __init__(self, maxsize: int = ROUTE_TABLE_SIZE, not_found_maxsize: int = NOT_FOUND_CACHE_SIZE):
+        self._templates = LRUCache(maxsize=maxsize)
+        self._not_found = LRUCache(maxsize=not_found_maxsize)
+        self._not_found_hits = 0
+        self._lock = Lock()
+
+    def _select_template(self, slug: str, site: Site | None, template_trie: TemplateTrie) -> str | None:
+        potential_templates = get_potential_templates(slug, site)
+
+        for potential_template in potential_templates:
+            if template := template_trie.get(potential_template):
+                return template
+
+        try:
+            # Fallback for templates outside of the indexed directories, e.g. from a custom loader
+            logger.debug(f"potential_templates: {potential_templates}")
+            selected_template = select_template(potential_templates)
+            logger.debug(f"selected_template: {selected_template}")
+
+            return selected_template.template.name
+        except TemplateDoesNotExist:
+            pass
+
+        if get_disable_wildcard_templates():
+            return None
+
+        prefix = f"{site.folder}/templates/" if site and site.is_custom else ""
+
+        return template_trie.match(slug, prefix=prefix)
+
+    def resolve(self, slug: str, site: Site | None) -> Route | None:
+        """
+        Gets the route for the slug; `None` if nothing can render it.
+
+        Slugs that nothing can render are remembered until the template tree changes, so repeated
+        requests for a missing slug only look in the content index.
+        """
+
+        content_index = get_content_index(site=site)
+
+        if _is_valid_markdown_slug(slug):
+            for markdown_slug in (slug, f"{slug}/index"):
+                if content_index.get(markdown_slug):
+                    return Route(is_markdown=True, name=markdown_slug)
+
+        key = (str(content_index.content_directory), slug)
+
+        if settings.DEBUG:
+            template = self._select_template(slug, site, get_template_trie(get_template_directories(site)))
+
+            return Route(is_markdown=False, name=template) if template else None
+
+        if template := self._templates.get(key):
+            return Route(is_markdown=False, name=template)
+
+        template_trie = get_template_trie(get_template_directories(site))
+
+        if self._not_found.get(key) == template_trie.version:
+            with self._lock:
+                self._not_found_hits += 1
+
+            return None
+
+        template = self._select_template(slug, site, template_trie)
+
+        if template is None:
+            self._not_found.set(key, template_trie.version)
+
+            return None
+
+        self._templates.set(key, template)
+        self._not_found.delete(key)
+
+        return Route(is_markdown=False, name=template)
+
+    def clear(self) -> None:
+        self._templates.clear()
+        self._not_found.clear()
+
+    def stats(self) -> dict:
+        """
+        Counters for the remembered templates and missing slugs, e.g. to monitor requests for missing
+        slugs.
+        """
+
+        return {
+            "templates": self._templates.stats(),
+            "not_found": self._not_found.stats(),
+            "not_found_hits": self._not_found_hits,
+        }
+
+
+route_table = RouteTable()
+
+
+@receiver(setting_changed)
+def _clear_route_table_on_setting_changed(*, setting: str, **kwargs) -> None:  # noqa: ARG001
+    if setting in TEMPLATE_SETTINGS:
+        route_table.clear()
@@ -1,3 +1,5 @@
+import heapq
+
 from django import template
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import Http404
@@ -10,11 +12,18 @@ from django.templatetags.static import StaticNode
 from django.utils.safestring import SafeString, mark_safe
 
 from coltrane.config.settings import get_config
-from coltrane.renderer import MarkdownRenderer
-from coltrane.retriever import get_content_directory, get_content_paths
+from coltrane.content_index import ContentIndex, ContentIndexEntry, get_content_index
+from coltrane.dependencies import add_file_dependency, add_static_dependency, is_recording_dependencies
+from coltrane.renderer import DEFAULT_TEMPLATE, MarkdownRenderer
+from coltrane.utils import LRUCache
 
 register = template.Library()
 
+DIRECTORY_CONTENTS_CACHE_SIZE = 256
+
+# Results of `directory_contents` with the generation of the content index they were built from
+directory_contents_cache = LRUCache(maxsize=DIRECTORY_CONTENTS_CACHE_SIZE)
+
 
 class NoParentError(Exception):
     pass
@@ -47,13 +56,83 @@ def _is_content_slug_in_string(content_slug: str, slugs: str | None) -> bool:
     return False
 
 
+def _parse_order_by(order_by: str | None) -> tuple[tuple[str, bool], ...]:
+    """
+    Parses a comma-delimited list of metadata keys to order by, e.g. `-publish_date,title`, into
+    tuples of the key and whether it gets sorted in descending order.
+    """
+
+    fields = []
+
+    for value in (order_by or "").split(","):
+        value = value.strip()  # noqa: PLW2901
+        is_reverse = value.startswith("-")
+
+        if name := value.lstrip("-"):
+            fields.append((name, is_reverse))
+
+    return tuple(fields)
+
+
+def _get_directory_contents(
+    content_index: ContentIndex,
+    directory: str,
+    *,
+    exclude: str | None,
+    order_by: str | None,
+    limit: int | None,
+    offset: int,
+) -> list[dict]:
+    contents: list[tuple[ContentIndexEntry, dict]] = []
+
+    for entry in content_index.get_entries(directory, refresh=False):
+        if entry.path.name != "index.md":
+            if _is_content_slug_in_string(content_slug=entry.slug, slugs=exclude):
+                continue
+
+            metadata = entry.metadata
+
+            if "template" not in metadata:
+                metadata["template"] = DEFAULT_TEMPLATE
+
+            metadata["slug"] = entry.slug
+
+            contents.append((entry, metadata))
+
+    end = offset + limit if limit is not None else None
+
+    if (order_by_fields := _parse_order_by(order_by)) and contents:
+
+        def _directory_content_sorter(content: tuple[ContentIndexEntry, dict]) -> tuple:
+            (entry, metadata) = content
+
+            return entry.get_sort_key(order_by_fields, metadata)
+
+        if end is not None and end < len(contents):
+            # Only select the top items instead of sorting all of the contents
+            contents = heapq.nsmallest(end, contents, key=_directory_content_sorter)
+        else:
+            contents.sort(key=_directory_content_sorter)
+
+    return [metadata for (_, metadata) in contents[offset:end]]
+
+
 @register.simple_tag(takes_context=True)
 def directory_contents(
-    context, directory: str | None = None, exclude: str | None = None, order_by=None
+    context,
+    directory: str | None = None,
+    exclude: str | None = None,
+    order_by=None,
+    *,
+    limit: int | None = None,
+    offset: int = 0,
 ) -> list[dict[str, str]]:
     """
     Returns a list of content metadata for a particular directory. Useful for
     listing links to content.
+
+    The results are cached in-process until the content in the directory changes. `limit` and
+    `offset` only return part of the results, e.g. the 10 latest articles.
     """
 
     request = context["request"]
@@ -69,41 +148,39 @@ def directory_contents(
     if directory and directory.startswith("/"):
         directory = directory[1:]
 
-    content_paths = get_content_paths(request, str(directory))
-    contents = []
+    content_index = get_content_index(site=site)
 
-    for path in content_paths:
-        if path.name != "index.md":
-            path_slug = path.name[:-3]
-            content_slug = path_slug
-            content_directory = get_content_directory()
+    if not content_index.has_directory(str(directory)):
+        raise FileNotFoundError(f"Directory does not exist: {directory}")
 
-            if directory:
-                content_slug = f"{directory}/{path_slug}"
-                content_directory = content_directory / directory
+    limit = int(limit) if limit is not None else None
+    offset = int(offset or 0)
 
-            if _is_content_slug_in_string(content_slug=content_slug, slugs=exclude):
-                continue
-
-            (_, metadata) = MarkdownRenderer.instance().get_html_and_markdown(content_slug, site)
-
-            contents.append(metadata)
-
-    if order_by and contents:
-        is_reverse = False
+    # Re-validate the directory so that changed files invalidate the cached results; only throttled
+    # when `REFRESH_SECONDS` is set
+    content_index.refresh(str(directory))
+    generation = content_index.generation
 
-        if order_by[0] == "-":
-            is_reverse = order_by[0] == "-"
-            order_by = order_by[1:]
+    cache_key = (str(content_index.content_directory), str(directory).strip("/"), exclude, order_by, limit, offset)
+    cached_value = directory_contents_cache.get(cache_key)
 
-        def _directory_content_sorter(_metadata: dict) -> str:
-            value = _metadata.get(order_by, "") or ""
+    if cached_value and cached_value[0] == generation:
+        contents = cached_value[1]
+    else:
+        contents = _get_directory_contents(
+            content_index, str(directory), exclude=exclude, order_by=order_by, limit=limit, offset=offset
+        )
+        directory_contents_cache.set(cache_key, (generation, contents))
 
-            return str(value)
+    if is_recording_dependencies():
+        # Content that gets added, removed or changed in the directory changes the rendered page
+        for path, mtime_ns in content_index.get_modified_times(str(directory)).items():
+            add_file_dependency(path, mtime_ns=mtime_ns)
 
-        contents.sort(key=_directory_content_sorter, reverse=is_reverse)
+    # Copy the metadata because the cached contents are shared between renders
+    renderer = MarkdownRenderer.instance()
 
-    return contents
+    return [renderer._copy_metadata(metadata) for metadata in contents]
 
 
 @register.filter(name="parent")
@@ -159,6 +236,7 @@ class IncludeMarkdownNode(Node):
             template = context.template.engine.select_template((template_name,))
             cache[template_name] = template
 
+        add_file_dependency(template.origin.name)
         (html, metadata) = MarkdownRenderer.instance().render_markdown_path(template.origin.name)
 
         for c in context:
@@ -250,6 +328,8 @@ class IncludeNode(Node):
                     template = select_template([original_template_name])
                     cache[template_name] = template
 
+                    add_file_dependency(template.origin.name)
+
                     values = {name: var.resolve(context) for name, var in self.extra_context.items()}
 
                     with context.push(**values):
@@ -259,6 +339,8 @@ class IncludeNode(Node):
         elif hasattr(template, "template"):
             template = template.template
 
+        add_file_dependency(template.origin.name)
+
         values = {name: var.resolve(context) for name, var in self.extra_context.items()}
 
         if self.isolated_context:
@@ -413,7 +495,10 @@ class ColtraneStaticNode(StaticNode):
             if site.is_custom:
                 path = f"{site.folder}/{path}"
 
-        return self.handle_simple(path)
+        url = self.handle_simple(path)
+        add_static_dependency(path, url)
+
+        return url
 
 
 @register.tag("static")
@@ -468,6 +553,7 @@ class ExtendsNode(Node):
             skip=history,
         )
         history.append(origin)
+        add_file_dependency(origin.name)
 
         return template
 
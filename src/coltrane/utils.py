@@ -1,13 +1,49 @@
 import logging
+from collections import OrderedDict
+from collections.abc import Hashable
 from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from functools import wraps
+from functools import cache, wraps
+from hashlib import blake2b
+from os import fsync, replace, umask
+from pathlib import Path
+from stat import S_IMODE
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Any
 
 import dateparser
 from django.utils.timezone import get_current_timezone, is_naive, make_aware
 
 logger = logging.getLogger(__name__)
 
+BLAKE2B_DIGEST_SIZE = 16
+
+
+@cache
+def _get_xxhash():
+    try:
+        import xxhash
+
+        return xxhash
+    except ImportError:
+        pass
+
+    return None
+
+
+def get_file_hash(content: bytes) -> str:
+    """
+    Gets a fast, non-cryptographic hash of the file contents. Uses `xxhash` if it is installed,
+    otherwise BLAKE2b with a small digest. The hash is prefixed with the algorithm so that hashes
+    created by different algorithms never match.
+    """
+
+    if xxhash := _get_xxhash():
+        return f"xxh3:{xxhash.xxh3_128_hexdigest(content)}"
+
+    return f"blake2b:{blake2b(content, digest_size=BLAKE2B_DIGEST_SIZE).hexdigest()}"
+
 
 def dict_merge(
     source: dict,
@@ -68,6 +104,53 @@ def convert_to_datetime(obj: str | int | datetime | date) -> datetime:
     return dt
 
 
+class ReverseSortKey:
+    """
+    Wraps a sort key so that it sorts in descending order when it is part of a tuple of keys.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ReverseSortKey) and self.key == other.key
+
+    def __lt__(self, other: "ReverseSortKey") -> bool:
+        return other.key < self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"ReverseSortKey({self.key!r})"
+
+
+def get_sort_key(value: Any) -> tuple[int, Any]:
+    """
+    Gets a key to sort a metadata value by its type, so numbers and dates do not get compared as
+    strings. Missing values sort first, then numbers, dates, and strings.
+    """
+
+    if value is None or value == "":
+        return (0, "")
+
+    if isinstance(value, bool):
+        return (1, int(value))
+
+    if isinstance(value, int | float):
+        return (1, value)
+
+    if isinstance(value, datetime | date):
+        return (2, convert_to_datetime(value))
+
+    if isinstance(value, str):
+        return (3, value)
+
+    return (3, str(value))
+
+
 def threadpool(func):
     """
     A decorator to convert a regular function so that it gets run in another thread.
@@ -88,3 +171,118 @@ def threadpool(func):
         return ThreadPoolExecutor().submit(func, *args, **kwargs)
 
     return wrap
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe, least-recently-used in-process cache.
+
+    Keeps `hits`, `misses` and `evictions` counters so the size can be tuned per worker.
+    A `maxsize` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets the value for `key` and marks it as the most recently used.
+        """
+
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Sets the value for `key` and evicts the least recently used items if the cache is full.
+        """
+
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Current counters and size of the cache.
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _get_file_mode(path: Path) -> int:
+    """
+    Gets the permissions of the existing file or the default permissions for a new file based on the
+    umask, because temporary files are only readable by their owner.
+    """
+
+    try:
+        return S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        current_umask = umask(0)
+        umask(current_umask)
+
+        return 0o666 & ~current_umask
+
+
+def atomic_write_bytes(path: Path, content: bytes) -> None:
+    """
+    Writes the content to a temporary file in the same directory and then renames it over the path,
+    so the file is never left partially written if the process crashes or the power goes out.
+    """
+
+    temporary_file = NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False)
+
+    try:
+        with temporary_file:
+            temporary_file.write(content)
+            temporary_file.flush()
+            fsync(temporary_file.fileno())
+
+        Path(temporary_file.name).chmod(_get_file_mode(path))
+        replace(temporary_file.name, path)
+    except BaseException:
+        Path(temporary_file.name).unlink(missing_ok=True)
+        raise
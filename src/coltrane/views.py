@@ -1,27 +1,44 @@
 import logging
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from hashlib import blake2b
+from http import HTTPStatus
 
 from django.contrib.sitemaps.views import _get_latest_lastmod, x_robots_tag
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.paginator import EmptyPage, PageNotAnInteger
 from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
-from django.template import TemplateDoesNotExist
-from django.template.loader import select_template
+from django.template.loader import get_template
 from django.template.response import TemplateResponse
-from django.utils.cache import patch_response_headers
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_response_headers
 from django.utils.http import http_date
 from django.utils.timezone import now
 
 from coltrane.config.cache import ViewCache
+from coltrane.config.coltrane import Site
 from coltrane.config.paths import get_file_path
-from coltrane.config.settings import get_config, get_disable_wildcard_templates
+from coltrane.config.settings import get_conditional_get, get_config
+from coltrane.dependencies import (
+    DependencyChecker,
+    add_file_dependency,
+    get_last_modified,
+    is_recording_dependencies,
+    record_dependencies,
+)
 from coltrane.renderer import MarkdownRenderer
 from coltrane.retriever import get_data
+from coltrane.routes import route_table
 from coltrane.sitemaps import ContentSitemap
-from coltrane.wildcard_templates import get_potential_wildcard_templates
+from coltrane.utils import LRUCache
 
 logger = logging.getLogger(__name__)
 
+SOURCE_DEPENDENCIES_CACHE_SIZE = 1024
+
+# The files used the last time each slug was rendered; used for conditional GET
+source_dependencies = LRUCache(maxsize=SOURCE_DEPENDENCIES_CACHE_SIZE)
+
 
 def _normalize_slug(slug: str) -> str:
     if slug is None:
@@ -39,18 +56,19 @@ def _normalize_slug(slug: str) -> str:
     return slug
 
 
-def _get_from_cache_if_enabled(slug: str) -> tuple[str, dict]:
+def _get_from_cache_if_enabled(slug: str, refresh: Callable[[], tuple[str, dict]] | None = None) -> tuple[str, dict]:
     """
-    Gets the slug from the cache if it's enabled.
+    Gets the slug from the cache if it's enabled. Stale values get refreshed in the background with
+    `refresh`.
     """
 
     template: str = ""
     context: dict = {}
     view_cache = ViewCache()
 
-    if view_cache.is_enabled:
+    if view_cache.is_enabled and not view_cache.is_response_mode:
         cache_key = f"{view_cache.cache_key_namespace}{slug}"
-        cached_value = view_cache.cache.get(cache_key)
+        cached_value = view_cache.get(cache_key, refresh=refresh)
 
         if cached_value:
             (template, context) = cached_value
@@ -65,107 +83,264 @@ def _set_in_cache_if_enabled(slug: str, template: str, context: dict) -> None:
 
     view_cache = ViewCache()
 
-    if view_cache.is_enabled:
+    if view_cache.is_enabled and not view_cache.is_response_mode:
         cache_key = f"{view_cache.cache_key_namespace}{slug}"
-        view_cache.cache.set(
-            cache_key,
-            (template, context),
-            view_cache.seconds,
-        )
+        view_cache.set(cache_key, (template, context))
 
 
-def _render_markdown_for_potential_slugs(potential_slugs: list[str], request: HttpRequest):
-    for slug in potential_slugs:
-        try:
-            (template, context) = MarkdownRenderer.instance().render_markdown(slug, request=request)
+def _is_response_cacheable_request(request: HttpRequest) -> bool:
+    """
+    Whether the response for the request can be stored in or served from the view cache. Only
+    `GET` and `HEAD` requests without a query string are cached because the cache key is only based
+    on the slug.
+    """
 
-            return (template, context)
-        except FileNotFoundError:
-            pass
+    return request.method in ("GET", "HEAD") and not request.META.get("QUERY_STRING")
 
-    raise FileNotFoundError()
 
+def _get_response_cache_key(view_cache: ViewCache, slug: str, site: Site | None) -> str:
+    folder = site.folder if site else ""
 
-def content(request: HttpRequest, slug: str = "index") -> HttpResponse:
-    """Renders the markdown file stored in `content` or HTML template based on the slug from the URL.
-    Adds data into the context from JSON files in the `data` directory.
+    return f"{view_cache.cache_key_namespace}response:{folder}:{slug}"
 
-    Will cache the rendered content if enabled.
+
+def _get_response_from_cache_if_enabled(
+    request: HttpRequest, slug: str, site: Site | None, *, refresh_if_stale: bool = True
+) -> HttpResponse | None:
+    """
+    Gets the rendered response from the cache if the view cache is in `response` mode. Returns a
+    304 if the ETag of the cached response matches the request's `If-None-Match` header. Stale
+    responses get re-rendered in the background.
     """
 
-    logger.debug(f"request: {request}")
+    view_cache = ViewCache()
 
-    config = get_config()
-    logger.debug(f"config: {config}")
+    if not view_cache.is_response_mode or not _is_response_cacheable_request(request):
+        return None
 
-    site = config.get_site(request)
-    logger.debug(f"site: {site}")
+    def _refresh():
+        (response, _) = _render_content(request, slug, site)
 
-    template: str = ""
-    context: dict = {}
-    slug = _normalize_slug(slug)
-    slug_with_index = f"{slug}/index"
+        return _get_response_cache_value(request, response)
 
-    (template, context) = _get_from_cache_if_enabled(slug)
-    set_in_cache = False
+    cached_value = view_cache.get(
+        _get_response_cache_key(view_cache, slug, site),
+        refresh=_refresh if refresh_if_stale else None,
+    )
 
-    try:
-        if not template or not context:
-            set_in_cache = True
-            potential_slugs = []
+    if not cached_value:
+        return None
 
-            potential_slugs.extend([slug, slug_with_index])
-            logger.debug(f"potential_slugs: {potential_slugs}")
+    (content, content_type, etag) = cached_value
 
-            (template, context) = _render_markdown_for_potential_slugs(potential_slugs=potential_slugs, request=request)
+    response = get_conditional_response(request, etag=etag)
 
-            template = site.get_template_name(template_name=template, verify=True)
-    except FileNotFoundError:
-        potential_templates = []
+    if response is None:
+        response = HttpResponse(content, content_type=content_type)
 
-        if site and site.is_custom:
-            potential_templates.extend(
-                [
-                    f"{site.folder}/templates/{slug}.html",
-                    f"{site.folder}/templates/{slug_with_index}.html",
-                ]
-            )
+    response.headers["ETag"] = etag
+    _patch_cache_headers(response, view_cache)
 
-        # Typical templates based on the slug
-        potential_templates.extend([f"{slug}.html", f"{slug_with_index}.html"])
+    return response
 
-        if get_disable_wildcard_templates() is False:
-            potential_wildcard_templates = get_potential_wildcard_templates(slug)
 
-            if site and site.is_custom:
-                potential_wildcard_templates = [f"{site.folder}/templates/{t}" for t in potential_wildcard_templates]
-                potential_templates.extend(potential_wildcard_templates)
-            else:
-                potential_templates.extend(potential_wildcard_templates)
+def _patch_cache_headers(response: HttpResponse, view_cache: ViewCache) -> None:
+    patch_response_headers(response, cache_timeout=view_cache.seconds)
+
+    if view_cache.stale_seconds:
+        patch_cache_control(response, stale_while_revalidate=view_cache.stale_seconds)
+
+
+def _get_response_cache_value(request: HttpRequest, response: HttpResponse) -> tuple[bytes, str, str] | None:
+    """
+    Gets the content, content type and a strong ETag of the content to cache for the response.
+
+    Responses that are specific to the request never get cached, i.e. responses that use a CSRF
+    token or the session (`CsrfViewMiddleware` and `SessionMiddleware` set the cookie and `Vary`
+    header after the view returns, so the response does not have them yet), set cookies or vary on
+    request headers.
+    """
+
+    if (
+        response.status_code != HTTPStatus.OK
+        or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        or (hasattr(request, "session") and (request.session.accessed or request.session.modified))
+        or response.cookies
+        or response.has_header("Vary")
+    ):
+        return None
+
+    etag = f'"{blake2b(response.content, digest_size=16).hexdigest()}"'
+
+    return (response.content, response.headers["Content-Type"], etag)
+
+
+def _set_response_in_cache_if_enabled(
+    request: HttpRequest, response: HttpResponse, slug: str, site: Site | None
+) -> None:
+    """
+    Sets the rendered response and a strong ETag of its content in the cache if the view cache is
+    in `response` mode.
+    """
+
+    view_cache = ViewCache()
+
+    if not view_cache.is_response_mode or not _is_response_cacheable_request(request):
+        return
+
+    if cached_value := _get_response_cache_value(request, response):
+        response.headers["ETag"] = cached_value[2]
+        view_cache.set(_get_response_cache_key(view_cache, slug, site), cached_value)
+
+
+def _render_markdown(markdown_slug: str, request: HttpRequest, site: Site | None = None) -> tuple[str, dict]:
+    (template, context) = MarkdownRenderer.instance().render_markdown(markdown_slug, request=request)
+
+    if is_recording_dependencies():
+        add_file_dependency(get_file_path(f"{markdown_slug}.md", site=site))
+
+    return (template, context)
+
+
+def _get_source_dependencies_key(slug: str, site: Site | None) -> tuple[str, str]:
+    return (site.folder if site else "", slug)
+
+
+def _get_not_modified_response_if_enabled(request: HttpRequest, slug: str, site: Site | None) -> HttpResponse | None:
+    """
+    Gets a 304 response if conditional GET is enabled and none of the files used the last time the
+    slug was rendered have changed since the validators in the request.
+    """
+
+    if not get_conditional_get():
+        return None
+
+    dependencies = source_dependencies.get(_get_source_dependencies_key(slug, site))
+
+    if not dependencies or DependencyChecker().has_changed(dependencies):
+        return None
+
+    (etag, last_modified) = _get_source_validators(dependencies)
+
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _get_source_validators(dependencies: dict[str, int | str]) -> tuple[str, int | None]:
+    """
+    Gets a weak ETag and the last modified timestamp based on the files used to render content.
+    """
+
+    digest = blake2b(repr(sorted(dependencies.items())).encode(), digest_size=16).hexdigest()
+    last_modified = get_last_modified(dependencies)
+
+    return (f'W/"{digest}"', int(last_modified) if last_modified is not None else None)
 
-        try:
-            logger.debug(f"potential_templates: {potential_templates}")
-            selected_template = select_template(potential_templates)
 
-            logger.debug(f"selected_template: {selected_template}")
-            template = selected_template.template.name
-            logger.debug(f"template: {template}")
-        except TemplateDoesNotExist:
+def _set_source_validators_if_enabled(
+    response: HttpResponse, slug: str, site: Site | None, dependencies: dict[str, int | str] | None
+) -> None:
+    """
+    Stores the files used to render the slug and sets `ETag` and `Last-Modified` headers based on them
+    if conditional GET is enabled.
+    """
+
+    if not get_conditional_get() or dependencies is None or response.status_code != HTTPStatus.OK:
+        return
+
+    source_dependencies.set(_get_source_dependencies_key(slug, site), dependencies)
+
+    (etag, last_modified) = _get_source_validators(dependencies)
+    response.headers["ETag"] = etag
+
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def _fill_lock_if_enabled(slug: str, site: Site | None, *, is_response: bool) -> AbstractContextManager[bool]:
+    """
+    Gets a lock so that only one request fills the view cache for the slug at a time. See
+    `Cache.fill_lock`.
+    """
+
+    view_cache = ViewCache()
+
+    if not view_cache.is_enabled or view_cache.is_response_mode != is_response:
+        return nullcontext(False)
+
+    if is_response:
+        return view_cache.fill_lock(_get_response_cache_key(view_cache, slug, site))
+
+    return view_cache.fill_lock(f"{view_cache.cache_key_namespace}{slug}")
+
+
+def _get_template_and_context(request: HttpRequest, slug: str, site: Site | None) -> tuple[str, dict]:
+    """
+    Renders the markdown file for the slug or finds the HTML template for the slug.
+
+    Returns:
+        Tuple of template name and context dictionary.
+    """
+
+    route = route_table.resolve(slug, site)
+    logger.debug(f"route: {route}")
+
+    if route is None:
+        raise Http404(f"{slug} cannot be found")
+
+    if route.is_markdown:
+        try:
+            (template, context) = _render_markdown(route.name, request=request, site=site)
+        except FileNotFoundError:
+            # The markdown file was removed after the content index was checked
             raise Http404(f"{slug} cannot be found") from None
 
-        context.update(
-            {
-                "data": get_data(site=site),
-                "slug": slug,
-                "template": template,
-                "now": now(),
-            }
-        )
+        template = site.get_template_name(template_name=template, verify=True)
 
-    if set_in_cache:
-        _set_in_cache_if_enabled(slug, template, context)
+        return (template, context)
 
-    context["site"] = str(site) if site else None
+    template = route.name
+
+    if is_recording_dependencies():
+        # A markdown file that gets added for the slug would be rendered instead of the template
+        add_file_dependency(get_file_path(slug, site=site).parent)
+
+    context = {
+        "data": get_data(site=site),
+        "slug": slug,
+        "template": template,
+        "now": now(),
+    }
+
+    return (template, context)
+
+
+def _render_content(request: HttpRequest, slug: str, site: Site | None) -> tuple[HttpResponse, bool]:
+    """
+    Renders the markdown file or HTML template for the slug.
+
+    Returns:
+        Tuple of the response and whether the content was actually rendered, i.e. it did not come
+        from the view cache.
+    """
+
+    (template, context) = _get_from_cache_if_enabled(
+        slug, refresh=lambda: _get_template_and_context(request, slug, site)
+    )
+    is_rendered = False
+
+    if not template or not context:
+        with _fill_lock_if_enabled(slug, site, is_response=False) as waited:
+            if waited:
+                # Another request might have just filled the cache
+                (template, context) = _get_from_cache_if_enabled(slug)
+
+            if not template or not context:
+                (template, context) = _get_template_and_context(request, slug, site)
+                _set_in_cache_if_enabled(slug, template, context)
+                is_rendered = True
+
+    # Copy the context because it could be shared with the in-process view cache
+    context = {**context, "site": str(site) if site else None}
 
     logger.debug(f"template: {template}")
 
@@ -175,10 +350,52 @@ def content(request: HttpRequest, slug: str = "index") -> HttpResponse:
         context=context,
     )
 
-    view_cache = ViewCache()
+    if is_recording_dependencies():
+        add_file_dependency(get_template(template).origin.name)
+
+    return (response, is_rendered)
+
+
+def content(request: HttpRequest, slug: str = "index") -> HttpResponse:
+    """Renders the markdown file stored in `content` or HTML template based on the slug from the URL.
+    Adds data into the context from JSON files in the `data` directory.
+
+    Will cache the rendered content if enabled.
+    """
+
+    logger.debug(f"request: {request}")
+
+    config = get_config()
+    logger.debug(f"config: {config}")
+
+    site = config.get_site(request)
+    logger.debug(f"site: {site}")
+
+    slug = _normalize_slug(slug)
+
+    if cached_response := _get_response_from_cache_if_enabled(request, slug, site):
+        return cached_response
+
+    if not_modified_response := _get_not_modified_response_if_enabled(request, slug, site):
+        return not_modified_response
+
+    with _fill_lock_if_enabled(slug, site, is_response=True) as waited:
+        # Another request might have just filled the cache
+        if waited and (
+            cached_response := _get_response_from_cache_if_enabled(request, slug, site, refresh_if_stale=False)
+        ):
+            return cached_response
+
+        with record_dependencies() if get_conditional_get() else nullcontext() as dependencies:
+            (response, is_rendered) = _render_content(request, slug, site)
+
+        _set_source_validators_if_enabled(response, slug, site, dependencies if is_rendered else None)
+
+        view_cache = ViewCache()
 
-    if view_cache.is_enabled:
-        patch_response_headers(response, cache_timeout=view_cache.seconds)
+        if view_cache.is_enabled:
+            _set_response_in_cache_if_enabled(request, response, slug, site)
+            _patch_cache_headers(response, view_cache)
 
     return response
 
@@ -1,4 +1,10 @@
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import count
+from os import scandir
+from os import stat as os_stat
+from pathlib import Path
+from threading import Lock
 
 
 @dataclass
@@ -43,8 +49,16 @@ def _sort_potential_templates(template_paths):
     return [r.path for r in rankings]
 
 
-def get_potential_wildcard_templates(slug: str) -> list[str]:
-    """Get a list of potential wildcard HTML templates based on the slug."""
+WILDCARD = "*"
+TEMPLATE_EXTENSION = ".html"
+WILDCARD_PATTERNS_CACHE_SIZE = 32
+
+# Incremented for every `TemplateTrie` that gets built
+template_trie_versions = count(1)
+
+
+def _generate_potential_wildcard_templates(slug: str) -> list[str]:
+    """Generate and sort the list of potential wildcard HTML templates based on the slug."""
 
     wildcard_paths = []
 
@@ -95,3 +109,224 @@ def get_potential_wildcard_templates(slug: str) -> list[str]:
     potential_templates = _sort_potential_templates(potential_templates)
 
     return potential_templates
+
+
+@lru_cache(maxsize=WILDCARD_PATTERNS_CACHE_SIZE)
+def _get_wildcard_patterns(slug_pieces_count: int) -> tuple[tuple[int | None, ...], ...]:
+    """
+    Gets the ranked wildcard patterns for a slug with a number of pieces. Each pattern has the index
+    of the slug piece to use for each part of the template name, or `None` for a wildcard.
+
+    The ranking only depends on where the wildcards are, so the potential templates get generated
+    and sorted once per number of pieces for a placeholder slug of the piece indexes, e.g. `0/1/2`.
+    """
+
+    placeholder_slug = "/".join(str(idx) for idx in range(slug_pieces_count))
+    patterns = []
+
+    for potential_template in _generate_potential_wildcard_templates(placeholder_slug):
+        pieces = potential_template[: -len(TEMPLATE_EXTENSION)].split("/")
+        patterns.append(tuple(None if piece == WILDCARD else int(piece) for piece in pieces))
+
+    return tuple(patterns)
+
+
+def get_potential_wildcard_templates(slug: str) -> list[str]:
+    """Get a list of potential wildcard HTML templates based on the slug."""
+
+    slug_pieces = slug.split("/")
+
+    if WILDCARD in slug_pieces:
+        # A literal asterisk in the slug gets ranked like a wildcard
+        return _generate_potential_wildcard_templates(slug)
+
+    return [
+        "/".join(WILDCARD if idx is None else slug_pieces[idx] for idx in pattern) + TEMPLATE_EXTENSION
+        for pattern in _get_wildcard_patterns(len(slug_pieces))
+    ]
+
+
+@lru_cache(maxsize=WILDCARD_PATTERNS_CACHE_SIZE)
+def _get_wildcard_ranks(slug_pieces_count: int) -> dict[tuple[bool, ...], int]:
+    """
+    Gets the precedence of each wildcard pattern for a slug with a number of pieces. Patterns are
+    keyed on whether each piece is a wildcard; the lowest rank wins.
+    """
+
+    ranks: dict[tuple[bool, ...], int] = {}
+
+    for pattern in _get_wildcard_patterns(slug_pieces_count):
+        # Skip patterns that could never match every piece of the slug in place
+        if len(pattern) != slug_pieces_count:
+            continue
+
+        if any(idx is not None and idx != position for position, idx in enumerate(pattern)):
+            continue
+
+        ranks.setdefault(tuple(idx is None for idx in pattern), len(ranks))
+
+    return ranks
+
+
+class TemplateTrieNode:
+    __slots__ = ("children", "template")
+
+    def __init__(self):
+        self.children: dict[str, TemplateTrieNode] = {}
+        self.template: str | None = None
+
+
+class TemplateTrie:
+    """
+    An in-memory index of the HTML templates in template directories, keyed on the pieces of their
+    names. Finds the best wildcard template for a slug by walking the trie once instead of looking
+    for every potential wildcard template in every template directory.
+    """
+
+    def __init__(self, directories: list[tuple[Path, str]]):
+        """
+        Args:
+            directories: Tuples of a template directory and the prefix of the template names in it.
+        """
+
+        self.directories = directories
+        self.root = TemplateTrieNode()
+        self.version = next(template_trie_versions)
+
+        self._directory_mtimes: dict[str, int | None] = {}
+
+        for directory, prefix in directories:
+            self._add_directory(directory, prefix)
+
+    def _add_directory(self, directory: Path, prefix: str) -> None:
+        directories = [(directory, prefix)]
+
+        while directories:
+            (current_directory, current_prefix) = directories.pop()
+
+            try:
+                self._directory_mtimes[str(current_directory)] = os_stat(current_directory).st_mtime_ns
+
+                with scandir(current_directory) as dir_entries:
+                    for dir_entry in dir_entries:
+                        if dir_entry.is_dir():
+                            directories.append((Path(dir_entry.path), f"{current_prefix}{dir_entry.name}/"))
+                        elif dir_entry.name.endswith(TEMPLATE_EXTENSION) and dir_entry.is_file():
+                            self.add(f"{current_prefix}{dir_entry.name}")
+            except OSError:
+                self._directory_mtimes[str(current_directory)] = None
+
+    def add(self, template_name: str) -> None:
+        """
+        Adds a template to the trie; the first template added with a name wins like the first
+        template directory does in Django.
+        """
+
+        node = self.root
+
+        for piece in template_name[: -len(TEMPLATE_EXTENSION)].split("/"):
+            node = node.children.setdefault(piece, TemplateTrieNode())
+
+        if node.template is None:
+            node.template = template_name
+
+    def _get_node(self, pieces: list[str]) -> TemplateTrieNode | None:
+        node: TemplateTrieNode | None = self.root
+
+        for piece in pieces:
+            if node is None:
+                break
+
+            node = node.children.get(piece)
+
+        return node
+
+    def has_changed(self) -> bool:
+        """
+        Whether a template directory changed since the trie was built, e.g. a template was added.
+        """
+
+        for directory, mtime_ns in self._directory_mtimes.items():
+            try:
+                current_mtime_ns: int | None = os_stat(directory).st_mtime_ns
+            except OSError:
+                current_mtime_ns = None
+
+            if current_mtime_ns != mtime_ns:
+                return True
+
+        return False
+
+    def get(self, template_name: str) -> str | None:
+        """
+        Gets the template if it is in the trie.
+        """
+
+        node = self._get_node(template_name[: -len(TEMPLATE_EXTENSION)].split("/"))
+
+        return node.template if node else None
+
+    def match(self, slug: str, prefix: str = "") -> str | None:
+        """
+        Gets the wildcard template with the highest precedence for the slug.
+
+        Args:
+            slug: The slug, e.g. `articles/some-article`.
+            prefix: The prefix of the template names to look in, e.g. `site/templates/`.
+        """
+
+        node = self._get_node([piece for piece in prefix.split("/") if piece])
+
+        if node is None:
+            return None
+
+        slug_pieces = slug.split("/")
+        ranks = _get_wildcard_ranks(len(slug_pieces))
+        best: tuple[int, str] | None = None
+        nodes: list[tuple[TemplateTrieNode, tuple[bool, ...]]] = [(node, ())]
+
+        while nodes:
+            (current_node, wildcards) = nodes.pop()
+            depth = len(wildcards)
+
+            if depth == len(slug_pieces):
+                rank = ranks.get(wildcards)
+
+                if current_node.template and rank is not None and (best is None or rank < best[0]):
+                    best = (rank, current_node.template)
+
+                continue
+
+            if child := current_node.children.get(slug_pieces[depth]):
+                nodes.append((child, (*wildcards, False)))
+
+            if slug_pieces[depth] != WILDCARD and (child := current_node.children.get(WILDCARD)):
+                nodes.append((child, (*wildcards, True)))
+
+        return best[1] if best else None
+
+
+# Template tries that are cached in the module keyed on the template directories
+template_tries: dict[tuple[tuple[Path, str], ...], TemplateTrie] = {}
+template_tries_lock = Lock()
+
+
+def get_template_trie(directories: list[tuple[Path, str]]) -> TemplateTrie:
+    """
+    Gets the `TemplateTrie` for the template directories; re-built if a directory changed.
+    """
+
+    key = tuple(directories)
+    template_trie = template_tries.get(key)
+
+    if template_trie and not template_trie.has_changed():
+        return template_trie
+
+    with template_tries_lock:
+        template_trie = template_tries.get(key)
+
+        if template_trie is None or template_trie.has_changed():
+            template_trie = TemplateTrie(directories)
+            template_tries[key] = template_trie
+
+        return template_trie
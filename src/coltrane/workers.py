@@ -0,0 +1,83 @@
+"""
+Functions that get run in worker processes when building the static site with the `process` executor.
+
+Only import from `coltrane` and `django` inside of the functions because the module gets imported
+in a new worker process before Django has been configured.
+"""
+
+from pathlib import Path
+from typing import Any
+
+
+def get_render_error_message(path: Path, exception: BaseException) -> str:
+    """
+    Gets a user-friendly error message for a markdown file that could not be rendered.
+    """
+
+    error_detail = f"{exception.__class__.__name__}: {exception}"
+
+    if exception.__class__.__name__ == "FastDevVariableDoesNotExist":
+        error_detail = (
+            str(exception)
+            .replace("\n    ", ", ")
+            .replace(":\n, ", ": ")
+            .replace(
+                " does not exist in context.",
+                "' does not exist in template context.",
+            )
+        )[:-1]
+        error_detail = f"'{error_detail}"
+
+    return f"Rendering {path} failed. {error_detail}"
+
+
+def initialize_worker(django_settings: dict[str, Any]) -> None:
+    """
+    Boots Django once for a worker process with the settings of the parent process.
+
+    Forked processes inherit the already configured settings, so this only does anything for
+    processes that are spawned.
+    """
+
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(**django_settings)
+        django.setup()
+
+
+def render_markdown_files(
+    files: list[tuple[Path, bytes | None]],
+) -> list[tuple[Path, str | None, dict[str, int | str], str]]:
+    """
+    Renders a chunk of markdown files into their HTML files in the output directory.
+
+    Args:
+        files: Tuples of the path and the contents of the markdown file if the parent process
+            already read them.
+
+    Returns:
+        A list of tuples of the path, an error message if the file could not be rendered, the
+        dependencies used while rendering, and the hash of the contents that were rendered.
+    """
+
+    from coltrane.dependencies import record_dependencies
+    from coltrane.manifest import ManifestItem
+
+    results: list[tuple[Path, str | None, dict[str, int | str], str]] = []
+
+    for path, content in files:
+        try:
+            item = ManifestItem.create(path, content=content)
+
+            with record_dependencies(hashes=True) as dependencies:
+                rendered_html = item.render_html()
+
+            item.generated_file_path.write_text(rendered_html)
+
+            results.append((path, None, dependencies, item.hash))
+        except Exception as e:
+            results.append((path, get_render_error_message(path, e), {}, ""))
+
+    return results
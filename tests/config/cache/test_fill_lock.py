@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
+from unittest.mock import patch
+
+import pytest
+
+from coltrane.config import cache as cache_module
+from coltrane.config.cache import ViewCache
+
+
+@pytest.fixture
+def locmem_cache(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+
+
+def test_fill_lock_single_flight(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15}}
+
+    view_cache = ViewCache()
+    fill_count = 0
+    barrier = Barrier(5)
+
+    def _get_or_fill():
+        nonlocal fill_count
+
+        barrier.wait()
+
+        if value := view_cache.cache.get("test"):
+            return value
+
+        with view_cache.fill_lock("test") as waited:
+            if waited and (value := view_cache.cache.get("test")):
+                return value
+
+            fill_count += 1
+            sleep(0.1)
+            view_cache.cache.set("test", "filled")
+
+            return "filled"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(lambda _: _get_or_fill(), range(5)))
+
+    assert results == ["filled"] * 5
+    assert fill_count == 1
+    assert cache_module.fill_locks == {}
+
+
+def test_fill_lock_not_waited(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCK": True}}
+
+    view_cache = ViewCache()
+
+    with view_cache.fill_lock("test") as waited:
+        assert waited is False
+        assert view_cache.cache.get("test:lock") is True
+
+    assert view_cache.cache.get("test:lock") is None
+
+
+def test_fill_lock_waits_for_other_process(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCK": True}}
+
+    view_cache = ViewCache()
+
+    # Another process is filling the cache key
+    view_cache.cache.add("test:lock", True)
+
+    with patch("coltrane.config.cache.FILL_WAIT_SECONDS", 0.2), view_cache.fill_lock("test") as waited:
+        assert waited is True
+
+    # The lock of the other process is left alone
+    assert view_cache.cache.get("test:lock") is True
+
+
+def test_fill_lock_without_backend_lock(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15}}
+
+    view_cache = ViewCache()
+
+    with view_cache.fill_lock("test") as waited:
+        assert waited is False
+        assert view_cache.cache.get("test:lock") is None
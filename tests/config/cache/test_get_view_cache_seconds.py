@@ -1,4 +1,5 @@
 import pytest
+from django.core.exceptions import ImproperlyConfigured
 
 from coltrane.config.cache import ViewCache
 
@@ -21,3 +22,26 @@ def test_get_view_cache_seconds_assert_not_enabled(settings):
 
     with pytest.raises(AttributeError):
         view_cache.seconds  # noqa: B018
+
+
+def test_get_view_cache_mode_default(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 123}}
+    view_cache = ViewCache()
+
+    assert view_cache.mode == "context"
+    assert view_cache.is_response_mode is False
+
+
+def test_get_view_cache_mode_response(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 123, "MODE": "response"}}
+    view_cache = ViewCache()
+
+    assert view_cache.mode == "response"
+    assert view_cache.is_response_mode is True
+
+
+def test_get_view_cache_mode_invalid(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 123, "MODE": "invalid"}}
+
+    with pytest.raises(ImproperlyConfigured):
+        ViewCache()
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+import pytest
+
+from coltrane.config import cache as cache_module
+from coltrane.config.cache import DataCache, ViewCache
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+
+    cache_module.versions.clear()
+    cache_module.local_caches.clear()
+
+
+def test_local_cache_disabled(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15}}
+
+    assert ViewCache().local_cache is None
+
+
+def test_local_cache_settings(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10, "SECONDS": 2}}}
+    view_cache = ViewCache()
+
+    assert view_cache.local_cache is not None
+    assert view_cache.local_cache.maxsize == 10
+    assert view_cache.local_seconds == 2
+
+    # The in-process cache is shared between instances
+    assert ViewCache().local_cache is view_cache.local_cache
+
+
+def test_local_cache_hit(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10}}}
+    view_cache = ViewCache()
+
+    view_cache.set("test", "value")
+
+    with patch.object(view_cache.cache, "get", wraps=view_cache.cache.get) as shared_get:
+        assert view_cache.get("test") == "value"
+
+    # Only the version gets checked in the shared cache (and only after `VERSION_CHECK_SECONDS`)
+    assert all(c.args[0] == view_cache.version_key for c in shared_get.call_args_list)
+
+
+def test_local_cache_filled_from_shared_cache(settings):
+    settings.COLTRANE = {"DATA_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10}}}
+    data_cache = DataCache()
+
+    data_cache.cache.set("test", "value", version=data_cache.get_version())
+
+    assert data_cache.get("test") == "value"
+    assert data_cache.local_cache.stats()["size"] == 1
+
+
+def test_local_cache_expired(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10, "SECONDS": 0}}}
+    view_cache = ViewCache()
+
+    view_cache.set("test", "value")
+    view_cache.cache.set("test", "new value", version=view_cache.get_version())
+
+    assert view_cache.get("test") == "new value"
+
+
+def test_invalidate(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10}}}
+    view_cache = ViewCache()
+
+    view_cache.set("test", "value")
+    assert view_cache.get_version() == 1
+
+    view_cache.invalidate()
+
+    assert view_cache.get_version() == 2
+    assert view_cache.get("test") is None
+
+
+def test_invalidate_in_other_process(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "LOCAL": {"SIZE": 10}}}
+    view_cache = ViewCache()
+
+    view_cache.set("test", "value")
+    assert view_cache.get("test") == "value"
+
+    # Another process bumps the version
+    view_cache.cache.incr(view_cache.version_key)
+
+    # The local cache is still used until the version gets checked again
+    assert view_cache.get("test") == "value"
+
+    with patch("coltrane.config.cache.VERSION_CHECK_SECONDS", 0):
+        assert view_cache.get("test") is None
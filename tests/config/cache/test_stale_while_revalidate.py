@@ -0,0 +1,93 @@
+from time import sleep, time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from coltrane.config import cache as cache_module
+from coltrane.config.cache import CacheEntry, DataCache, ViewCache
+
+
+@pytest.fixture
+def locmem_cache(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+
+    cache_module.versions.clear()
+
+
+def _wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+
+        sleep(0.01)
+
+    raise AssertionError("Condition was never met")
+
+
+def test_stale_seconds(settings):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "STALE_SECONDS": 60}}
+
+    assert ViewCache().stale_seconds == 60
+
+
+def test_stale_seconds_default(settings):
+    settings.COLTRANE = {"DATA_CACHE": {"SECONDS": 15}}
+
+    assert DataCache().stale_seconds == 0
+
+
+def test_set_without_stale_seconds(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15}}
+    view_cache = ViewCache()
+
+    view_cache.set("test", "value")
+
+    assert view_cache.cache.get("test", version=view_cache.get_version()) == "value"
+    assert view_cache.get("test") == "value"
+
+
+def test_get_fresh(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "STALE_SECONDS": 60}}
+    view_cache = ViewCache()
+    refresh = Mock(return_value="new value")
+
+    view_cache.set("test", "value")
+
+    assert isinstance(view_cache.cache.get("test", version=view_cache.get_version()), CacheEntry)
+    assert view_cache.get("test", refresh=refresh) == "value"
+
+    refresh.assert_not_called()
+
+
+def test_get_stale(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "STALE_SECONDS": 60}}
+    view_cache = ViewCache()
+    refresh = Mock(return_value="new value")
+
+    view_cache.cache.set("test", CacheEntry(value="value", fresh_until=time() - 1), version=view_cache.get_version())
+
+    # Stale value is returned immediately
+    assert view_cache.get("test", refresh=refresh) == "value"
+
+    _wait_for(lambda: view_cache.get("test") == "new value")
+    refresh.assert_called_once()
+
+
+def test_get_stale_refresh_exception(settings, locmem_cache):
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "STALE_SECONDS": 60}}
+    view_cache = ViewCache()
+    refresh = Mock(side_effect=Exception("refresh failed"))
+
+    view_cache.cache.set("test", CacheEntry(value="value", fresh_until=time() - 1), version=view_cache.get_version())
+
+    with patch("coltrane.config.cache.logger") as logger:
+        assert view_cache.get("test", refresh=refresh) == "value"
+
+        _wait_for(lambda: logger.exception.called)
+
+    assert view_cache.get("test") == "value"
@@ -0,0 +1,25 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from coltrane.config.paths import get_output_manifest
+
+
+def test_get_output_manifest(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+
+    assert get_output_manifest() == tmp_path / "output.json"
+
+
+def test_get_output_manifest_msgpack(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.COLTRANE["MANIFEST"] = {"FORMAT": "msgpack"}
+
+    assert get_output_manifest() == tmp_path / "output.msgpack"
+
+
+def test_get_output_manifest_invalid_format(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.COLTRANE["MANIFEST"] = {"FORMAT": "yaml"}
+
+    with pytest.raises(ImproperlyConfigured):
+        get_output_manifest()
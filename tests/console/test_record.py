@@ -59,6 +59,14 @@ def test_record_threads(_run_management_command):
     _run_management_command.assert_called_once_with("build", "--threads", "3")
 
 
+@patch("coltrane.console._run_management_command")
+def test_record_workers_executor(_run_management_command):
+    runner = CliRunner()
+    runner.invoke(cli, ["record", "--workers", "4", "--executor", "process"])
+
+    _run_management_command.assert_called_once_with("build", "--workers", "4", "--executor", "process")
+
+
 @patch("coltrane.console._run_management_command")
 def test_record_ignore(_run_management_command):
     runner = CliRunner()
@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from coltrane.console import cli
+
+
+def test_warm():
+    runner = CliRunner()
+
+    with patch("coltrane.console._run_management_command") as _run_management_command:
+        result = runner.invoke(cli, ["warm"])
+        assert result.exit_code == 0
+
+        _run_management_command.assert_called_once_with("warmcache")
+
+
+def test_warmcache_alias():
+    runner = CliRunner()
+
+    with patch("coltrane.console._run_management_command") as _run_management_command:
+        result = runner.invoke(cli, ["warmcache"])
+        assert result.exit_code == 0
+
+        _run_management_command.assert_called_once_with("warmcache")
+
+
+def test_warm_with_options():
+    runner = CliRunner()
+
+    with patch("coltrane.console._run_management_command") as _run_management_command:
+        result = runner.invoke(cli, ["warm", "--workers=4", "--site=one", "--site=two", "--force"])
+        assert result.exit_code == 0
+
+        _run_management_command.assert_called_once_with(
+            "warmcache", "--workers", "4", "--site", "one", "--site", "two", "--force"
+        )
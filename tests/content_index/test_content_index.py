@@ -0,0 +1,186 @@
+from os import stat, utime
+from pathlib import Path
+from shutil import rmtree
+from unittest.mock import patch
+
+import pytest
+
+from coltrane.content_index import ContentIndex, get_content_index
+
+
+@pytest.fixture
+def content_directory(tmp_path: Path) -> Path:
+    content_directory = tmp_path / "content"
+    content_directory.mkdir()
+
+    return content_directory
+
+
+def test_get(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+
+    actual = ContentIndex(content_directory).get("test")
+
+    assert actual
+    assert actual.slug == "test"
+    assert actual.path == content_directory / "test.md"
+    assert actual.relative_url == "/test"
+
+
+def test_get_missing(content_directory: Path):
+    actual = ContentIndex(content_directory).get("test")
+
+    assert actual is None
+
+
+def test_get_only_stats_directory_and_file(content_directory: Path):
+    for i in range(10):
+        (content_directory / f"test{i}.md").write_text(f"# test {i}")
+
+    # Move the modified times out of the racy window so the directory is not scanned again
+    for path in [content_directory, *content_directory.iterdir()]:
+        mtime_ns = path.stat().st_mtime_ns - 10_000_000_000
+        utime(path, ns=(mtime_ns, mtime_ns))
+
+    content_index = ContentIndex(content_directory)
+    assert content_index.get("test1")
+
+    with patch("coltrane.content_index.os_stat", wraps=stat) as os_stat:
+        assert content_index.get("test1")
+
+    assert os_stat.call_count == 2
+
+
+def test_get_modified_file(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+    (content_directory / "another.md").write_text("# another")
+
+    content_index = ContentIndex(content_directory)
+    entry = content_index.get("test")
+    assert entry
+
+    (content_directory / "test.md").write_text("# test modified")
+
+    actual = content_index.get("test")
+    assert actual
+    assert actual.size != entry.size
+
+
+def test_get_removed_file(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+
+    content_index = ContentIndex(content_directory)
+    assert content_index.get("test")
+
+    (content_directory / "test.md").unlink()
+
+    assert content_index.get("test") is None
+
+
+def test_get_index_relative_url(content_directory: Path):
+    (content_directory / "articles").mkdir()
+    (content_directory / "articles" / "index.md").write_text("# articles")
+
+    actual = ContentIndex(content_directory).get("articles/index")
+
+    assert actual
+    assert actual.relative_url == "/articles"
+    assert actual.directory == "articles"
+
+
+def test_get_entries(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+    (content_directory / "test.txt").write_text("test")
+    (content_directory / "articles" / "2023").mkdir(parents=True)
+    (content_directory / "articles" / "one.md").write_text("# one")
+    (content_directory / "articles" / "2023" / "two.md").write_text("# two")
+
+    content_index = ContentIndex(content_directory)
+
+    actual = [e.slug for e in content_index.get_entries()]
+    assert actual == ["articles/2023/two", "articles/one", "test"]
+
+    actual = [e.slug for e in content_index.get_entries("articles")]
+    assert actual == ["articles/2023/two", "articles/one"]
+
+
+def test_get_entries_new_file(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+
+    content_index = ContentIndex(content_directory)
+    assert len(content_index.get_entries()) == 1
+
+    (content_directory / "another.md").write_text("# another")
+
+    assert len(content_index.get_entries()) == 2
+
+
+def test_get_entries_removed_directory(content_directory: Path):
+    (content_directory / "articles").mkdir()
+    (content_directory / "articles" / "one.md").write_text("# one")
+
+    content_index = ContentIndex(content_directory)
+    assert len(content_index.get_entries()) == 1
+
+    rmtree(content_directory / "articles")
+
+    assert content_index.get_entries() == []
+    assert content_index.has_directory("articles") is False
+
+
+def test_metadata(content_directory: Path):
+    (content_directory / "test.md").write_text(
+        """---
+title: Test
+---
+"""
+    )
+
+    content_index = ContentIndex(content_directory)
+    actual = content_index.get("test")
+
+    assert actual
+    assert actual.metadata["title"] == "Test"
+
+    (content_directory / "test.md").write_text(
+        """---
+title: Updated test
+---
+"""
+    )
+
+    actual = content_index.get("test")
+
+    assert actual
+    assert actual.metadata["title"] == "Updated test"
+
+
+def test_generation(content_directory: Path):
+    (content_directory / "test.md").write_text("# test")
+
+    content_index = ContentIndex(content_directory)
+    content_index.get_entries()
+    generation = content_index.generation
+
+    (content_directory / "another.md").write_text("# another")
+    content_index.get_entries()
+
+    assert content_index.generation > generation
+
+
+def test_has_directory(content_directory: Path):
+    (content_directory / "articles").mkdir()
+
+    content_index = ContentIndex(content_directory)
+
+    assert content_index.has_directory() is True
+    assert content_index.has_directory("articles") is True
+    assert content_index.has_directory("/articles/") is True
+    assert content_index.has_directory("missing") is False
+
+
+def test_get_content_index_per_content_directory(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+
+    assert get_content_index() is get_content_index()
+    assert get_content_index().content_directory == tmp_path / "content"
@@ -0,0 +1,135 @@
+from os import utime
+
+from coltrane.dependencies import (
+    DependencyChecker,
+    add_file_dependency,
+    add_static_dependency,
+    get_dependency_hash,
+    record_dependencies,
+)
+
+
+def test_add_file_dependency(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies() as dependencies:
+        add_file_dependency(path)
+
+    assert dependencies == {str(path): path.stat().st_mtime_ns}
+
+
+def test_add_file_dependency_mtime(tmp_path):
+    path = tmp_path / "test.md"
+
+    with record_dependencies() as dependencies:
+        add_file_dependency(path, mtime_ns=123)
+
+    assert dependencies == {str(path): 123}
+
+
+def test_add_file_dependency_missing_file(tmp_path):
+    with record_dependencies() as dependencies:
+        add_file_dependency(tmp_path / "missing.html")
+
+    assert dependencies == {}
+
+
+def test_add_file_dependency_not_recording(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    add_file_dependency(path)
+
+    with record_dependencies() as dependencies:
+        pass
+
+    assert dependencies == {}
+
+
+def test_add_static_dependency():
+    with record_dependencies() as dependencies:
+        add_static_dependency("site.css", "/static/site.css")
+
+    assert dependencies == {"static:site.css": "/static/site.css"}
+
+
+def test_dependency_checker(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies() as dependencies:
+        add_file_dependency(path)
+
+    assert DependencyChecker().has_changed(dependencies) is False
+
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    utime(path, ns=(mtime_ns, mtime_ns))
+
+    assert DependencyChecker().has_changed(dependencies) is True
+
+
+def test_dependency_checker_missing_file(tmp_path):
+    assert DependencyChecker().has_changed({str(tmp_path / "missing.html"): 1}) is True
+
+
+def test_add_file_dependency_hashes(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies(hashes=True) as dependencies:
+        add_file_dependency(path)
+
+    assert dependencies[str(path)] == path.stat().st_mtime_ns
+    assert dependencies[f"hash:{path}"] == get_dependency_hash(str(path))
+
+
+def test_dependency_checker_hash_unchanged(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies(hashes=True) as dependencies:
+        add_file_dependency(path)
+        add_file_dependency(tmp_path)
+
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    utime(path, ns=(mtime_ns, mtime_ns))
+    utime(tmp_path, ns=(mtime_ns, mtime_ns))
+
+    checker = DependencyChecker()
+    assert checker.has_changed(dependencies) is False
+
+    refreshed = checker.get_refreshed(dependencies)
+    assert refreshed
+    assert refreshed[str(path)] == mtime_ns
+    assert refreshed[str(tmp_path)] == mtime_ns
+
+
+def test_dependency_checker_hash_changed(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies(hashes=True) as dependencies:
+        add_file_dependency(path)
+        add_file_dependency(tmp_path)
+
+    (tmp_path / "another.html").write_text("another")
+
+    assert DependencyChecker().has_changed(dependencies) is True
+
+    (tmp_path / "another.html").unlink()
+    path.write_text("changed")
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    utime(path, ns=(mtime_ns, mtime_ns))
+
+    assert DependencyChecker().has_changed(dependencies) is True
+
+
+def test_dependency_checker_get_refreshed_unchanged(tmp_path):
+    path = tmp_path / "test.html"
+    path.write_text("test")
+
+    with record_dependencies(hashes=True) as dependencies:
+        add_file_dependency(path)
+
+    assert DependencyChecker().get_refreshed(dependencies) is None
@@ -1,5 +1,4 @@
 import json
-from hashlib import md5
 from io import StringIO
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -7,6 +6,8 @@ from unittest.mock import Mock, patch
 import pytest
 from django.core.management import call_command
 
+from coltrane.manifest import get_file_hash
+
 
 def _call_build_command(*args, **kwargs) -> str:
     stdout = StringIO()
@@ -117,12 +118,18 @@ def test_build_command_updates_output_manifest(settings, tmp_path):
     assert (tmp_path / "output").exists()
     assert (tmp_path / "output" / "test-1" / "index.html").exists()
 
-    mtime = markdown_file.stat().st_mtime
-    file_hash = md5(markdown_file.read_bytes()).hexdigest()  # noqa: S324
-    expected = '{"test-1.md": {"mtime": ' + str(mtime) + ', "md5": "' + file_hash + '"}}'
-    actual = (tmp_path / "output.json").read_text()
+    markdown_file_stat = markdown_file.stat()
+    actual = json.loads((tmp_path / "output.json").read_text())
+
+    assert list(actual.keys()) == ["test-1.md"]
+    assert actual["test-1.md"]["mtime"] == markdown_file_stat.st_mtime
+    assert actual["test-1.md"]["mtime_ns"] == markdown_file_stat.st_mtime_ns
+    assert actual["test-1.md"]["size"] == markdown_file_stat.st_size
+    assert actual["test-1.md"]["inode"] == markdown_file_stat.st_ino
+    assert actual["test-1.md"]["hash"] == get_file_hash(markdown_file.read_bytes())
 
-    assert actual == expected
+    # Templates used to render the markdown file are stored as dependencies
+    assert any(d.endswith("coltrane/content.html") for d in actual["test-1.md"]["dependencies"])
 
 
 @pytest.mark.slow
@@ -142,7 +149,7 @@ def test_build_command_force(settings, tmp_path):
 @pytest.mark.slow
 @patch("coltrane.management.commands.build.Command._call_compress", Mock())
 @patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
-def test_build_command_staticfiles_force(settings, tmp_path):
+def test_build_command_staticfiles_changed(settings, tmp_path):
     _reset_settings(settings, tmp_path)
 
     # Create content directory
@@ -164,5 +171,5 @@ def test_build_command_staticfiles_force(settings, tmp_path):
 
     stdout = _call_build_command()
 
-    assert "Force update because static file(s) updated" in stdout
+    assert "Check static files used by content because static file(s) updated" in stdout
     assert (tmp_path / "output.json").exists()
@@ -1,9 +1,12 @@
 import json
+from copy import deepcopy
 from hashlib import md5
+from os import utime
 from unittest.mock import Mock, patch
 
 import pytest
 
+from coltrane.config.settings import get_config
 from coltrane.management.commands.build import Command
 from coltrane.manifest import Manifest
 
@@ -61,7 +64,7 @@ def test_handle_force_true(settings, tmp_path, build_command):
 @patch("coltrane.management.commands.build.Command._load_manifest", spec=Manifest)
 @patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
 @patch("coltrane.management.commands.build.Command._call_compress", Mock())
-def test_handle_static_files_changed_is_force(_load_manifest, settings, tmp_path, build_command):
+def test_handle_static_files_changed_is_not_force(_load_manifest, settings, tmp_path, build_command):
     _reset_settings(settings, tmp_path)
 
     # Create content directory
@@ -71,7 +74,8 @@ def test_handle_static_files_changed_is_force(_load_manifest, settings, tmp_path
 
     build_command.handle(force=False)
 
-    assert build_command.is_force is True
+    # Only files that use a changed static file get re-rendered
+    assert build_command.is_force is False
 
 
 @pytest.mark.slow
@@ -89,6 +93,55 @@ def test_handle_create(settings, tmp_path, build_command):
     assert build_command.output_result_counts.skip_count == 0
 
 
+@pytest.mark.slow
+@patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
+@patch("coltrane.management.commands.build.Command._call_compress", Mock())
+def test_handle_create_multiple_threads(settings, tmp_path, build_command):
+    _reset_settings(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+
+    for i in range(20):
+        (tmp_path / "content" / f"test-{i}.md").write_text(f"# test {i}")
+
+    build_command.handle(force=False, threads=4)
+
+    assert build_command.output_result_counts.create_count == 20
+    assert build_command.output_result_counts.update_count == 0
+    assert build_command.output_result_counts.skip_count == 0
+
+    for i in range(20):
+        assert (tmp_path / "output" / f"test-{i}" / "index.html").exists()
+
+    manifest = json.loads((tmp_path / "output.json").read_bytes())
+    assert len([name for name in manifest if name.endswith(".md")]) == 20
+
+
+@pytest.mark.slow
+@patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
+@patch("coltrane.management.commands.build.Command._call_compress", Mock())
+def test_handle_create_process_executor(settings, tmp_path, build_command):
+    _reset_settings(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+
+    for i in range(5):
+        (tmp_path / "content" / f"test-{i}.md").write_text(f"# test {i}")
+
+    build_command.chunk_size = 2
+    build_command.handle(force=False, executor="process", workers=2)
+
+    assert build_command.workers_count == 2
+    assert build_command.output_result_counts.create_count == 5
+    assert build_command.errors == []
+
+    for i in range(5):
+        assert (tmp_path / "output" / f"test-{i}" / "index.html").exists()
+
+    manifest = json.loads((tmp_path / "output.json").read_bytes())
+    assert len([name for name in manifest if name.endswith(".md")]) == 5
+
+
 @pytest.mark.slow
 @patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
 @patch("coltrane.management.commands.build.Command._call_compress", Mock())
@@ -120,7 +173,10 @@ def test_handle_skip_because_mtime(settings, tmp_path, build_command):
 
     # Fake a previous run with the correct md5
     md5_hash = md5(markdown_file.read_bytes()).hexdigest()  # noqa: S324
-    (tmp_path / "output.json").write_text(json.dumps({"test-1.md": {"mtime": -1, "md5": md5_hash}}))
+    dependencies = {str(markdown_file): markdown_file.stat().st_mtime_ns}
+    (tmp_path / "output.json").write_text(
+        json.dumps({"test-1.md": {"mtime": -1, "md5": md5_hash, "dependencies": dependencies}})
+    )
 
     build_command.handle(force=False)
 
@@ -129,6 +185,99 @@ def test_handle_skip_because_mtime(settings, tmp_path, build_command):
     assert build_command.output_result_counts.skip_count == 1
 
 
+@pytest.mark.slow
+@patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
+@patch("coltrane.management.commands.build.Command._call_compress", Mock())
+def test_handle_update_legacy_manifest_without_dependencies(settings, tmp_path, build_command):
+    _reset_settings(settings, tmp_path)
+
+    markdown_file = create_markdown_file(tmp_path)
+
+    # Fake a previous run from a version that did not record dependencies
+    md5_hash = md5(markdown_file.read_bytes()).hexdigest()  # noqa: S324
+    mtime = markdown_file.stat().st_mtime
+    (tmp_path / "output.json").write_text(json.dumps({"test-1.md": {"mtime": mtime, "md5": md5_hash}}))
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.update_count == 1
+    assert build_command.output_result_counts.skip_count == 0
+
+    manifest = json.loads((tmp_path / "output.json").read_text())
+    assert any(d.endswith("coltrane/content.html") for d in manifest["test-1.md"]["dependencies"])
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.update_count == 0
+    assert build_command.output_result_counts.skip_count == 1
+
+
+@pytest.mark.slow
+@patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
+@patch("coltrane.management.commands.build.Command._call_compress", Mock())
+def test_handle_update_because_template_changed(settings, tmp_path, build_command):
+    _reset_settings(settings, tmp_path)
+
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+
+    (tmp_path / "templates").mkdir()
+    template_file = tmp_path / "templates" / "custom.html"
+    template_file.write_text("<main>{{ content }}</main>")
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-1.md").write_text("---\ntemplate: custom.html\n---\n# test 1")
+    (tmp_path / "content" / "test-2.md").write_text("# test 2")
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.create_count == 2
+
+    # Change the template and reset Django's cached templates
+    template_file.write_text("<article>{{ content }}</article>")
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+    utime(template_file, ns=(template_file.stat().st_atime_ns, template_file.stat().st_mtime_ns + 1_000_000_000))
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.create_count == 0
+    assert build_command.output_result_counts.update_count == 1
+    assert build_command.output_result_counts.skip_count == 1
+    assert "<article>" in (tmp_path / "output" / "test-1" / "index.html").read_text()
+
+
+@pytest.mark.slow
+@patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
+@patch("coltrane.management.commands.build.Command._call_compress", Mock())
+def test_handle_skip_because_template_content_unchanged(settings, tmp_path, build_command):
+    _reset_settings(settings, tmp_path)
+
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+
+    (tmp_path / "templates").mkdir()
+    template_file = tmp_path / "templates" / "custom.html"
+    template_file.write_text("<main>{{ content }}</main>")
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-1.md").write_text("---\ntemplate: custom.html\n---\n# test 1")
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.create_count == 1
+
+    # Only change the modified time of the template, e.g. like a fresh checkout
+    mtime_ns = template_file.stat().st_mtime_ns + 1_000_000_000
+    utime(template_file, ns=(mtime_ns, mtime_ns))
+
+    build_command.handle(force=False)
+
+    assert build_command.output_result_counts.update_count == 0
+    assert build_command.output_result_counts.skip_count == 1
+
+    # The newest modified time is stored so the template does not get hashed again
+    manifest = json.loads((tmp_path / "output.json").read_text())
+    assert manifest["test-1.md"]["dependencies"][str(template_file)] == mtime_ns
+
+
 @pytest.mark.slow
 @patch("coltrane.management.commands.build.Command._call_collectstatic", Mock())
 @patch("coltrane.management.commands.build.Command._call_compress", Mock())
@@ -142,7 +291,10 @@ def test_handle_skip_because_md5(settings, tmp_path, build_command):
 
     # Fake a previous run with the correct mtime
     mtime = markdown_file.stat().st_mtime
-    (tmp_path / "output.json").write_text(json.dumps({"test-1.md": {"mtime": mtime, "md5": "not-a-hash"}}))
+    dependencies = {str(markdown_file): markdown_file.stat().st_mtime_ns}
+    (tmp_path / "output.json").write_text(
+        json.dumps({"test-1.md": {"mtime": mtime, "md5": "not-a-hash", "dependencies": dependencies}})
+    )
 
     build_command.handle(force=False)
 
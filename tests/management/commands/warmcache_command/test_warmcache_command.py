@@ -0,0 +1,109 @@
+from copy import deepcopy
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from coltrane.config import cache as cache_module
+from coltrane.config.coltrane import Site
+from coltrane.config.settings import get_config
+from coltrane.management.commands.warmcache import get_request, get_slug
+
+
+def _setup_settings(settings, tmp_path: Path) -> None:
+    settings.BASE_DIR = tmp_path
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "MODE": "response"}}
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+
+    cache_module.versions.clear()
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "index.md").write_text("# index")
+    (tmp_path / "content" / "blog").mkdir()
+    (tmp_path / "content" / "blog" / "index.md").write_text("# blog")
+    (tmp_path / "content" / "blog" / "first-post.md").write_text("# first post")
+
+
+def test_get_slug(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    content_directory = tmp_path / "content"
+
+    assert get_slug(content_directory / "index.md") == "index"
+    assert get_slug(content_directory / "blog" / "index.md") == "blog"
+    assert get_slug(content_directory / "blog" / "first-post.md") == "blog/first-post"
+
+
+def test_get_request():
+    request = get_request("blog/first-post", Site(folder="example", hosts=["*", "example.com"]))
+
+    assert request.path == "/blog/first-post"
+    assert request.method == "GET"
+    assert request.headers["Host"] == "example.com"
+
+
+def test_warmcache(client, settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+
+    stdout = StringIO()
+    call_command("warmcache", stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "Warm /index (" in output
+    assert "Warm /blog (" in output
+    assert "Warm /blog/first-post (" in output
+    assert "Warm 3 pages in " in output
+
+    with patch("coltrane.views.render") as render:
+        for url in ("/", "/blog/", "/blog/first-post"):
+            response = client.get(url)
+            assert response.status_code == 200
+
+        render.assert_not_called()
+
+
+def test_warmcache_workers(settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+
+    stdout = StringIO()
+    call_command("warmcache", workers="3", stdout=stdout)
+
+    assert "Warm 3 pages in " in stdout.getvalue()
+
+
+def test_warmcache_error(settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+    (tmp_path / "content" / "broken.md").write_text("{% broken %}")
+
+    stdout = StringIO()
+    call_command("warmcache", stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "Skip /broken (TemplateSyntaxError: " in output
+    assert "Warm 3 pages in " in output
+    assert "Skip 1 page because of errors" in output
+
+
+def test_warmcache_view_cache_disabled(settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+    settings.COLTRANE = {}
+
+    stdout = StringIO()
+    call_command("warmcache", stdout=stdout)
+
+    assert "VIEW_CACHE is not enabled" in stdout.getvalue()
+
+
+def test_warmcache_unknown_site(settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+
+    with pytest.raises(CommandError, match="Unknown site: missing"):
+        call_command("warmcache", sites=["missing"])
@@ -0,0 +1,97 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from coltrane.manifest import Manifest, ManifestItem
+
+
+@pytest.fixture
+def markdown_file(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.STATIC_ROOT = tmp_path / "output" / "static"
+
+    (tmp_path / "content").mkdir()
+    markdown_file = tmp_path / "content" / "test-1.md"
+    markdown_file.write_text("# test 1")
+
+    return markdown_file
+
+
+@pytest.mark.parametrize("manifest_file_name", ["output.json", "output.msgpack"])
+def test_write_data_and_load(tmp_path, markdown_file, manifest_file_name):
+    manifest_file = tmp_path / manifest_file_name
+
+    manifest = Manifest(manifest_file=manifest_file)
+    manifest.add(markdown_file, dependencies={"/templates/base.html": 1})
+    manifest.write_data()
+
+    # Temporary file was renamed
+    assert [path.name for path in tmp_path.iterdir() if path.is_file()] == [manifest_file_name]
+
+    actual = Manifest(manifest_file=manifest_file).get(markdown_file)
+    expected = ManifestItem.create(markdown_file)
+
+    assert actual
+    assert actual.is_stat_unchanged(expected)
+    assert actual.hash == expected.hash
+    assert actual.dependencies == {"/templates/base.html": 1}
+
+
+def test_load_legacy_json(tmp_path, markdown_file):
+    manifest_file = tmp_path / "output.json"
+    manifest_file.write_text(json.dumps({"test-1.md": {"mtime": 1.5, "md5": "abc"}}))
+
+    actual = Manifest(manifest_file=manifest_file).get(markdown_file)
+
+    assert actual
+    assert actual.mtime == 1.5
+    assert actual.mtime_ns is None
+    assert actual.hash == "abc"
+    assert actual.dependencies == {}
+
+
+def test_load_is_lazy(tmp_path, markdown_file):
+    manifest_file = tmp_path / "output.json"
+    manifest_file.write_text(
+        json.dumps(
+            {
+                "test-1.md": {"mtime": 1.5, "hash": "blake2b:abc"},
+                "test-2.md": {"mtime": 2.5, "hash": "blake2b:def", "dependencies": {"/base.html": 1}},
+            }
+        )
+    )
+
+    with patch("coltrane.manifest.ManifestItem.from_entry", wraps=ManifestItem.from_entry) as from_entry:
+        manifest = Manifest(manifest_file=manifest_file)
+        manifest.write_data()
+
+    from_entry.assert_not_called()
+
+    # Items that were never retrieved are written back as-is
+    assert json.loads(manifest_file.read_text())["test-2.md"] == {
+        "mtime": 2.5,
+        "hash": "blake2b:def",
+        "dependencies": {"/base.html": 1},
+    }
+
+
+def test_load_invalid_manifest(tmp_path, markdown_file):
+    manifest_file = tmp_path / "output.json"
+    manifest_file.write_text('{"test-1.md": {"mtime"')
+
+    assert Manifest(manifest_file=manifest_file).get(markdown_file) is None
+
+
+def test_write_data_failure_keeps_manifest(tmp_path, markdown_file):
+    manifest_file = tmp_path / "output.json"
+    manifest_file.write_text("{}")
+
+    manifest = Manifest(manifest_file=manifest_file)
+    manifest.add(markdown_file)
+
+    with patch("coltrane.utils.replace", side_effect=OSError), pytest.raises(OSError):
+        manifest.write_data()
+
+    assert manifest_file.read_text() == "{}"
+    assert [path.name for path in tmp_path.iterdir() if path.is_file()] == ["output.json"]
@@ -0,0 +1,128 @@
+from hashlib import md5
+from os import utime
+from unittest.mock import patch
+
+from coltrane.manifest import ManifestItem, get_file_hash
+
+
+def _create_markdown_file(tmp_path):
+    (tmp_path / "content").mkdir()
+    markdown_file = tmp_path / "content" / "test-1.md"
+    markdown_file.write_text("# test 1")
+
+    return markdown_file
+
+
+def test_create_does_not_read_file(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    with patch("pathlib.Path.read_bytes") as read_bytes:
+        item = ManifestItem.create(markdown_file)
+
+    read_bytes.assert_not_called()
+
+    assert item.name == "test-1.md"
+    assert item.size == markdown_file.stat().st_size
+    assert item.mtime_ns == markdown_file.stat().st_mtime_ns
+    assert item.inode == markdown_file.stat().st_ino
+
+
+def test_hash(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    item = ManifestItem.create(markdown_file)
+
+    assert item.hash == get_file_hash(b"# test 1")
+
+
+def test_get_file_hash_blake2b():
+    with patch("coltrane.utils._get_xxhash", return_value=None):
+        assert get_file_hash(b"# test 1").startswith("blake2b:")
+
+
+def test_is_stat_unchanged(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    existing_item = ManifestItem.create(markdown_file)
+    item = ManifestItem.create(markdown_file)
+
+    assert item.is_stat_unchanged(existing_item)
+
+
+def test_is_stat_unchanged_mtime_changed(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    existing_item = ManifestItem.create(markdown_file)
+
+    mtime_ns = markdown_file.stat().st_mtime_ns + 1_000_000_000
+    utime(markdown_file, ns=(mtime_ns, mtime_ns))
+
+    item = ManifestItem.create(markdown_file)
+
+    assert not item.is_stat_unchanged(existing_item)
+    assert item.is_content_unchanged(existing_item)
+
+
+def test_is_content_unchanged_legacy_md5(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    existing_item = ManifestItem(
+        name="test-1.md",
+        mtime=-1,
+        hash=md5(b"# test 1").hexdigest(),  # noqa: S324
+    )
+    item = ManifestItem.create(markdown_file)
+
+    assert not item.is_stat_unchanged(existing_item)
+
+    with patch("pathlib.Path.read_bytes", return_value=b"# test 1") as read_bytes:
+        assert item.is_content_unchanged(existing_item)
+        assert item.hash == get_file_hash(b"# test 1")
+
+    read_bytes.assert_called_once()
+
+
+def test_is_content_unchanged_changed(tmp_path):
+    markdown_file = _create_markdown_file(tmp_path)
+
+    existing_item = ManifestItem.create(markdown_file)
+    existing_item.hash  # noqa: B018
+
+    markdown_file.write_text("# test 2")
+    item = ManifestItem.create(markdown_file)
+
+    assert not item.is_content_unchanged(existing_item)
+
+
+def test_render_html_sets_hash_without_reading_file_again(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    markdown_file = _create_markdown_file(tmp_path)
+
+    item = ManifestItem.create(markdown_file)
+    item.render_html()
+
+    with patch("pathlib.Path.read_bytes") as read_bytes:
+        assert item.hash == get_file_hash(b"# test 1")
+
+    read_bytes.assert_not_called()
+
+
+def test_render_html_changed_content_without_reading_file_again(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    markdown_file = _create_markdown_file(tmp_path)
+
+    existing_item = ManifestItem.create(markdown_file)
+    existing_item.hash  # noqa: B018
+
+    markdown_file.write_text("# test 2")
+    item = ManifestItem.create(markdown_file)
+
+    assert not item.is_content_unchanged(existing_item)
+    assert item.content == b"# test 2"
+
+    with patch("coltrane.renderer.open", create=True, wraps=open) as renderer_open:
+        rendered_html = item.render_html()
+
+    assert "test 2" in rendered_html
+    assert item.content is None
+    assert all(c.args[0] != markdown_file for c in renderer_open.call_args_list)
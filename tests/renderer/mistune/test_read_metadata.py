@@ -0,0 +1,115 @@
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from coltrane.renderer import MistuneMarkdownRenderer
+
+
+@pytest.fixture
+def markdown_renderer():
+    return MistuneMarkdownRenderer()
+
+
+def test_read_metadata(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text(
+        """---
+title: Test title
+draft: "1"
+publish_date: 2023-01-02
+---
+
+# test
+"""
+    )
+
+    actual = markdown_renderer.read_metadata(path)
+
+    assert actual["title"] == "Test title"
+    assert actual["draft"] is True
+    assert isinstance(actual["publish_date"], datetime)
+    assert "now" in actual
+    assert "toc" in actual
+
+
+def test_read_metadata_toc_is_lazy(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    with patch.object(
+        markdown_renderer, "render_markdown_path", wraps=markdown_renderer.render_markdown_path
+    ) as render:
+        actual = markdown_renderer.read_metadata(path)
+
+        render.assert_not_called()
+
+        assert 'href="#test"' in str(actual["toc"])
+        render.assert_called_once()
+
+
+def test_read_metadata_no_frontmatter(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    actual = markdown_renderer.read_metadata(path)
+
+    assert list(actual.keys()) == ["now", "toc"]
+
+
+def test_read_metadata_leading_blank_lines(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text(
+        """
+
+---
+title: Test title
+---
+"""
+    )
+
+    actual = markdown_renderer.read_metadata(path)
+
+    assert actual["title"] == "Test title"
+
+
+def test_read_metadata_does_not_read_content(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text(
+        """---
+title: Test title
+---
+
+title: Not frontmatter
+"""
+    )
+
+    with patch.object(markdown_renderer, "render_markdown_text") as render_markdown_text:
+        actual = markdown_renderer.read_metadata(path)
+
+    render_markdown_text.assert_not_called()
+    assert actual["title"] == "Test title"
+
+
+def test_read_metadata_matches_render_markdown_path(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text(
+        """---
+title: Test title
+tags:
+  - one
+  - two
+---
+
+# test
+"""
+    )
+
+    (_, expected) = markdown_renderer.render_markdown_path(path)
+    del expected["now"]
+
+    actual = markdown_renderer.read_metadata(path)
+    del actual["now"]
+
+    assert actual == expected
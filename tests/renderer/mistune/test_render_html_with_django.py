@@ -0,0 +1,75 @@
+import pytest
+
+from coltrane.renderer import MistuneMarkdownRenderer
+
+
+@pytest.fixture
+def markdown_renderer():
+    return MistuneMarkdownRenderer()
+
+
+def test_render_html_with_django(markdown_renderer):
+    expected = "<p>hello world</p>"
+    actual = markdown_renderer.render_html_with_django("<p>hello {{ name }}</p>", {"name": "world"})
+
+    assert actual == expected
+
+
+def test_render_html_with_django_cache_hit(markdown_renderer):
+    markdown_renderer.render_html_with_django("<p>hello {{ name }}</p>", {"name": "world"})
+    actual = markdown_renderer.render_html_with_django("<p>hello {{ name }}</p>", {"name": "there"})
+
+    assert actual == "<p>hello there</p>"
+    assert markdown_renderer.template_cache.hits == 1
+    assert markdown_renderer.template_cache.misses == 1
+
+
+def test_render_html_with_django_cache_eviction(markdown_renderer, settings):
+    settings.COLTRANE["TEMPLATE_CACHE"] = {"SIZE": 1}
+
+    markdown_renderer.render_html_with_django("<p>{{ one }}</p>", {"one": 1})
+    markdown_renderer.render_html_with_django("<p>{{ two }}</p>", {"two": 2})
+
+    assert len(markdown_renderer.template_cache) == 1
+    assert markdown_renderer.template_cache.evictions == 1
+
+
+def test_render_html_with_django_static_html(markdown_renderer):
+    expected = "<p>hello world</p>"
+    actual = markdown_renderer.render_html_with_django("<p>hello world</p>", {})
+
+    assert actual == expected
+    assert markdown_renderer.static_html_count == 1
+    assert markdown_renderer.template_html_count == 0
+
+
+def test_render_html_with_django_static_html_removes_verbatim(markdown_renderer):
+    expected = "<code><pre>{{ name }}</pre></code>"
+    actual = markdown_renderer.render_html_with_django(
+        "{% verbatim %}<code><pre>{{ name }}</pre></code>{% endverbatim %}", {"name": "world"}
+    )
+
+    assert actual == expected
+    assert markdown_renderer.static_html_count == 1
+
+
+def test_render_html_with_django_template_outside_verbatim(markdown_renderer):
+    expected = "<p>world</p><code><pre>{{ name }}</pre></code>"
+    actual = markdown_renderer.render_html_with_django(
+        "<p>{{ name }}</p>{% verbatim %}<code><pre>{{ name }}</pre></code>{% endverbatim %}", {"name": "world"}
+    )
+
+    assert actual == expected
+    assert markdown_renderer.static_html_count == 0
+    assert markdown_renderer.template_html_count == 1
+
+
+def test_render_html_with_django_stats(markdown_renderer):
+    markdown_renderer.render_html_with_django("<p>hello world</p>", {})
+    markdown_renderer.render_html_with_django("<p>hello world</p>", {})
+    markdown_renderer.render_html_with_django("<p>hello {{ name }}</p>", {"name": "world"})
+
+    expected = {"static": 2, "template": 1}
+    actual = markdown_renderer.stats()["html"]
+
+    assert actual == expected
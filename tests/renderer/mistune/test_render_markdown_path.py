@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from coltrane.renderer import MistuneMarkdownRenderer
+
+
+@pytest.fixture
+def markdown_renderer():
+    return MistuneMarkdownRenderer()
+
+
+def test_render_markdown_path(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    (actual_html, actual_metadata) = markdown_renderer.render_markdown_path(path)
+
+    assert actual_html == '<h1 id="test">test</h1>\n'
+    assert "now" in actual_metadata
+
+
+def test_render_markdown_path_cache_hit(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    markdown_renderer.render_markdown_path(path)
+    (actual_html, _) = markdown_renderer.render_markdown_path(path)
+
+    assert actual_html == '<h1 id="test">test</h1>\n'
+    assert markdown_renderer.markdown_cache.hits == 1
+    assert markdown_renderer.markdown_cache.misses == 1
+
+
+def test_render_markdown_path_cache_returns_copy_of_metadata(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    (_, metadata) = markdown_renderer.render_markdown_path(path)
+    metadata["slug"] = "test"
+
+    (_, actual_metadata) = markdown_renderer.render_markdown_path(path)
+
+    assert "slug" not in actual_metadata
+
+
+def test_render_markdown_path_cache_miss_when_file_changes(markdown_renderer, tmp_path: Path):
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    markdown_renderer.render_markdown_path(path)
+
+    path.write_text("# another test")
+    (actual_html, _) = markdown_renderer.render_markdown_path(path)
+
+    assert actual_html == '<h1 id="another-test">another test</h1>\n'
+    assert markdown_renderer.markdown_cache.misses == 2
+
+
+def test_render_markdown_path_cache_disabled(markdown_renderer, settings, tmp_path: Path):
+    settings.COLTRANE["MARKDOWN_CACHE"] = {"SIZE": 0}
+
+    path = tmp_path / "test.md"
+    path.write_text("# test")
+
+    markdown_renderer.render_markdown_path(path)
+    markdown_renderer.render_markdown_path(path)
+
+    assert markdown_renderer.markdown_cache.hits == 0
+    assert len(markdown_renderer.markdown_cache) == 0
+
+
+def test_render_markdown_path_missing_file(markdown_renderer, tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        markdown_renderer.render_markdown_path(tmp_path / "missing.md")
@@ -12,3 +12,14 @@ def test_location(settings, tmp_path: Path):
 
     assert len(actual) == 1
     assert actual[0].relative_url == "/test"
+
+
+def test_html_is_lazy(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content/test.md").write_text("# test")
+
+    actual = get_content_items()
+
+    assert actual[0]._html is None
+    assert actual[0].html == '<h1 id="test">test</h1>\n'
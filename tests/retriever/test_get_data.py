@@ -1,7 +1,13 @@
+from os import utime
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
+
+from coltrane.config import cache as cache_module
+from coltrane.config.cache import DataCache
 from coltrane.config.coltrane import Site
-from coltrane.retriever import get_data
+from coltrane.retriever import _get_data_from_directory, _load_data_file, get_data
 from tests.fixtures import *  # noqa: F403
 
 
@@ -119,3 +125,136 @@ def test_get_data_directory_with_non_json_file(settings, tmp_path: Path, default
     actual = get_data(site=default_site)
 
     assert actual == expected
+
+
+def _setup_data_cache(settings, tmp_path: Path) -> None:
+    settings.BASE_DIR = tmp_path
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    settings.COLTRANE["DATA_CACHE"] = {"SECONDS": 60}
+
+    cache_module.versions.clear()
+
+
+def test_get_data_cache_per_site(settings, tmp_path: Path):
+    _setup_data_cache(settings, tmp_path)
+
+    site_one = Site(folder="one", hosts=["one.com"])
+    site_two = Site(folder="two", hosts=["two.com"])
+
+    for folder in ("one", "two"):
+        (tmp_path / folder / "data").mkdir(parents=True)
+        (tmp_path / folder / "data" / "site.json").write_text(f'{{"name": "{folder}"}}')
+
+    with patch("coltrane.retriever.get_data_directory", side_effect=lambda site: tmp_path / site.folder / "data"):
+        assert get_data(site=site_one) == {"site": {"name": "one"}}
+        assert get_data(site=site_two) == {"site": {"name": "two"}}
+
+        # Cached data is used for each site
+        with patch("coltrane.retriever._get_data_from_directory") as _get_data_from_directory:
+            assert get_data(site=site_one) == {"site": {"name": "one"}}
+            assert get_data(site=site_two) == {"site": {"name": "two"}}
+
+        _get_data_from_directory.assert_not_called()
+
+
+def test_get_data_cache_invalidate_site(settings, tmp_path: Path):
+    _setup_data_cache(settings, tmp_path)
+
+    site_one = Site(folder="one", hosts=["one.com"])
+    site_two = Site(folder="two", hosts=["two.com"])
+
+    for folder in ("one", "two"):
+        (tmp_path / folder / "data").mkdir(parents=True)
+        (tmp_path / folder / "data" / "site.json").write_text(f'{{"name": "{folder}"}}')
+
+    with patch("coltrane.retriever.get_data_directory", side_effect=lambda site: tmp_path / site.folder / "data"):
+        get_data(site=site_one)
+        get_data(site=site_two)
+
+        (tmp_path / "one" / "data" / "site.json").write_text('{"name": "one changed"}')
+        (tmp_path / "two" / "data" / "site.json").write_text('{"name": "two changed"}')
+
+        DataCache().invalidate_site(site_one)
+
+        assert get_data(site=site_one) == {"site": {"name": "one changed"}}
+        assert get_data(site=site_two) == {"site": {"name": "two"}}
+
+
+def test_get_data_cache_only_parses_changed_files(settings, tmp_path: Path, default_site: Site):
+    _setup_data_cache(settings, tmp_path)
+
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "one.json").write_text('{"sample": 1}')
+    two_file = tmp_path / "data" / "two.json"
+    two_file.write_text('{"sample": 2}')
+
+    assert get_data(site=default_site) == {"one": {"sample": 1}, "two": {"sample": 2}}
+
+    two_file.write_text('{"sample": 22}')
+    mtime_ns = two_file.stat().st_mtime_ns + 1_000_000_000
+    utime(two_file, ns=(mtime_ns, mtime_ns))
+
+    DataCache().invalidate_site(default_site)
+
+    with patch("coltrane.retriever._load_data_file", wraps=_load_data_file) as load_data_file:
+        assert get_data(site=default_site) == {"one": {"sample": 1}, "two": {"sample": 22}}
+
+    load_data_file.assert_called_once_with(two_file, "two")
+
+
+def test_load_data_file_memory_mapped(tmp_path: Path):
+    path = tmp_path / "large.json"
+    path.write_text('{"sample": [1, 2, 3], "name": "spræ"}')
+
+    with patch("coltrane.retriever.DATA_FILE_MMAP_SIZE", 0):
+        assert _load_data_file(path, "large") == {"sample": [1, 2, 3], "name": "spræ"}
+
+
+def test_load_data_file_utf8_bom(tmp_path: Path):
+    path = tmp_path / "bom.json"
+    path.write_bytes(b'\xef\xbb\xbf{"sample": 1}')
+
+    assert _load_data_file(path, "bom") == {"sample": 1}
+
+    with patch("coltrane.retriever.DATA_FILE_MMAP_SIZE", 0):
+        assert _load_data_file(path, "bom") == {"sample": 1}
+
+
+def test_load_data_file_invalid_json_memory_mapped(tmp_path: Path):
+    path = tmp_path / "invalid.json"
+    path.write_text('{"sample": ')
+
+    with patch("coltrane.retriever.DATA_FILE_MMAP_SIZE", 0):
+        assert _load_data_file(path, "invalid") is None
+
+
+def test_get_data_from_directory_nested(tmp_path: Path):
+    data_directory = tmp_path / "data"
+    (data_directory / "some" / "new" / "test").mkdir(parents=True)
+    (data_directory / "some" / "new" / "test" / "here.json").write_text('{"one": "two"}')
+    (data_directory / "some" / "new" / "there.json").write_text('{"three": 3}')
+    (data_directory / "some.json").write_text('{"four": 4}')
+
+    expected = {
+        "some": {
+            "four": 4,
+            "new": {"test": {"here": {"one": "two"}}, "there": {"three": 3}},
+        }
+    }
+
+    assert _get_data_from_directory(data_directory) == expected
+
+
+def test_get_data_from_directory_conflict(tmp_path: Path):
+    data_directory = tmp_path / "data"
+    (data_directory / "some").mkdir(parents=True)
+    (data_directory / "some" / "new.json").write_text('{"one": 1}')
+    (data_directory / "some.json").write_text('{"new": 2}')
+
+    with pytest.raises(Exception, match=r"Conflict at some\.new"):
+        _get_data_from_directory(data_directory)
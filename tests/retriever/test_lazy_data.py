@@ -0,0 +1,125 @@
+import json
+import pickle
+from copy import deepcopy
+from os import utime
+from pathlib import Path
+from unittest.mock import patch
+
+from django.template import Context, Template
+
+from coltrane.retriever import LazyData, _load_data_file, data_files
+
+
+def _create_data(tmp_path: Path) -> Path:
+    data_directory = tmp_path / "data"
+    data_directory.mkdir()
+    (data_directory / "one.json").write_text('{"sample": 1}')
+    (data_directory / "more").mkdir()
+    (data_directory / "more" / "two.json").write_text('{"sample": 2}')
+
+    return data_directory
+
+
+def test_lazy_data_only_decodes_accessed_files(tmp_path: Path):
+    data_files.clear()
+    data_directory = _create_data(tmp_path)
+
+    with patch("coltrane.retriever._load_data_file", wraps=_load_data_file) as load_data_file:
+        data = LazyData(data_directory)
+
+        assert data["more"]["two"] == {"sample": 2}
+
+    load_data_file.assert_called_once_with(data_directory / "more" / "two.json", "two")
+
+
+def test_lazy_data_memoized_by_mtime(tmp_path: Path):
+    data_files.clear()
+    data_directory = _create_data(tmp_path)
+
+    with patch("coltrane.retriever._load_data_file", wraps=_load_data_file) as load_data_file:
+        assert LazyData(data_directory)["one"] == {"sample": 1}
+        assert LazyData(data_directory)["one"] == {"sample": 1}
+
+        assert load_data_file.call_count == 1
+
+        one_file = data_directory / "one.json"
+        one_file.write_text('{"sample": 11}')
+        mtime_ns = one_file.stat().st_mtime_ns + 1_000_000_000
+        utime(one_file, ns=(mtime_ns, mtime_ns))
+
+        assert LazyData(data_directory)["one"] == {"sample": 11}
+        assert load_data_file.call_count == 2
+
+
+def test_lazy_data_missing_key(tmp_path: Path):
+    data_directory = _create_data(tmp_path)
+    data = LazyData(data_directory)
+
+    assert "missing" not in data
+    assert data.get("missing") is None
+    assert "../one" not in data
+
+
+def test_lazy_data_merges_file_and_directory(tmp_path: Path):
+    data_directory = _create_data(tmp_path)
+    (data_directory / "more.json").write_text('{"three": 3}')
+
+    assert LazyData(data_directory)["more"] == {"three": 3, "two": {"sample": 2}}
+
+
+def test_lazy_data_to_dict(tmp_path: Path):
+    data_directory = _create_data(tmp_path)
+    (data_directory / "empty").mkdir()
+    (data_directory / "invalid.json").write_text("")
+
+    expected = {"one": {"sample": 1}, "more": {"two": {"sample": 2}}}
+
+    assert LazyData(data_directory).to_dict() == expected
+    assert LazyData(data_directory) == expected
+
+
+def test_lazy_data_missing_directory(tmp_path: Path):
+    data = LazyData(tmp_path / "data")
+
+    assert data == {}
+    assert not data
+
+
+def test_lazy_data_in_template(tmp_path: Path):
+    data_directory = _create_data(tmp_path)
+
+    template = Template("{{ data.more.two.sample }}{% if data.missing %}missing{% endif %}")
+
+    assert template.render(Context({"data": LazyData(data_directory)})) == "2"
+
+
+def test_lazy_data_is_dict(tmp_path: Path):
+    data = LazyData(_create_data(tmp_path))
+
+    assert isinstance(data, dict)
+    assert isinstance(data["more"], dict)
+    assert dict(data) == {"one": {"sample": 1}, "more": {"two": {"sample": 2}}}
+
+
+def test_lazy_data_json(tmp_path: Path):
+    data = LazyData(_create_data(tmp_path))
+
+    assert json.loads(json.dumps(data)) == {"one": {"sample": 1}, "more": {"two": {"sample": 2}}}
+    assert json.loads(json.dumps(LazyData(tmp_path / "data")["more"])) == {"two": {"sample": 2}}
+
+
+def test_lazy_data_json_script(tmp_path: Path):
+    data_directory = _create_data(tmp_path)
+
+    template = Template('{{ data.more|json_script:"more" }}')
+    actual = template.render(Context({"data": LazyData(data_directory)}))
+
+    assert actual == '<script id="more" type="application/json">{"two": {"sample": 2}}</script>'
+
+
+def test_lazy_data_copies_are_dicts(tmp_path: Path):
+    data = LazyData(_create_data(tmp_path))
+
+    for actual in (pickle.loads(pickle.dumps(data)), deepcopy(data), data.copy()):  # noqa: S301
+        assert type(actual) is dict
+        assert actual == {"one": {"sample": 1}, "more": {"two": {"sample": 2}}}
@@ -0,0 +1,217 @@
+from copy import deepcopy
+from os import utime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.template import TemplateDoesNotExist
+
+from coltrane.config.coltrane import Site
+from coltrane.config.settings import get_config
+from coltrane.routes import Route, RouteTable, get_potential_templates, get_template_directories
+from coltrane.wildcard_templates import get_template_trie
+
+
+@pytest.fixture
+def site(settings, tmp_path: Path) -> Site:
+    settings.BASE_DIR = tmp_path
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "templates").mkdir()
+
+    return get_config().sites[0]
+
+
+def test_resolve_markdown(tmp_path: Path, site: Site):
+    (tmp_path / "content" / "about.md").write_text("# about")
+
+    assert RouteTable().resolve("about", site) == Route(is_markdown=True, name="about")
+
+
+def test_resolve_markdown_index(tmp_path: Path, site: Site):
+    (tmp_path / "content" / "blog").mkdir()
+    (tmp_path / "content" / "blog" / "index.md").write_text("# blog")
+
+    assert RouteTable().resolve("blog", site) == Route(is_markdown=True, name="blog/index")
+
+
+def test_resolve_markdown_before_template(tmp_path: Path, site: Site):
+    (tmp_path / "content" / "about.md").write_text("# about")
+    (tmp_path / "templates" / "about.html").write_text("about")
+
+    assert RouteTable().resolve("about", site) == Route(is_markdown=True, name="about")
+
+
+def test_resolve_template(tmp_path: Path, site: Site):
+    (tmp_path / "templates" / "about.html").write_text("about")
+
+    assert RouteTable().resolve("about", site) == Route(is_markdown=False, name="about.html")
+
+
+def test_resolve_wildcard_template(tmp_path: Path, site: Site):
+    (tmp_path / "templates" / "blog").mkdir()
+    (tmp_path / "templates" / "blog" / "*.html").write_text("blog post")
+
+    assert RouteTable().resolve("blog/first-post", site) == Route(is_markdown=False, name="blog/*.html")
+
+
+def test_resolve_missing(site: Site):
+    assert RouteTable().resolve("missing", site) is None
+
+
+def test_resolve_parent_traversal(tmp_path: Path, site: Site):
+    (tmp_path / "secret.md").write_text("# secret")
+
+    assert RouteTable().resolve("../secret", site) is None
+
+
+def test_resolve_template_remembered(tmp_path: Path, site: Site):
+    (tmp_path / "templates" / "about.html").write_text("about")
+    route_table = RouteTable()
+
+    with patch("coltrane.routes.get_template_trie", wraps=get_template_trie) as mock_get_template_trie:
+        assert route_table.resolve("about", site).name == "about.html"
+        assert route_table.resolve("about", site).name == "about.html"
+
+    mock_get_template_trie.assert_called_once()
+
+
+def test_resolve_template_not_remembered_in_debug(settings, tmp_path: Path, site: Site):
+    settings.DEBUG = True
+    (tmp_path / "templates" / "about.html").write_text("about")
+    route_table = RouteTable()
+
+    with patch("coltrane.routes.get_template_trie", wraps=get_template_trie) as mock_get_template_trie:
+        route_table.resolve("about", site)
+        route_table.resolve("about", site)
+
+    assert mock_get_template_trie.call_count == 2
+
+
+def test_resolve_new_markdown_replaces_template(tmp_path: Path, site: Site):
+    (tmp_path / "templates" / "about.html").write_text("about")
+    route_table = RouteTable()
+
+    assert route_table.resolve("about", site).is_markdown is False
+
+    (tmp_path / "content" / "about.md").write_text("# about")
+
+    assert route_table.resolve("about", site) == Route(is_markdown=True, name="about")
+
+
+def test_route_table_cleared_when_templates_change(settings, tmp_path: Path, site: Site):
+    from coltrane.routes import route_table
+
+    (tmp_path / "templates" / "about.html").write_text("about")
+    route_table.resolve("about", site)
+
+    route_table.resolve("missing", site)
+
+    assert route_table.stats()["templates"]["size"] == 1
+    assert route_table.stats()["not_found"]["size"] == 1
+
+    settings.TEMPLATES = deepcopy(settings.TEMPLATES)
+
+    assert route_table.stats()["templates"]["size"] == 0
+    assert route_table.stats()["not_found"]["size"] == 0
+
+
+def test_get_potential_templates():
+    assert get_potential_templates("blog/first-post", None) == ["blog/first-post.html", "blog/first-post/index.html"]
+
+
+def test_resolve_new_wildcard_template(tmp_path: Path, site: Site):
+    route_table = RouteTable()
+
+    assert route_table.resolve("blog/first-post", site) is None
+
+    (tmp_path / "templates" / "blog").mkdir()
+    (tmp_path / "templates" / "blog" / "*.html").write_text("blog post")
+
+    assert route_table.resolve("blog/first-post", site) == Route(is_markdown=False, name="blog/*.html")
+
+
+def test_resolve_wildcard_templates_disabled(settings, tmp_path: Path, site: Site):
+    settings.COLTRANE = {"DISABLE_WILDCARD_TEMPLATES": True}
+    (tmp_path / "templates" / "*.html").write_text("asterisk")
+
+    assert RouteTable().resolve("about", site) is None
+
+
+def test_resolve_app_template(site: Site):
+    assert RouteTable().resolve("coltrane/content", site) == Route(is_markdown=False, name="coltrane/content.html")
+
+
+def test_get_template_directories(tmp_path: Path, site: Site):
+    assert (tmp_path / "templates", "") in get_template_directories(site)
+
+
+def test_resolve_missing_remembered(site: Site):
+    route_table = RouteTable()
+
+    with patch("coltrane.routes.select_template") as mock_select_template:
+        mock_select_template.side_effect = TemplateDoesNotExist("missing")
+
+        assert route_table.resolve("missing", site) is None
+        assert route_table.resolve("missing", site) is None
+        assert route_table.resolve("missing", site) is None
+
+    mock_select_template.assert_called_once()
+    assert route_table.stats()["not_found_hits"] == 2
+
+
+def test_resolve_missing_not_remembered_in_debug(settings, site: Site):
+    settings.DEBUG = True
+    route_table = RouteTable()
+
+    assert route_table.resolve("missing", site) is None
+    assert route_table.resolve("missing", site) is None
+
+    assert route_table.stats()["not_found"]["size"] == 0
+    assert route_table.stats()["not_found_hits"] == 0
+
+
+def test_resolve_missing_then_markdown(tmp_path: Path, site: Site):
+    route_table = RouteTable()
+
+    assert route_table.resolve("about", site) is None
+
+    (tmp_path / "content" / "about.md").write_text("# about")
+
+    assert route_table.resolve("about", site) == Route(is_markdown=True, name="about")
+
+
+def test_resolve_missing_then_template(tmp_path: Path, site: Site):
+    route_table = RouteTable()
+
+    assert route_table.resolve("about", site) is None
+
+    (tmp_path / "templates" / "about.html").write_text("about")
+    mtime_ns = (tmp_path / "templates").stat().st_mtime_ns + 1_000_000_000
+    utime(tmp_path / "templates", ns=(mtime_ns, mtime_ns))
+
+    assert route_table.resolve("about", site) == Route(is_markdown=False, name="about.html")
+    assert route_table.stats()["not_found_hits"] == 0
+
+
+def test_resolve_missing_per_site(settings, tmp_path: Path, site: Site):
+    route_table = RouteTable()
+
+    assert route_table.resolve("about", site) is None
+
+    other_content_directory = tmp_path / "other"
+    (other_content_directory / "content").mkdir(parents=True)
+    (other_content_directory / "content" / "about.md").write_text("# about")
+    settings.BASE_DIR = other_content_directory
+
+    assert route_table.resolve("about", site) == Route(is_markdown=True, name="about")
+
+
+def test_resolve_missing_bounded(site: Site):
+    route_table = RouteTable(not_found_maxsize=2)
+
+    for slug in ("one", "two", "three"):
+        route_table.resolve(slug, site)
+
+    assert route_table.stats()["not_found"]["size"] == 2
@@ -1,10 +1,12 @@
+from os import stat, utime
 from pathlib import Path
-from unittest.mock import ANY
+from unittest.mock import ANY, patch
 
 from django.utils.safestring import SafeString
 
+from coltrane.content_index import get_content_index
 from coltrane.renderer import StaticRequest
-from coltrane.templatetags.coltrane_tags import directory_contents
+from coltrane.templatetags.coltrane_tags import _get_directory_contents, directory_contents
 
 
 def test_directory_contents(settings, tmp_path: Path):
@@ -251,3 +253,198 @@ def test_directory_contents_order_by_reversed(settings, tmp_path: Path):
     actual = directory_contents(context, order_by="-slug")
 
     assert actual == expected
+
+
+def _create_articles(tmp_path: Path, count: int) -> None:
+    (tmp_path / "content").mkdir()
+
+    for idx in range(count):
+        (tmp_path / "content" / f"article-{idx:02}.md").write_text(f"---\ntitle: Article {idx}\n---\n\narticle")
+
+
+def test_directory_contents_limit(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 20)
+
+    context = {"request": StaticRequest("/")}
+    actual = directory_contents(context, order_by="-slug", limit=3)
+
+    assert [c["slug"] for c in actual] == ["article-19", "article-18", "article-17"]
+
+
+def test_directory_contents_limit_and_offset(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 20)
+
+    context = {"request": StaticRequest("/")}
+    actual = directory_contents(context, order_by="slug", limit=2, offset=5)
+
+    assert [c["slug"] for c in actual] == ["article-05", "article-06"]
+
+
+def test_directory_contents_limit_same_as_sorted(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 20)
+
+    context = {"request": StaticRequest("/")}
+
+    for order_by in ("title", "-title"):
+        expected = directory_contents(context, order_by=order_by)[3:10]
+        actual = directory_contents(context, order_by=order_by, limit=7, offset=3)
+
+        assert [c["slug"] for c in actual] == [c["slug"] for c in expected]
+
+
+def test_directory_contents_limit_larger_than_contents(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 3)
+
+    context = {"request": StaticRequest("/")}
+
+    assert len(directory_contents(context, order_by="slug", limit=10)) == 3
+    assert len(directory_contents(context, limit=2)) == 2
+    assert directory_contents(context, limit=2, offset=5) == []
+
+
+def _backdate_content(tmp_path: Path) -> None:
+    # Modified times within the last second are re-checked by the content index
+    for path in [*(tmp_path / "content").iterdir(), tmp_path / "content"]:
+        mtime_ns = path.stat().st_mtime_ns - 10_000_000_000
+        utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_directory_contents_cached(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 3)
+
+    _backdate_content(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+
+    with patch(
+        "coltrane.templatetags.coltrane_tags._get_directory_contents", wraps=_get_directory_contents
+    ) as get_directory_contents:
+        first = directory_contents(context, order_by="slug")
+        second = directory_contents(context, order_by="slug")
+
+        assert [c["slug"] for c in first] == [c["slug"] for c in second]
+        get_directory_contents.assert_called_once()
+
+        (tmp_path / "content" / "new-article.md").write_text("new")
+        actual = directory_contents(context, order_by="slug")
+
+        assert get_directory_contents.call_count == 2
+        assert [c["slug"] for c in actual] == ["article-00", "article-01", "article-02", "new-article"]
+
+
+def test_directory_contents_cached_refresh_seconds(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    settings.COLTRANE = {"CONTENT_INDEX": {"REFRESH_SECONDS": 60}}
+    _create_articles(tmp_path, 20)
+
+    _backdate_content(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+    directory_contents(context, order_by="slug", limit=10)
+
+    with patch("coltrane.content_index.os_stat", wraps=stat) as os_stat:
+        actual = directory_contents(context, order_by="slug", limit=10)
+
+    assert len(actual) == 10
+    os_stat.assert_not_called()
+
+
+def test_directory_contents_cached_finds_changed_files(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 3)
+
+    _backdate_content(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+    directory_contents(context, order_by="slug")
+
+    # Changing a file in place does not change the modified time of the directory
+    directory_mtime_ns = (tmp_path / "content").stat().st_mtime_ns
+    (tmp_path / "content" / "article-00.md").write_text("---\ntitle: Changed\n---\n")
+    utime(tmp_path / "content", ns=(directory_mtime_ns, directory_mtime_ns))
+
+    actual = directory_contents(context, order_by="slug")
+
+    assert actual[0]["title"] == "Changed"
+
+
+def test_directory_contents_cached_copies(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_articles(tmp_path, 1)
+
+    context = {"request": StaticRequest("/")}
+
+    directory_contents(context)[0]["title"] = "changed"
+
+    assert directory_contents(context)[0]["title"] == "Article 0"
+
+
+def _create_posts(tmp_path: Path) -> None:
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "first.md").write_text("---\ntitle: B\npublish_date: 2024-01-02\norder: 10\n---\n")
+    (tmp_path / "content" / "second.md").write_text("---\ntitle: A\npublish_date: 2024-01-02\norder: 9\n---\n")
+    (tmp_path / "content" / "third.md").write_text("---\ntitle: C\npublish_date: 2023-12-31\norder: 100\n---\n")
+    (tmp_path / "content" / "fourth.md").write_text("---\ntitle: D\n---\n")
+
+
+def test_directory_contents_order_by_number(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_posts(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+    actual = directory_contents(context, order_by="order")
+
+    assert [c["slug"] for c in actual] == ["fourth", "second", "first", "third"]
+
+
+def test_directory_contents_order_by_date(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_posts(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+    actual = directory_contents(context, order_by="-publish_date")
+
+    assert [c["slug"] for c in actual] == ["first", "second", "third", "fourth"]
+
+
+def test_directory_contents_order_by_multiple_keys(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_posts(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+
+    actual = directory_contents(context, order_by="-publish_date, title")
+    assert [c["slug"] for c in actual] == ["second", "first", "third", "fourth"]
+
+    actual = directory_contents(context, order_by="-publish_date,-title", limit=2)
+    assert [c["slug"] for c in actual] == ["first", "second"]
+
+
+def test_directory_contents_sort_keys_kept_on_entry(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    _create_posts(tmp_path)
+    _backdate_content(tmp_path)
+
+    context = {"request": StaticRequest("/")}
+    directory_contents(context, order_by="-publish_date,title")
+
+    entry = get_content_index().get("second")
+
+    assert entry
+    assert (("publish_date", True), ("title", False)) in entry._sort_keys
+
+
+def test_directory_contents_toc(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content/test.md").write_text("# test heading")
+
+    context = {"request": StaticRequest("/")}
+    actual = directory_contents(context)
+
+    assert 'href="#test-heading"' in str(actual[0]["toc"])
@@ -0,0 +1,36 @@
+from os import umask
+from stat import S_IMODE
+
+from coltrane.utils import atomic_write_bytes
+
+
+def test_atomic_write_bytes(tmp_path):
+    path = tmp_path / "output.json"
+
+    atomic_write_bytes(path, b"{}")
+
+    assert path.read_bytes() == b"{}"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write_bytes_new_file_uses_umask(tmp_path):
+    path = tmp_path / "output.json"
+    current_umask = umask(0o022)
+
+    try:
+        atomic_write_bytes(path, b"{}")
+    finally:
+        umask(current_umask)
+
+    assert S_IMODE(path.stat().st_mode) == 0o644
+
+
+def test_atomic_write_bytes_keeps_existing_mode(tmp_path):
+    path = tmp_path / "output.json"
+    path.write_bytes(b"")
+    path.chmod(0o640)
+
+    atomic_write_bytes(path, b"{}")
+
+    assert path.read_bytes() == b"{}"
+    assert S_IMODE(path.stat().st_mode) == 0o640
@@ -0,0 +1,35 @@
+from datetime import date, datetime, timezone
+
+from coltrane.utils import ReverseSortKey, get_sort_key
+
+
+def test_get_sort_key_numbers():
+    values = [10, 9, 2.5, 100]
+
+    assert sorted(values, key=get_sort_key) == [2.5, 9, 10, 100]
+
+
+def test_get_sort_key_dates():
+    values = [
+        datetime(2024, 3, 1, tzinfo=timezone.utc),
+        date(2023, 1, 1),
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+    ]
+
+    assert sorted(values, key=get_sort_key) == [values[1], values[2], values[0]]
+
+
+def test_get_sort_key_mixed_types():
+    values = ["b", 2, None, date(2024, 1, 1), "", "a", 1]
+
+    assert sorted(values, key=get_sort_key) == [None, "", 1, 2, date(2024, 1, 1), "a", "b"]
+
+
+def test_get_sort_key_other_types():
+    assert get_sort_key(["a"]) == (3, "['a']")
+
+
+def test_reverse_sort_key():
+    values = [(ReverseSortKey(1), "b"), (ReverseSortKey(2), "a"), (ReverseSortKey(1), "a")]
+
+    assert sorted(values) == [(ReverseSortKey(2), "a"), (ReverseSortKey(1), "a"), (ReverseSortKey(1), "b")]
@@ -1,6 +1,11 @@
 from copy import deepcopy
+from os import utime
 from pathlib import Path
-from unittest.mock import call, patch
+from unittest.mock import ANY, call, patch
+
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.test import Client
 
 from coltrane.config.settings import get_config
 
@@ -182,10 +187,295 @@ def test_url_slug_cache(client, settings, tmp_path: Path):
             assert response.status_code == 200
             assert response.headers.get("Expires") == original_expires
 
-            _get_from_cache_if_enabled.assert_has_calls(calls=[call("test-this-cache"), call("test-this-cache")])
+            _get_from_cache_if_enabled.assert_has_calls(
+                calls=[call("test-this-cache", refresh=ANY), call("test-this-cache", refresh=ANY)]
+            )
             _set_in_cache_if_enabled.assert_not_called()
 
 
+def _setup_response_cache(settings, tmp_path: Path) -> None:
+    settings.BASE_DIR = tmp_path
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    settings.COLTRANE = {"VIEW_CACHE": {"SECONDS": 15, "MODE": "response"}}
+
+
+def test_url_slug_response_cache(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-cache.md").write_text("test cache")
+
+    response = client.get("/test-this-cache")
+    assert response.status_code == 200
+    assert response.headers.get("Cache-Control") == "max-age=15"
+
+    etag = response.headers.get("ETag")
+    assert etag
+    original_content = response.content
+
+    with patch("coltrane.views.render") as render:
+        response = client.get("/test-this-cache")
+        assert response.status_code == 200
+        assert response.headers.get("ETag") == etag
+        assert response.headers.get("Cache-Control") == "max-age=15"
+        assert response.content == original_content
+
+        render.assert_not_called()
+
+
+def test_url_slug_response_cache_not_modified(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-cache.md").write_text("test cache")
+
+    response = client.get("/test-this-cache")
+    etag = response.headers.get("ETag")
+
+    with patch("coltrane.views.render") as render:
+        response = client.get("/test-this-cache", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers.get("ETag") == etag
+        assert response.content == b""
+
+        response = client.get("/test-this-cache", headers={"If-None-Match": '"not-the-etag"'})
+        assert response.status_code == 200
+
+        render.assert_not_called()
+
+
+def test_url_slug_response_cache_stale_while_revalidate(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+    settings.COLTRANE["VIEW_CACHE"]["STALE_SECONDS"] = 60
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-cache.md").write_text("test cache")
+
+    response = client.get("/test-this-cache")
+    assert response.status_code == 200
+    assert response.headers.get("Cache-Control") == "max-age=15, stale-while-revalidate=60"
+
+    response = client.get("/test-this-cache")
+    assert response.status_code == 200
+    assert response.headers.get("Cache-Control") == "max-age=15, stale-while-revalidate=60"
+
+
+def test_url_slug_response_cache_skips_404(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+
+    response = client.get("/missing")
+    assert response.status_code == 404
+
+    (tmp_path / "content" / "missing.md").write_text("found")
+
+    response = client.get("/missing")
+    assert response.status_code == 200
+
+
+def test_url_slug_response_cache_skips_csrf_token(settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+    settings.MIDDLEWARE = ["django.middleware.csrf.CsrfViewMiddleware"]
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "form.html").write_text("<form>{% csrf_token %}</form>")
+
+    response = Client().get("/form")
+    assert response.status_code == 200
+    assert "csrftoken" in response.cookies
+    assert "ETag" not in response.headers
+    token = response.cookies["csrftoken"].value
+
+    response = Client().get("/form")
+    assert response.status_code == 200
+    assert "csrftoken" in response.cookies
+    assert response.cookies["csrftoken"].value != token
+
+
+def test_url_slug_response_cache_skips_session(settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+    settings.MIDDLEWARE = ["django.contrib.sessions.middleware.SessionMiddleware"]
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "account.html").write_text("session {{ request.session.items|length }}")
+
+    response = Client().get("/account")
+    assert response.status_code == 200
+    assert response.headers.get("Vary") == "Cookie"
+    assert "ETag" not in response.headers
+
+    with patch("coltrane.views.render", wraps=render) as views_render:
+        response = Client().get("/account")
+
+    assert response.status_code == 200
+    views_render.assert_called_once()
+
+
+def test_url_slug_response_cache_skips_vary(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-cache.md").write_text("test cache")
+
+    with patch("coltrane.views.render", side_effect=lambda *_args, **_kwargs: HttpResponse(headers={"Vary": "Cookie"})):
+        response = client.get("/test-this-cache")
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+    response = client.get("/test-this-cache")
+    assert response.status_code == 200
+    assert "test cache" in response.content.decode()
+
+
+def test_url_slug_response_cache_skips_query_string(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "list.html").write_text("query {{ request.GET.urlencode }}")
+    settings.TEMPLATES = deepcopy(get_config().get_templates_settings())
+
+    response = client.get("/list?page=1")
+    assert response.status_code == 200
+    assert response.content.decode() == "query page=1"
+
+    response = client.get("/list?page=2")
+    assert response.status_code == 200
+    assert response.content.decode() == "query page=2"
+
+    response = client.get("/list")
+    assert response.status_code == 200
+    assert response.content.decode() == "query "
+
+
+def test_url_slug_response_cache_skips_post(client, settings, tmp_path: Path):
+    _setup_response_cache(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-cache.md").write_text("test cache")
+
+    response = client.post("/test-this-cache")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+    with patch("coltrane.views.render", wraps=render) as mock_render:
+        response = client.get("/test-this-cache")
+        assert response.status_code == 200
+
+        mock_render.assert_called_once()
+
+
+def test_url_slug_conditional_get(client, settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+    settings.COLTRANE = {"CONDITIONAL_GET": True}
+
+    (tmp_path / "content").mkdir()
+    markdown_file = tmp_path / "content" / "test-this-conditional.md"
+    markdown_file.write_text("test conditional")
+
+    response = client.get("/test-this-conditional")
+    assert response.status_code == 200
+
+    etag = response.headers.get("ETag")
+    assert etag.startswith('W/"')
+    last_modified = response.headers.get("Last-Modified")
+    assert last_modified
+
+    with patch("coltrane.views.render") as render:
+        response = client.get("/test-this-conditional", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.get("/test-this-conditional", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+        render.assert_not_called()
+
+    # Change the markdown file
+    markdown_file.write_text("test conditional changed")
+    mtime_ns = markdown_file.stat().st_mtime_ns + 1_000_000_000
+    utime(markdown_file, ns=(mtime_ns, mtime_ns))
+
+    response = client.get("/test-this-conditional", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "test conditional changed" in response.content.decode()
+    assert response.headers.get("ETag") != etag
+
+
+def test_url_slug_conditional_get_data_changed(client, settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+    settings.COLTRANE = {"CONDITIONAL_GET": True}
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this-data.md").write_text("{{ data.test.sample }}")
+    (tmp_path / "data").mkdir()
+    data_file = tmp_path / "data" / "test.json"
+    data_file.write_text('{"sample": "one"}')
+
+    response = client.get("/test-this-data")
+    etag = response.headers.get("ETag")
+
+    data_file.write_text('{"sample": "two"}')
+    mtime_ns = data_file.stat().st_mtime_ns + 1_000_000_000
+    utime(data_file, ns=(mtime_ns, mtime_ns))
+
+    response = client.get("/test-this-data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "two" in response.content.decode()
+
+
+def test_url_slug_conditional_get_directory_contents(client, settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+    settings.COLTRANE = {"CONDITIONAL_GET": True}
+
+    (tmp_path / "content" / "posts").mkdir(parents=True)
+    (tmp_path / "content" / "index.md").write_text(
+        '{% directory_contents "posts" as posts %}{% for post in posts %}{{ post.slug }} {% endfor %}'
+    )
+    posts_directory = tmp_path / "content" / "posts"
+    (posts_directory / "one.md").write_text("one")
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert "posts/one" in response.content.decode()
+    etag = response.headers.get("ETag")
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    (posts_directory / "two.md").write_text("two")
+    mtime_ns = posts_directory.stat().st_mtime_ns + 1_000_000_000
+    utime(posts_directory, ns=(mtime_ns, mtime_ns))
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "posts/two" in response.content.decode()
+
+
+def test_url_slug_conditional_get_disabled(client, settings, tmp_path: Path):
+    _setup_settings(settings, tmp_path)
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "content" / "test-this.md").write_text("test this")
+
+    with patch("coltrane.views.record_dependencies") as record_dependencies:
+        response = client.get("/test-this")
+
+    assert response.status_code == 200
+    record_dependencies.assert_not_called()
+
+
 def test_url_slug_direct_template(client, settings, tmp_path: Path):
     _setup_settings(settings, tmp_path)
 
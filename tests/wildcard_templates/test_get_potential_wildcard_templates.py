@@ -1,4 +1,8 @@
-from coltrane.wildcard_templates import _sort_potential_templates, get_potential_wildcard_templates
+from coltrane.wildcard_templates import (
+    _generate_potential_wildcard_templates,
+    _sort_potential_templates,
+    get_potential_wildcard_templates,
+)
 
 
 def test_get_potential_wildcard_templates():
@@ -59,3 +63,16 @@ def test_sort_potential_templates():
     )
 
     assert expected == actual
+
+
+def test_get_potential_wildcard_templates_same_as_generated():
+    for slug_pieces_count in range(1, 9):
+        slug = "/".join(f"piece-{idx}" for idx in range(slug_pieces_count))
+
+        assert get_potential_wildcard_templates(slug) == _generate_potential_wildcard_templates(slug)
+
+
+def test_get_potential_wildcard_templates_with_asterisk():
+    slug = "new/*/thing"
+
+    assert get_potential_wildcard_templates(slug) == _generate_potential_wildcard_templates(slug)
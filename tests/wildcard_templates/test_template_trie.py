@@ -0,0 +1,120 @@
+from itertools import combinations
+from os import utime
+from pathlib import Path
+
+from coltrane.wildcard_templates import (
+    TemplateTrie,
+    _get_wildcard_ranks,
+    get_potential_wildcard_templates,
+    get_template_trie,
+)
+
+
+def _create_templates(directory: Path, *template_names: str) -> None:
+    for template_name in template_names:
+        path = directory / template_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(template_name)
+
+
+def test_get(tmp_path: Path):
+    _create_templates(tmp_path, "about.html", "blog/index.html", "blog/*.html", "readme.txt")
+
+    template_trie = TemplateTrie([(tmp_path, "")])
+
+    assert template_trie.get("about.html") == "about.html"
+    assert template_trie.get("blog/index.html") == "blog/index.html"
+    assert template_trie.get("blog.html") is None
+    assert template_trie.get("readme.html") is None
+
+
+def test_get_first_directory_wins(tmp_path: Path):
+    _create_templates(tmp_path / "one", "about.html")
+    _create_templates(tmp_path / "two", "about.html", "contact.html")
+
+    template_trie = TemplateTrie([(tmp_path / "one", "first/"), (tmp_path / "two", "first/")])
+
+    assert template_trie.get("first/about.html") == "first/about.html"
+    assert template_trie.get("first/contact.html") == "first/contact.html"
+
+
+def test_match(tmp_path: Path):
+    _create_templates(tmp_path, "*.html", "blog/*.html", "*/*.html")
+
+    template_trie = TemplateTrie([(tmp_path, "")])
+
+    assert template_trie.match("about") == "*.html"
+    assert template_trie.match("blog/first-post") == "blog/*.html"
+    assert template_trie.match("news/first-post") == "*/*.html"
+    assert template_trie.match("news/2024/first-post") is None
+
+
+def test_match_prefix(tmp_path: Path):
+    _create_templates(tmp_path, "site/templates/*.html", "*.html")
+
+    template_trie = TemplateTrie([(tmp_path, "")])
+
+    assert template_trie.match("about", prefix="site/templates/") == "site/templates/*.html"
+    assert template_trie.match("about", prefix="missing/templates/") is None
+
+
+def test_match_same_precedence_as_potential_wildcard_templates(tmp_path: Path):
+    for slug in ("one", "one/two", "one/two/three", "one/two/three/four"):
+        slug_pieces_count = len(slug.split("/"))
+        potential_templates = [
+            t for t in dict.fromkeys(get_potential_wildcard_templates(slug)) if t.count("/") == slug_pieces_count - 1
+        ]
+
+        for count in range(1, 3):
+            for template_names in combinations(potential_templates, count):
+                template_trie = TemplateTrie([])
+
+                for template_name in template_names:
+                    template_trie.add(template_name)
+
+                expected = next(t for t in potential_templates if t in template_names)
+
+                assert template_trie.match(slug) == expected, template_names
+
+
+def test_match_ranks_cached_per_slug_pieces_count():
+    template_trie = TemplateTrie([])
+    template_trie.add("docs/*/*.html")
+
+    _get_wildcard_ranks.cache_clear()
+
+    for slug in ("docs/one/intro", "docs/two/intro", "news/one/intro"):
+        template_trie.match(slug)
+
+    assert template_trie.match("docs/three/intro") == "docs/*/*.html"
+    assert _get_wildcard_ranks.cache_info().misses == 1
+    assert _get_wildcard_ranks.cache_info().hits == 3
+
+
+def test_has_changed(tmp_path: Path):
+    _create_templates(tmp_path, "blog/*.html")
+
+    template_trie = TemplateTrie([(tmp_path, "")])
+    assert template_trie.has_changed() is False
+
+    _create_templates(tmp_path, "blog/new.html")
+    mtime_ns = (tmp_path / "blog").stat().st_mtime_ns + 1_000_000_000
+    utime(tmp_path / "blog", ns=(mtime_ns, mtime_ns))
+
+    assert template_trie.has_changed() is True
+
+
+def test_get_template_trie(tmp_path: Path):
+    _create_templates(tmp_path, "about.html")
+    directories = [(tmp_path, "")]
+
+    template_trie = get_template_trie(directories)
+    assert get_template_trie(directories) is template_trie
+
+    _create_templates(tmp_path, "contact.html")
+    mtime_ns = tmp_path.stat().st_mtime_ns + 1_000_000_000
+    utime(tmp_path, ns=(mtime_ns, mtime_ns))
+
+    new_template_trie = get_template_trie(directories)
+    assert new_template_trie is not template_trie
+    assert new_template_trie.get("contact.html") == "contact.html"
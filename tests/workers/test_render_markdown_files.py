@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from coltrane.utils import get_file_hash
+from coltrane.workers import render_markdown_files
+
+
+def test_render_markdown_files(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "output").mkdir()
+    (tmp_path / "content" / "test-1.md").write_text("# test 1")
+
+    actual = render_markdown_files([(tmp_path / "content" / "test-1.md", None)])
+
+    assert len(actual) == 1
+    assert actual[0][0] == tmp_path / "content" / "test-1.md"
+    assert actual[0][1] is None
+    assert any(d.endswith("coltrane/content.html") for d in actual[0][2])
+    assert actual[0][3] == get_file_hash(b"# test 1")
+    assert '<h1 id="test-1">test 1</h1>' in (tmp_path / "output" / "test-1" / "index.html").read_text()
+
+
+def test_render_markdown_files_error(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+    settings.DEBUG = True
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "output").mkdir()
+    (tmp_path / "content" / "test-1.md").write_text("{{ sadf }}")
+
+    actual = render_markdown_files([(tmp_path / "content" / "test-1.md", None)])
+
+    assert len(actual) == 1
+    assert actual[0][0] == tmp_path / "content" / "test-1.md"
+    assert "'sadf' does not exist in template context." in actual[0][1]
+
+
+def test_render_markdown_files_content(settings, tmp_path: Path):
+    settings.BASE_DIR = tmp_path
+
+    (tmp_path / "content").mkdir()
+    (tmp_path / "output").mkdir()
+    (tmp_path / "content" / "test-1.md").write_text("# test 1")
+
+    # The contents that were already read get rendered instead of the file
+    actual = render_markdown_files([(tmp_path / "content" / "test-1.md", b"# test 2")])
+
+    assert actual[0][1] is None
+    assert actual[0][3] == get_file_hash(b"# test 2")
+    assert '<h1 id="test-2">test 2</h1>' in (tmp_path / "output" / "test-1" / "index.html").read_text()